@@ -14,6 +14,11 @@ try:
 except ImportError:
     pass
 
+try:
+    from gint import dblit_rgb565 # Simulator only
+except ImportError:
+    dblit_rgb565 = None
+
 # =============================================================================
 # APP CONFIG
 # =============================================================================
@@ -72,6 +77,12 @@ class Canvas:
         sx = bx * 2
         sy = BUF_HEADER_OFFSET + by * 2
         
+        if dblit_rgb565:
+            # Whole region at once, scaled 2x
+            start = (by * cw + bx) * 2
+            dblit_rgb565(sx, sy, bw, bh, self.mv[start:], cw, 2)
+            return
+        
         buf = self.mv
         
         # Draw line by line to minimize function calls
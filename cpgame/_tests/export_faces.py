@@ -1,98 +1,57 @@
 #!/usr/bin/env python3
 import gint
-import struct
 import sys
 import os
 
-# ---- PAK layout (same as before) ----
-_HDR = struct.Struct('<4sHHII')
-_ENT = struct.Struct('<32sBBHHHHHIIII')
+# ---- PAK v2 writer of pak_convert.py, in the cpgame/ folder above
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pak_convert import pack_v2
 
 def pack(out_path, entries):
-    with open(out_path, 'wb') as f:
-        f.write(_HDR.pack(b'GIPK', 1, len(entries), 0, 0))  # placeholder (index_off=0)
+    """Writes the entries as a PAK v2 (sorted, hashed, RLE), drawing each one as a preview."""
+    dx = 0
+    dy = 0
+    tile_width = 32
+    tile_height = 32
+    max_width = 320  # Assuming screen width
 
-        blobs = []
-        dx = 0
-        dy = 0
-        tile_width = 32
-        tile_height = 32
-        max_width = 320  # Assuming screen width
-        
-        for e in entries:
-            name = e['name'].encode('ascii')[:31]
-            name = name + b'\x00' * (32 - len(name))
-            pal = e['palette']
-            data = e['data']
-            pal_off = f.tell()
-            f.write(pal)
-            data_off = f.tell()
-            f.write(data)
-            blobs.append((
-                name,
+    for e in entries:
+        # Draw to screen
+        try:
+            img = gint.image(
                 e['profile'],
-                e.get('reserved', 0),
-                
                 e['color_count'],
                 e['width'],
                 e['height'],
                 e['stride'],
-                0,
-                len(pal), len(data), pal_off, data_off
-                # <32s BB HHHHH IIII
-            ))
-            
-            # Draw to screen
-            try:
-                img = gint.image(
-                    e['profile'],
-                    e['color_count'],
-                    e['width'],
-                    e['height'],
-                    e['stride'],
-                    data,
-                    pal
-                )
-                
-                gint.dimage(dx, dy, img)
-                gint.dupdate()
+                e['data'],
+                e['palette']
+            )
 
-                print(f"{e['name']} ", {
-                    "profile":  e['profile'],
-                    "color_count": e['color_count'],
-                    "width": e['width'],
-                    "height": e['height'],
-                    "stride": e['stride'],
-                })
+            gint.dimage(dx, dy, img)
+            gint.dupdate()
 
-                # hex_str = ' '.join([f'{b:02x}' for b in pal])
-                # hex_dat = ' '.join([f'{b:02x}' for b in data])
-                # print(f"{e['name']} pal: [ {hex_str} ]")
-                # print(f"{e['name']} dat: [ {hex_dat} ]")
-                
-                # Increment position
-                dx += tile_width
-                if dx >= max_width:
-                    dx = 0
-                    dy += tile_height
-                
-                # Wait for keypress between tiles (optional)
-                # gint.getkey()
-                
-                # Clean up
-                del img
-            except:
-                pass
+            print(f"{e['name']} ", {
+                "profile":  e['profile'],
+                "color_count": e['color_count'],
+                "width": e['width'],
+                "height": e['height'],
+                "stride": e['stride'],
+            })
 
-            
+            # Increment position
+            dx += tile_width
+            if dx >= max_width:
+                dx = 0
+                dy += tile_height
 
-        index_off = f.tell()
-        for b in blobs:
-            f.write(_ENT.pack(*b))
+            # Clean up
+            del img
+        except:
+            pass
 
-        # patch header with index offset
-        f.seek(8)
-        f.write(struct.pack('<I', index_off))
+    compressed = pack_v2(out_path, entries)
+    print(f"{compressed} of {len(entries)} entries RLE compressed")
 
 def extract_tiles_from_module(module_name, prefix):
     """Extract 32x32 tiles from a module containing face images"""
@@ -109,7 +68,7 @@ def extract_tiles_from_module(module_name, prefix):
     img_obj = mod.image
 
     # Extract image properties
-    profile = img_obj.profile
+    profile = img_obj.format
     color_count = img_obj.color_count
     width = img_obj.width
     height = img_obj.height
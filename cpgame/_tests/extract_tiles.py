@@ -91,7 +91,7 @@ def extract_tiles_from_a_img():
     img_obj = chessboard.image
     
     # Extract image properties
-    profile = img_obj.profile
+    profile = img_obj.format
     color_count = img_obj.color_count
     width = img_obj.width
     height = img_obj.height
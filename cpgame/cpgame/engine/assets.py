@@ -1,86 +1,140 @@
 # engine/asset.py
 # A central manager to load and process all game data.
 
-# from cpgame.engine.animation import AnimationFrame
-# from cpgame.game_assets import templar_data
-# from cpgame.game_assets import jrpg_data
-# from cpgame.game_assets.fanta_tiles import image as fanta_tileset_img # Your raw JRPG tileset image
-
-# from cpgame.engine.profiler import MemoryProfiler
-
-from cpgame.game_assets import fanta_tiles
-from cpgame.game_assets import chipset_basic
-from cpgame.game_assets.riosma import world as riosma_world
+import sys
+from cpgame.engine.profiler import track_heap
+from cpgame.engine.logger import log
 
 try:
-    from typing import Optional, Dict, Any, Set, List
+    from typing import Optional, Dict, Any, Set, List, Tuple, Callable
 except:
     pass
 
+ASSET_BUDGET = 64 * 1024  # Bytes of loaded assets; unreferenced ones are evicted past it
+
+# Tilesets by Map.tileset_id: module of the image, name of the image in it
+TILESETS = {
+    "jrpg": ("cpgame.game_assets.fanta_tiles", "image"),
+    "basic": ("cpgame.game_assets.chipset_basic", "tileset"),
+    "riosma_world": ("cpgame.game_assets.riosma.world", "images"),
+}
+RIOSMA_WORLD_WALKABLE = (8, 9, 10, 11, 25, 26, 27, 28, 44, 75)
+
 class Tilemap:
     def __init__(self, img: Any, solid_ids: Set[int]):
         self.img = img
         self.solid = solid_ids
 
+def image_bytes(img: Any) -> int:
+    """Device memory of a gint image: pixel data and palette."""
+    return len(img.data) + (len(img.palette) if img.palette else 0)
+
+def run_job(job) -> Any:
+    """Runs a load job (a generator yielding its progress) to the end, returns its result."""
+    try:
+        while True:
+            next(job)
+    except StopIteration as done:
+        return done.value
+
+def _solid_tiles(name: str) -> List[int]:
+    if name == "riosma_world":
+        return [i for i in range(95) if i not in RIOSMA_WORLD_WALKABLE]
+    from cpgame.game_assets import jrpg_data
+    return jrpg_data.solid_tiles
+
 class AssetManager:
-    """An on-demand loader for game assets."""
-    def __init__(self):
-        # self._cache: Dict[str, Any] = {}
-        self._loaded_modules: Dict[str, Any] = {}
-
-    def get_tileset(self, name: str) -> Optional[Tilemap]:
-        """Loads a tileset from its module, caches it, and returns it."""
-        # if name in self._cache:
-        #     return self._cache[name]
-
-        from cpgame.engine.logger import log
-        log("AssetManager: Loading tileset '{}'...".format(name))
-        
-        tileset = None
-        if name == "jrpg":
-            # Lazy import
-            from cpgame.game_assets import jrpg_data
-            tileset = Tilemap(fanta_tiles.image, jrpg_data.solid_tiles)
-            self._loaded_modules['fanta_tiles'] = fanta_tiles
-            self._loaded_modules['jrpg_data'] = jrpg_data
-        
-        if name == "basic":
-            # TODO: make this dynamic
-            from cpgame.game_assets import jrpg_data
-            tileset = Tilemap(chipset_basic.tileset, jrpg_data.solid_tiles)
-            self._loaded_modules['chipset_basic'] = chipset_basic
-            self._loaded_modules['jrpg_data'] = jrpg_data
-        
-        if name == "riosma_world":
-            # TODO: make this dynamic
-            from cpgame.game_assets import jrpg_data
-            tileset = Tilemap(riosma_world.images, [i for i in range(95) if i not in [8, 9, 10, 11, 25, 26, 27, 28, 44, 75]])
-            self._loaded_modules['riosma_world'] = riosma_world
-            self._loaded_modules['jrpg_data'] = jrpg_data
-        
-        # if tileset:
-        #     self._cache[name] = tileset
-        return tileset
-
-    def unload(self, name: str):
-        """Unloads a specific asset and its source module from memory."""
-        # if name in self._cache:
-        #     del self._cache[name]
-        from cpgame.modules.datamanager import _cleanup_module
+    """
+    An on-demand loader for game assets. Assets are registered by name with a
+    loader, loaded on first use and reference counted: pin() takes a reference,
+    unpin() drops it. Unreferenced assets stay loaded while the total fits in
+    the byte budget, so a scene coming back to them loads nothing; past the
+    budget, the least recently used ones are evicted with their modules.
+    """
+    def __init__(self, budget: int = ASSET_BUDGET):
+        self.budget = budget
+        self.loaded_bytes = 0
+        # name -> loader() returning (asset, size in bytes, module paths to drop on eviction)
+        self._loaders: Dict[str, Callable[[], Tuple[Any, int, Tuple[str, ...]]]] = {}
+        # name -> [asset, size, references, module paths]
+        self._entries: Dict[str, list] = {}
+        self._lru: List[str] = []  # Loaded names, least recently used first
+        for name in TILESETS:
+            self.register(name, self._tileset_loader(name))
 
-        # This is a simplified cleanup; a real system would track dependencies.
-        if name == "jrpg":    
-            if 'fanta_tiles' in self._loaded_modules:
-                _cleanup_module('cpgame.game_assets.fanta_tiles', self._loaded_modules.pop('fanta_tiles'))
-            if 'jrpg_data' in self._loaded_modules:
-                _cleanup_module('cpgame.game_assets.jrpg_data', self._loaded_modules.pop('jrpg_data'))
-        
-        if name == "basic":
-            if 'chipset_basic' in self._loaded_modules:
-                _cleanup_module('cpgame.game_assets.chipset_basic', self._loaded_modules.pop('chipset_basic'))
-        if name == "riosma_world":
-            if 'riosma_world' in self._loaded_modules:
-                _cleanup_module('cpgame.game_assets.riosma.world', self._loaded_modules.pop('riosma_world'))
-
-        import gc
-        gc.collect()
\ No newline at end of file
+    def register(self, name: str, loader):
+        """
+        Adds an asset: loader() returns (asset, size in bytes, module paths to
+        drop on eviction), or is a load job returning them.
+        """
+        self._loaders[name] = loader
+
+    def register_pak_image(self, name: str, pak_path: str, entry_name: str):
+        """Adds an image entry of a PAK file, read a few rows per load step."""
+        def load():
+            from cpgame.modules.pakloader import PakFile
+            with PakFile(pak_path) as pak:
+                img = yield from pak.load_image_steps(entry_name)
+            return img, image_bytes(img) if img else 0, ()
+        self.register(name, load)
+
+    def _tileset_loader(self, name: str):
+        module_path, image_name = TILESETS[name]
+        def load():
+            yield 0.0 # The import can't be split, let a frame be drawn before it
+            module = __import__(module_path, None, None, (image_name,))
+            img = getattr(module, image_name)
+            return Tilemap(img, _solid_tiles(name)), image_bytes(img), (module_path,)
+        return load
+
+    def pin(self, name: str) -> Optional[Any]:
+        """Returns an asset, loading it if needed, and keeps it loaded until unpin()."""
+        return run_job(self.pin_steps(name))
+
+    def pin_steps(self, name: str):
+        """pin() as a load job for Scene.preload(): yields the load progress, returns the asset."""
+        entry = self._entries.get(name)
+        if entry is None:
+            loader = self._loaders.get(name)
+            if loader is None:
+                log("AssetManager: No asset named '{}'".format(name))
+                return None
+            log("AssetManager: Loading '{}'...".format(name))
+            with track_heap("assets"):
+                loaded = loader()
+                if not isinstance(loaded, tuple):
+                    loaded = yield from loaded
+            asset, size, modules = loaded
+            entry = self._entries[name] = [asset, size, 0, modules]
+            self.loaded_bytes += size
+        else:
+            self._lru.remove(name)
+        self._lru.append(name)
+        entry[2] += 1
+        self.trim(self.budget)
+        return entry[0]
+
+    def unpin(self, name: str):
+        """Drops a reference from pin(). The asset stays cached while the budget allows."""
+        entry = self._entries.get(name)
+        if entry is None or entry[2] == 0:
+            return
+        entry[2] -= 1
+        self.trim(self.budget)
+
+    def trim(self, budget: int = 0):
+        """Evicts unreferenced assets, least recently used first, until at most `budget` bytes are loaded."""
+        for name in self._lru[:]:
+            if self.loaded_bytes <= budget:
+                break
+            if self._entries[name][2] == 0:
+                self._evict(name)
+
+    def _evict(self, name: str):
+        from cpgame.modules.datamanager import _cleanup_module
+        log("AssetManager: Evicting '{}'".format(name))
+        _, size, _, modules = self._entries.pop(name)
+        self._lru.remove(name)
+        self.loaded_bytes -= size
+        for module_path in modules:
+            _cleanup_module(module_path, sys.modules.get(module_path))
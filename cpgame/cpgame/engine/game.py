@@ -3,19 +3,32 @@
 
 import time
 import gc # Import garbage collector for cleanup
-from gint import dupdate, dclear, dtext, C_BLACK, DWIDTH, DHEIGHT, C_WHITE
-from cpgame.engine.scene import Scene
+from gint import dupdate, dclear, dtext, drect, drect_border, C_BLACK, DWIDTH, DHEIGHT, C_WHITE, C_NONE
+from cpgame.engine.scene import Scene, TIMING_REALTIME
 from cpgame.engine.assets import AssetManager
 from cpgame.engine.systems import InputManager
-from cpgame.engine.profiler import MemoryProfiler
+from cpgame.engine.profiler import MemoryProfiler, track_heap
 from cpgame.engine.logger import log
+try:
+    from gint import draw_profile_frame, device_frame_ms # Simulator only
+except ImportError:
+    draw_profile_frame = device_frame_ms = None
+try:
+    from gint import heap_scene, heap_stats # Simulator only
+except ImportError:
+    heap_scene = heap_stats = None
 
 try:
-    from typing import Optional, List, Dict, Any
+    from typing import Optional, List, Dict, Tuple, Any
 except:
     pass
 
 DEBUG_FRAME_TIME = False
+MAX_FRAME_STEPS = 5  # Updates per frame in real-time scenes, more time is dropped
+MAX_FRAME_SKIP = 3   # Frames in a row without draw() when a real-time scene is behind
+HEAP_SUBSYSTEMS = ("assets", "windows", "data")
+LOAD_SLICE_MS = 100  # Loading work between two frames of the progress bar
+LOAD_BAR_WIDTH = 160
 
 class Game:
     """The main Game class"""
@@ -26,6 +39,18 @@ class Game:
         self.running: bool = False
         self.fixed_timestep: float = 0.055
         self.frame_cap_ms: int = 53
+        self.max_frames: int = 0 # Frames start() draws before it returns (benchmarks), 0 for no limit
+        self.frames: int = 0 # Frames drawn since start()
+        # Measures of the last frame
+        self.frame_time_ms: int = 0
+        self.update_ms: int = 0
+        self.draw_ms: int = 0
+        self.present_ms: int = 0
+        self.steps: int = 0
+        self.alpha: float = 0.0
+        self._heap_scene_name: str = ""
+        # Scenes under the running one, bottom first: (class, kwargs, snapshot)
+        self._suspended: List[Tuple[Any, Dict[str, Any], bytes]] = []
 
         # Generic container for game-mode-specific systems.
         # self.session_data: Dict[str, Any] = {}
@@ -37,97 +62,187 @@ class Game:
         self.change_scene(initial_scene_class) # Ideally you'd push scenes, but we'd run out of memory
         # self.push_scene(initial_scene_class)
 
+        self.frames = 0
+        step_ms = int(self.fixed_timestep * 1000)
+        accumulator = 0 # Clock time not yet simulated, real-time scenes only
+        skipped = 0
+        last_time = time.ticks_ms()
         while self.running and self.scenes:
             frame_start_time = time.ticks_ms()
             current_scene = self.scenes[-1]
-            
-            self.input.update() # Poll input once per frame
-            signal = current_scene.update(self.fixed_timestep)
+
+            # --- UPDATE ---
+            if current_scene.timing == TIMING_REALTIME:
+                accumulator += time.ticks_diff(frame_start_time, last_time)
+                steps = min(accumulator // step_ms, MAX_FRAME_STEPS)
+            else:
+                steps = 1
+            last_time = frame_start_time
+            signal = None
+            self.steps = 0
+            while self.steps < steps:
+                self.input.update() # Poll input once per logic step
+                signal = current_scene.update(self.fixed_timestep)
+                self.steps += 1
+                if (signal == "EXIT_GAME" or not self.running or not self.scenes
+                        or self.scenes[-1] is not current_scene): break
             if signal == "EXIT_GAME": self.running = False; break
+            if not self.running or not self.scenes: break # e.g. pop_scene() with nothing to return to
+            update_end_time = time.ticks_ms()
+            self.update_ms = time.ticks_diff(update_end_time, frame_start_time)
+
+            if self.scenes[-1] is not current_scene:
+                # The new scene starts its clock now, not at the frame start
+                accumulator = skipped = 0
+                last_time = time.ticks_ms()
+                continue
+            if current_scene.timing == TIMING_REALTIME:
+                accumulator -= self.steps * step_ms
+                if accumulator >= step_ms:
+                    if skipped < MAX_FRAME_SKIP:
+                        skipped += 1 # Behind: catch up before drawing again
+                        continue
+                    accumulator %= step_ms # Too slow to catch up, drop the time
+                self.alpha = accumulator / step_ms
+            else:
+                accumulator, self.alpha = 0, 0.0
+            skipped = 0
 
             # --- RENDER ---
-            render_start_time = time.ticks_ms()
-            current_scene.draw(time.ticks_diff(time.ticks_ms(), render_start_time))
+            current_scene.draw(self.frame_time_ms)
+            draw_end_time = time.ticks_ms()
+            self.draw_ms = time.ticks_diff(draw_end_time, update_end_time)
             dupdate()
+            self.present_ms = time.ticks_diff(time.ticks_ms(), draw_end_time)
+            self.frames += 1
+            if self.frames == self.max_frames: break
 
             # --- FRAME CAP ---
             frame_time_ms = time.ticks_diff(time.ticks_ms(), frame_start_time)
-            if DEBUG_FRAME_TIME: print(f"Frame Time: {frame_time_ms}ms")
+            self.frame_time_ms = frame_time_ms
+            if DEBUG_FRAME_TIME: self._print_frame_time(frame_time_ms)
             if frame_time_ms < self.frame_cap_ms:
                 time.sleep_ms(self.frame_cap_ms - frame_time_ms)
 
-    def _draw_loading_screen(self):
+    def _print_frame_time(self, frame_time_ms: int):
+        frame = f"Frame Time: {frame_time_ms}ms (update: {self.update_ms}ms x{self.steps}, " \
+                f"draw: {self.draw_ms}ms, present: {self.present_ms}ms)"
+        draw_stats = draw_profile_frame and draw_profile_frame()
+        if draw_stats:
+            # Breakdown per caller is in the gint overlay (F11) and GINT_PROFILE_OUT
+            calls, pixels, draw_ms = draw_stats
+            device_ms = device_frame_ms()
+            device = f", device est.: {device_ms:.1f}ms" if device_ms is not None else ""
+            print(f"{frame}, draw calls: {calls}, {pixels} px, {draw_ms:.1f}ms{device}")
+        else:
+            print(frame)
+
+    def _log_scene_heap(self, scene_stats: Optional[Dict[str, int]]):
+        """Logs the heap peaks of the scene left and of the subsystems (simulator only)."""
+        if not scene_stats or not self._heap_scene_name:
+            return  # Nothing, or a scene this Game did not start
+        scopes = heap_stats()['scopes']
+        subsystems = ", ".join("{} {}B".format(name, scopes[name]['peak'])
+                               for name in HEAP_SUBSYSTEMS if name in scopes)
+        log("-C{} heap peak {}B (+{}B), {}".format(
+            self._heap_scene_name, scene_stats['peak'], scene_stats['grow'], subsystems))
+
+    def _draw_loading_screen(self, progress: Optional[float] = None):
         dclear(C_BLACK)
         text = "Loading..."
         w, h = len(text) * 8, 16 # Simple size calculation
         dtext((DWIDTH - w) // 2, (DHEIGHT - h) // 2, C_WHITE, text)
+        if progress is not None:
+            x, y = (DWIDTH - LOAD_BAR_WIDTH) // 2, (DHEIGHT + h) // 2 + 8
+            drect_border(x, y, x + LOAD_BAR_WIDTH - 1, y + 7, C_NONE, 1, C_WHITE)
+            if progress > 0:
+                drect(x + 2, y + 2, x + 1 + int((LOAD_BAR_WIDTH - 4) * min(progress, 1.0)), y + 5, C_WHITE)
         dupdate()
+
+    def _preload(self, scene: Scene):
+        """
+        Runs the load jobs of scene.preload() one step at a time. Each time
+        LOAD_SLICE_MS of work is done, a frame of the progress bar is shown.
+        """
+        jobs = scene.preload()
+        if not jobs:
+            return
+        done = 0
+        slice_start = time.ticks_ms()
+        for job in jobs:
+            for progress in job:
+                if time.ticks_diff(time.ticks_ms(), slice_start) >= LOAD_SLICE_MS:
+                    self._draw_loading_screen((done + (progress or 0.0)) / len(jobs))
+                    slice_start = time.ticks_ms()
+            done += 1
     
     def change_scene(self, new_scene_class, **kwargs):
         """Replaces the entire scene stack with a new scene."""
         self._draw_loading_screen()
         while self.scenes:
             self.scenes.pop().destroy()
-        
-        gc.collect()
-        log("+CScene_{}".format(new_scene_class.__name__), gc.mem_free(), " B")
-
-        new_scene = new_scene_class(self, **kwargs)
-
-        self.scenes.append(new_scene)
-        new_scene.create()
-        log("+CScene: ", gc.mem_free(), " B")
-
+        self._suspended.clear()
+        self._start_scene(new_scene_class, kwargs)
 
-        # Ideally you'd done this :
-        # """Stops the current scene and starts a new one."""
-        # if self.scenes:
-        #     self.scenes[-1].destroy()
-        #     self.scenes.pop()
-        
-        # new_scene = new_scene_class(self, **kwargs)
-        # self.scenes.append(new_scene)
-        # new_scene.create()
-    
-    # def change_scene(self, new_scene_class, **kwargs):
-    #     """Replaces the current scene with a new one."""
-    #     self.pop_scene()
-    #     self.push_scene(new_scene_class, **kwargs)
-    
     def call_scene(self, new_scene_class, **kwargs):
-        # For memory safety, we will treat 'call' like 'change'.
-        # A true stack is too risky on this hardware.
-        self.change_scene(new_scene_class, **kwargs)
-
-    # def push_scene(self, new_scene_class, **kwargs):
-    #     """Helper method to create and add a new scene."""
-    #     if self.scenes:
-    #         # If there's a scene already, don't destroy it, just pause it.
-    #         pass
-        
-    #     with MemoryProfiler("Scene_{}".format(new_scene_class.__name__)):
-    #         new_scene = new_scene_class(self, **kwargs)
-    #         self.scenes.append(new_scene)
-    #         new_scene.create()
-
-    # def pop_scene(self):
-    #     """Removes the top scene from the stack, resuming the one below it."""
-    #     if self.scenes:
-    #         top_scene = self.scenes.pop()
-    #         top_scene.destroy()
-    #         del top_scene
-    #         gc.collect()
-        
-        # If the stack becomes empty, the game loop will naturally end.
+        """Starts a scene that will return to the current one (menu, shop, battle)."""
+        self.push_scene(new_scene_class, **kwargs)
+
+    def push_scene(self, new_scene_class, **kwargs):
+        """
+        Starts a new scene on top of the current one. The current scene is not
+        kept alive: it packs its state in a bytes snapshot and frees its assets,
+        so the stack costs no more memory than a change_scene().
+        """
         if self.scenes:
-            self.scenes[-1].resume()
-        else:
+            scene = self.scenes.pop()
+            self._suspended.append((type(scene), scene._kwargs, scene.suspend()))
+            del scene
+        self._start_scene(new_scene_class, kwargs)
+
+    def pop_scene(self):
+        """Ends the current scene and restores the suspended scene below it."""
+        while self.scenes:
+            self.scenes.pop().destroy()
+        if not self._suspended:
             # If the stack is empty, the game ends.
             self.running = False
+            return
+        scene_class, kwargs, snapshot = self._suspended.pop()
+        self._start_scene(scene_class, kwargs, snapshot)
+
+    def has_suspended_scene(self) -> bool:
+        """True when pop_scene() has a scene to go back to."""
+        return bool(self._suspended)
 
+    def _start_scene(self, scene_class, kwargs: Dict[str, Any], snapshot: Optional[bytes] = None):
+        """Creates a scene, or restores it from its snapshot, as the running scene."""
+        gc.collect()
+        if heap_scene: self._log_scene_heap(heap_scene(None))
+        scene_name = "Scene_{}".format(scene_class.__name__)
+        log("+C{}".format(scene_name), gc.mem_free(), " B")
+
+        with track_heap(scene_name + (".create" if snapshot is None else ".restore")):
+            new_scene = scene_class(self, **kwargs)
+            self._preload(new_scene)
+
+            self.scenes.append(new_scene)
+            if snapshot is None:
+                new_scene.create()
+            else:
+                new_scene.restore(snapshot)
+                new_scene.resume()
+        log("+CScene: ", gc.mem_free(), " B")
+        if heap_scene and self.scenes:
+            # create() may have changed scene again; account to the one running
+            self._heap_scene_name = "Scene_{}".format(type(self.scenes[-1]).__name__)
+            heap_scene(self._heap_scene_name)
 
     def return_scene(self):
-        # On this device, returning always goes back to the map.
+        """Goes back to the suspended scene, or to the map when there is none."""
+        if self._suspended:
+            self.pop_scene()
+            return
         from cpgame.game_scenes.scene_map import SceneMap
         self.change_scene(SceneMap)
     
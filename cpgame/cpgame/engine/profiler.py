@@ -3,6 +3,10 @@
 
 import gc
 from cpgame.engine.logger import log
+try:
+    from gint import heap_scope # Simulator only
+except ImportError:
+    heap_scope = None
 
 # --- GLOBAL DEBUG FLAG ---
 # Set this to False for "release" builds to disable all profiling.
@@ -18,6 +22,7 @@ class MemoryProfiler:
     def __init__(self, name: str):
         self.name = name
         self.start_mem = 0
+        self._heap = None
 
     def __enter__(self):
         if not DEBUG_MEMORY:
@@ -27,10 +32,17 @@ class MemoryProfiler:
         gc.collect()
         self.start_mem = gc.mem_alloc()
         log("+{} {}B".format(self.name, self.start_mem))
+        if heap_scope:
+            # The simulator also keeps the peak of the block
+            self._heap = heap_scope(self.name)
+            self._heap.__enter__()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if not DEBUG_MEMORY:
             return
+        if self._heap:
+            self._heap.__exit__(exc_type, exc_val, exc_tb)
+            self._heap = None
 
         # Collect any garbage created within the block before the final measurement
         gc.collect()
@@ -39,6 +51,24 @@ class MemoryProfiler:
         
         log("-{} {}B = {}B".format(self.name, end_mem, delta))
 
+class _NoHeapScope:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+_NO_HEAP_SCOPE = _NoHeapScope()
+
+def track_heap(name: str):
+    """
+    Accounts the heap used inside a `with` block to a subsystem ("assets",
+    "windows", "data") in the simulator's heap emulator. Free on the device.
+    """
+    if heap_scope is None:
+        return _NO_HEAP_SCOPE
+    return heap_scope(name)
+
 def profile_memory(name: str):
     """Decorator version of the profiler (less flexible for our needs but good to have)."""
     def decorator(func):
@@ -3,12 +3,43 @@ import gc
 
 import gint
 
+try:
+    from gint import keysnapshot  # Simulator only
+except ImportError:
+    keysnapshot = None
+
+# Keys read by InputManager, for gint builds without keysnapshot()
+INPUT_KEYS = (
+    gint.KEY_UP, gint.KEY_DOWN, gint.KEY_LEFT, gint.KEY_RIGHT, gint.KEY_EXE,
+    gint.KEY_MENU, gint.KEY_EXIT, gint.KEY_SHIFT, gint.KEY_EXP,
+    gint.KEY_0, gint.KEY_1, gint.KEY_2, gint.KEY_3, gint.KEY_4,
+    gint.KEY_5, gint.KEY_6, gint.KEY_7, gint.KEY_8, gint.KEY_9,
+    gint.KEY_EQUALS, gint.KEY_LEFTPAR,
+)
+
+def _keysnapshot():
+    """keysnapshot() built from one keydown()/keypressed()/keyreleased() per key"""
+    down = pressed = released = 0
+    for key in INPUT_KEYS:
+        if gint.keydown(key):
+            down |= 1 << key
+        if gint.keypressed(key):
+            pressed |= 1 << key
+        if gint.keyreleased(key):
+            released |= 1 << key
+    return down, pressed, released
+
 class InputManager:
     """
     A class to poll and hold a snapshot of the input state for a single frame.
     Mimics the concept of `this.input` in Phaser.
     """
     def __init__(self):
+        # Key masks of the frame, bit k is gint key code k
+        self.held: int = 0
+        self.pressed: int = 0
+        self.released: int = 0
+
         self.dx: int = 0
         self.dy: int = 0
 
@@ -40,48 +71,51 @@ class InputManager:
         """Polls the hardware. This should be called once per logic update."""
         gint.cleareventflips()
         gint.clearevents()
-        # Poll continuous state (`keydown`)
-        self.dx = gint.keydown(gint.KEY_RIGHT) - gint.keydown(gint.KEY_LEFT)
-        self.dy = gint.keydown(gint.KEY_DOWN) - gint.keydown(gint.KEY_UP)
+        held, pressed, released = (keysnapshot or _keysnapshot)()
+        self.held, self.pressed, self.released = held, pressed, released
+
+        # Continuous state (`keydown`)
+        self.dx = (held >> gint.KEY_RIGHT & 1) - (held >> gint.KEY_LEFT & 1)
+        self.dy = (held >> gint.KEY_DOWN & 1) - (held >> gint.KEY_UP & 1)
         
-        # Poll one-shot press state (`keypressed`)
-        self.up = gint.keypressed(gint.KEY_UP)
-        self.down = gint.keypressed(gint.KEY_DOWN)
-        self.left = gint.keypressed(gint.KEY_LEFT)
-        self.right = gint.keypressed(gint.KEY_RIGHT)
-        self.interact = gint.keypressed(gint.KEY_EXE)
-        self.menu = gint.keypressed(gint.KEY_MENU)
-        self.exit = gint.keypressed(gint.KEY_EXIT)
-        self.shift = gint.keypressed(gint.KEY_SHIFT)
+        # One-shot press state (`keypressed`)
+        self.up = bool(pressed >> gint.KEY_UP & 1)
+        self.down = bool(pressed >> gint.KEY_DOWN & 1)
+        self.left = bool(pressed >> gint.KEY_LEFT & 1)
+        self.right = bool(pressed >> gint.KEY_RIGHT & 1)
+        self.interact = bool(pressed >> gint.KEY_EXE & 1)
+        self.menu = bool(pressed >> gint.KEY_MENU & 1)
+        self.exit = bool(pressed >> gint.KEY_EXIT & 1)
+        self.shift = bool(pressed >> gint.KEY_SHIFT & 1)
 
         # Numpad
-        self.nexp = gint.keypressed(gint.KEY_EXP)
-        self.n0 = gint.keypressed(gint.KEY_0)
-        self.n1 = gint.keypressed(gint.KEY_1)
-        self.n2 = gint.keypressed(gint.KEY_2)
-        self.n3 = gint.keypressed(gint.KEY_3)
-        self.n4 = gint.keypressed(gint.KEY_4)
-        self.n5 = gint.keypressed(gint.KEY_5)
-        self.n6 = gint.keypressed(gint.KEY_6)
-        self.n7 = gint.keypressed(gint.KEY_7)
-        self.n8 = gint.keypressed(gint.KEY_8)
-        self.n9 = gint.keypressed(gint.KEY_9) 
-
-        if gint.keydown(gint.KEY_EQUALS):
+        self.nexp = bool(pressed >> gint.KEY_EXP & 1)
+        self.n0 = bool(pressed >> gint.KEY_0 & 1)
+        self.n1 = bool(pressed >> gint.KEY_1 & 1)
+        self.n2 = bool(pressed >> gint.KEY_2 & 1)
+        self.n3 = bool(pressed >> gint.KEY_3 & 1)
+        self.n4 = bool(pressed >> gint.KEY_4 & 1)
+        self.n5 = bool(pressed >> gint.KEY_5 & 1)
+        self.n6 = bool(pressed >> gint.KEY_6 & 1)
+        self.n7 = bool(pressed >> gint.KEY_7 & 1)
+        self.n8 = bool(pressed >> gint.KEY_8 & 1)
+        self.n9 = bool(pressed >> gint.KEY_9 & 1)
+
+        if held >> gint.KEY_EQUALS & 1:
             self._todo_debug_trace() 
 
-        if gint.keydown(gint.KEY_LEFTPAR):
+        if held >> gint.KEY_LEFTPAR & 1:
             self._todo_print_trace() 
 
     def is_repeat(self, code: str):
         if code == 'down':
-            return gint.keydown(gint.KEY_DOWN) and not self.down
+            return bool(self.held >> gint.KEY_DOWN & 1) and not self.down
         if code == 'up':
-            return gint.keydown(gint.KEY_UP) and not self.up
+            return bool(self.held >> gint.KEY_UP & 1) and not self.up
         if code == 'right':
-            return gint.keydown(gint.KEY_RIGHT) and not self.right
+            return bool(self.held >> gint.KEY_RIGHT & 1) and not self.right
         if code == 'left':
-            return gint.keydown(gint.KEY_LEFT) and not self.left
+            return bool(self.held >> gint.KEY_LEFT & 1) and not self.left
         
         return False
 
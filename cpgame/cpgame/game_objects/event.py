@@ -49,9 +49,7 @@ class GameEvent(GameCharacter):
 
     def _conditions_met(self, page: Dict) -> bool:
         """Checks if the conditions for an event page are met."""
-        from cpgame.modules.datamanager import DataObject
-        p = DataObject(page)
-        c = p.get('conditions')
+        c = page.get('conditions')
 
         if not c:
             return True
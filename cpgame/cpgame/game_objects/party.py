@@ -251,7 +251,7 @@ class GameParty(GameUnit):
 
     def setup_battle_test_items(self) -> None:
         if JRPG.data and JRPG.data.items:
-            for name, item in JRPG.data.items.all().items():
+            for name, item in JRPG.data.items.iter_all():
                 if item and not item.get('name'):
                     self.gain_item(item, self.max_item_number(item))
 
@@ -38,13 +38,19 @@ class MenuScene(Scene):
             if self.selected_index == 0:
             #     self.game.change_scene(TemplarScene)
             # elif self.selected_index == 1:
-                self.game.change_scene(JRPG_BootScene)
+                if self.game.has_suspended_scene():
+                    self.game.return_scene() # Opened from the map: back to the game
+                else:
+                    self.game.change_scene(JRPG_BootScene)
             elif self.selected_index == 1:
                 self.game.running = False # Signal the game to exit
         
-        # Also allow exiting with the EXIT key.
-        if self.input.exit:
-            self.game.running = False
+        # Also allow exiting with the EXIT key, or closing the menu opened from the map.
+        elif self.input.exit:
+            if self.game.has_suspended_scene():
+                self.game.return_scene()
+            else:
+                self.game.running = False
 
     def create(self):
         # return super().create()
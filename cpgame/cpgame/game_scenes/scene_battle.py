@@ -84,9 +84,7 @@ class SceneBattle(SceneBase):
         if not self.enemy:
             log("ERROR: Could not load enemy data. Aborting battle.")
             if JRPG.game:
-                    self.draw_loading_screen()
-                    from cpgame.game_scenes.scene_map import SceneMap
-                    JRPG.game.change_scene(SceneMap)
+                    JRPG.game.return_scene()
             return
             
         self._state = "PLAYER_TURN"
@@ -170,11 +168,8 @@ class SceneBattle(SceneBase):
             JRPG.objects.variables[self._result_variable_id] = result
     
         # Return to the previous scene (the map)
-        # self.game.return_scene()
         if JRPG.game:
-            self.draw_loading_screen()
-            from cpgame.game_scenes.scene_map import SceneMap
-            JRPG.game.change_scene(SceneMap)
+            JRPG.game.return_scene()
 
     def update_player_command_selection(self):
         if self.input.up: self._command_index = max(0, self._command_index - 1)
@@ -1,8 +1,18 @@
 # cpgame/game_scenes/scene_map.py
 import gc
+import struct
 import sys
 import time
+from array import array
 from gint import *
+try:
+    from gint import TileAtlas # Simulator only
+except ImportError:
+    TileAtlas = None
+try:
+    from gint import dtiles # Simulator only, no PythonExtra version yet
+except ImportError:
+    dtiles = None
 try:
     from typing import Optional, List, Set, Tuple,Dict, Any
 except:
@@ -11,6 +21,8 @@ except:
 from cpgame.systems.jrpg import JRPG
 # from cpgame.engine.scene import Scene
 from cpgame.engine.systems import Camera
+from cpgame.engine.assets import run_job
+from cpgame.engine.profiler import track_heap
 # from cpgame.game_objects.actor import GameActor
 from cpgame.game_scenes._scenes_base import SceneBase
 
@@ -28,7 +40,9 @@ from cpgame.engine.logger import log
 from cpgame.engine.text_parser import parse_text_codes
 
 TILE_SIZE = 8
+TILE_BATCH = 256  # Tiles per dtiles() call
 MOVE_DELAY = 0.15
+SNAPSHOT_FORMAT = "<iiiif"  # camera x, y, camera block x, y, move cooldown
 
 
 class WindowProxy:
@@ -40,8 +54,10 @@ class WindowProxy:
         self.kwargs = kwargs
         self.instance = None
         self.module = None
+        self._heap = track_heap("windows")
 
     def __enter__(self):
+        self._heap.__enter__()
         # Import module dynamically
         try:
             self.module = __import__(self.module_path, None, None, (self.class_name,))
@@ -51,6 +67,7 @@ class WindowProxy:
             return self.instance
         except Exception as e:
             log(f"WindowProxy error: {e}")
+            self._heap.__exit__(type(e), e, None)
             raise
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -81,44 +98,7 @@ class WindowProxy:
             del self.module
 
         gc.collect()
-
-class OptimizedTileCache:
-    """Optimized tile rendering with batching."""
-    __slots__ = ('_batch_data', '_batch_count', '_last_tileset')
-
-    def __init__(self):
-        self._batch_data = bytearray(256)  # Pre-allocated buffer
-        self._batch_count = 0
-        self._last_tileset = None
-
-    def add_tile(self, screen_x, screen_y, tile_id):
-        """Add tile to batch render queue."""
-        if self._batch_count < 64:  # Max batch size
-            idx = self._batch_count * 4
-            self._batch_data[idx] = screen_x & 0xFF
-            self._batch_data[idx + 1] = screen_y & 0xFF
-            self._batch_data[idx + 2] = tile_id & 0xFF
-            self._batch_data[idx + 3] = (tile_id >> 8) & 0xFF
-            self._batch_count += 1
-            return True
-        return False
-
-    def flush(self, tileset):
-        """Render all batched tiles."""
-        if not self._batch_count or not tileset:
-            return
-
-        for i in range(self._batch_count):
-            idx = i * 4
-            screen_x = self._batch_data[idx]
-            screen_y = self._batch_data[idx + 1]
-            tile_id = self._batch_data[idx + 2] | (self._batch_data[idx + 3] << 8)
-
-            src_x = (tile_id & 15) << 5  # (tile_id % 16) * TILE_SIZE, optimized
-            src_y = (tile_id >> 4) << 5  # (tile_id // 16) * TILE_SIZE, optimized
-            dsubimage(screen_x, screen_y, tileset.img, src_x, src_y, TILE_SIZE, TILE_SIZE)
-
-        self._batch_count = 0
+        self._heap.__exit__(exc_type, exc_val, exc_tb)
 
 class SceneMap(SceneBase):
     """This class performs the map screen processing."""
@@ -130,6 +110,9 @@ class SceneMap(SceneBase):
         self.map = JRPG.objects.map
         self.player = JRPG.objects.player
         self.tileset = None
+        self._tileset_id = None
+        self.atlas = None
+        self.tile_batch = array('h', bytes(6 * TILE_BATCH)) if dtiles else None  # (x, y, tile_id) triples
         self.move_cooldown = 0.0
         
         # Rendering
@@ -149,11 +132,36 @@ class SceneMap(SceneBase):
     def create(self):
         log("SceneMap: Creating...")
         # Load assets required for this scene
-        self.tileset = self.assets.get_tileset(self.map.tileset_id) # 'jrpg'
+        self._load_tileset()
         if not self.tileset:
             raise Exception(f"Failed to load '{self.map.tileset_id}' tileset.")
 
         # Create the windows managed by this scene
+        self._create_windows()
+        self._update_camera_block()
+        self.full_redraw_needed = True
+
+    def suspend(self) -> bytes:
+        """Called when a menu, shop or battle opens. Keeps the view, frees the tileset and windows."""
+        log("SceneMap: Suspending...")
+        snapshot = struct.pack(SNAPSHOT_FORMAT, self.camera.x, self.camera.y,
+                               self.cam_block_x, self.cam_block_y, self.move_cooldown)
+        self.destroy()
+        return snapshot
+
+    def restore(self, snapshot: bytes):
+        """Called instead of create() when returning from the scene that suspended this one."""
+        log("SceneMap: Restoring...")
+        self._load_tileset()
+        if not self.tileset:
+            raise Exception(f"Failed to load '{self.map.tileset_id}' tileset.")
+        self._create_windows()
+        (self.camera.x, self.camera.y, self.cam_block_x, self.cam_block_y,
+         self.move_cooldown) = struct.unpack(SNAPSHOT_FORMAT, snapshot)
+        self._update_camera_block() # In case an event moved the player meanwhile
+
+    def _create_windows(self):
+        """Creates the windows managed by this scene."""
         self.message_window = WindowMessage()
         self.hud_window._needs_redraw = True
         self.number_input_window = WindowNumberInput(
@@ -176,9 +184,31 @@ class SceneMap(SceneBase):
             # self.name_edit_window, self.name_input_window,
             # self.choice_window
         ]
-        
-        self._update_camera_block()
-        self.full_redraw_needed = True
+
+    def preload(self):
+        """Loads the tileset before create() or restore(), with a progress bar on long loads."""
+        return [self._load_tileset_steps()]
+
+    def _load_tileset(self):
+        """Loads the map tileset and, when available, its pre-sliced tile atlas."""
+        run_job(self._load_tileset_steps())
+
+    def _load_tileset_steps(self):
+        if self.tileset and self._tileset_id == self.map.tileset_id:
+            return # Preloaded, or a transfer to a map with the same tileset
+        tileset = yield from self.assets.pin_steps(self.map.tileset_id) # 'jrpg'
+        self._release_tileset() # After pin(): a tileset shared with the previous map stays loaded
+        self._tileset_id = self.map.tileset_id
+        self.tileset = tileset
+        if self.tileset and TileAtlas:
+            # Tile ids are laid out 16 per row, whatever the image width
+            self.atlas = TileAtlas(self.tileset.img, TILE_SIZE, TILE_SIZE, 16)
+
+    def _release_tileset(self):
+        """Drops the tileset reference; it stays cached while the asset budget allows."""
+        if self.tileset:
+            self.tileset = self.atlas = None
+            self.assets.unpin(self._tileset_id)
 
     def resume(self):
         """Called when returning from a child scene (like a menu or shop)."""
@@ -188,7 +218,7 @@ class SceneMap(SceneBase):
     def destroy(self):
         """Called when this scene is being replaced. Unloads assets."""
         log("SceneMap: Destroying...")
-        self.assets.unload(self.map.tileset_id) # self.map.tileset_id  # 'jrpg'
+        self._release_tileset()
         for w in self._windows: w.destroy()
         self._windows.clear()
         self.dirty_tiles.clear()
@@ -365,8 +395,8 @@ class SceneMap(SceneBase):
             msg.clear()
             return
 
-        # Unload tileset temporarily to save memory
-        self.assets.unload(self.map.tileset_id) # 'jrpg'
+        # Release the tileset while the window is open, evicted if the budget needs it
+        self._release_tileset()
         
         # Use keyword arguments for proper instantiation
         with WindowProxy('cpgame.game_windows.window_name_edit', 'WindowNameEdit') as name_edit_window:
@@ -404,7 +434,7 @@ class SceneMap(SceneBase):
 
 
         # Reload tileset
-        self.tileset = self.assets.get_tileset(self.map.tileset_id) # 'jrpg'
+        self._load_tileset()
         self.full_redraw_needed = True
         self.hud_window._needs_redraw = True
 
@@ -415,8 +445,8 @@ class SceneMap(SceneBase):
         
         msg = JRPG.objects.message
 
-        # Temporarily unload tileset
-        self.assets.unload(self.map.tileset_id) # 'jrpg'
+        # Release the tileset while the window is open, evicted if the budget needs it
+        self._release_tileset()
 
         with WindowProxy('cpgame.game_windows.window_choice_list', 'WindowChoiceList', self._windows[1]) as choice_window:  # message_window
             choice_window.set_handler('ok', self._on_choice_confirmed)
@@ -443,7 +473,7 @@ class SceneMap(SceneBase):
                     time.sleep_ms(self.game.frame_cap_ms - frame_time_ms)
 
         # Reload tileset
-        self.tileset = self.assets.get_tileset(self.map.tileset_id) # 'jrpg'
+        self._load_tileset()
         self.full_redraw_needed = True
         self.hud_window._needs_redraw = True
 
@@ -683,6 +713,10 @@ class SceneMap(SceneBase):
         base_x = self.cam_block_x * self.screen_tiles_x
         base_y = self.cam_block_y * self.screen_tiles_y
 
+        if self.tile_batch:
+            self._draw_viewport_batched(base_x, base_y)
+            return
+
         # Iterate one tile beyond the screen edge to avoid pop-in
         for ry in range(self.screen_tiles_y + 1):
             for rx in range(self.screen_tiles_x + 1):
@@ -691,6 +725,48 @@ class SceneMap(SceneBase):
                 if 0 <= map_y < self.map.height and 0 <= map_x < self.map.width:
                     self._draw_tile_at(map_x, map_y)
 
+    def _draw_viewport_batched(self, base_x: int, base_y: int):
+        """_draw_viewport() through dtiles(): same tiles in the same order, in a few calls."""
+        tiles = self.tile_batch
+        size = len(tiles)
+        img = self.tileset.img # type: ignore
+        game_map = self.map
+        events = game_map.events
+        top_bound = self._map_render_offset_y - TILE_SIZE
+        cam_x = self.camera.x
+        cam_y = self.camera.y - self._map_render_offset_y
+
+        n = 0
+        for map_y in range(max(0, base_y), min(game_map.height, base_y + self.screen_tiles_y + 1)):
+            screen_y = map_y * TILE_SIZE - cam_y
+            # Culling: Don't draw if it's off-screen
+            if not (top_bound < screen_y < DHEIGHT):
+                continue
+            for map_x in range(max(0, base_x), min(game_map.width, base_x + self.screen_tiles_x + 1)):
+                screen_x = map_x * TILE_SIZE - cam_x
+                if not (-TILE_SIZE < screen_x < DWIDTH):
+                    continue
+                tiles[n] = screen_x
+                tiles[n + 1] = screen_y
+                tiles[n + 2] = game_map.tile_id(map_x, map_y)
+                n += 3
+
+                # Object on top, if any
+                event = events.get((map_x, map_y))
+                if event and event.tile_id > 0:
+                    if n == size:
+                        dtiles(img, TILE_SIZE, TILE_SIZE, 16, tiles)
+                        n = 0
+                    tiles[n] = screen_x
+                    tiles[n + 1] = screen_y
+                    tiles[n + 2] = event.tile_id
+                    n += 3
+                if n == size:
+                    dtiles(img, TILE_SIZE, TILE_SIZE, 16, tiles)
+                    n = 0
+        # Tile ids are laid out 16 per row
+        dtiles(img, TILE_SIZE, TILE_SIZE, 16, tiles, n // 3)
+
     def _draw_tile_at(self, map_x: int, map_y: int):
         """Redraws a single tile on the map, including any object on it."""
         screen_x, screen_y = self._world_to_screen(map_x, map_y)
@@ -702,16 +778,24 @@ class SceneMap(SceneBase):
         if not (-TILE_SIZE < screen_x < DWIDTH and top_bound < screen_y < bottom_bound):
             return
 
+        atlas = self.atlas
+
         # Draw base map tile
         tile_id = self.map.tile_id(map_x, map_y)
-        src_x = (tile_id % 16) * TILE_SIZE
-        src_y = (tile_id // 16) * TILE_SIZE
-        dsubimage(screen_x, screen_y, self.tileset.img, src_x, src_y, TILE_SIZE, TILE_SIZE) # type: ignore
+        if atlas:
+            dtile(screen_x, screen_y, atlas, tile_id)
+        else:
+            src_x = (tile_id % 16) * TILE_SIZE
+            src_y = (tile_id // 16) * TILE_SIZE
+            dsubimage(screen_x, screen_y, self.tileset.img, src_x, src_y, TILE_SIZE, TILE_SIZE) # type: ignore
 
         # Draw object on top, if any
         event = self.map.events.get((map_x, map_y))
         if event and event.tile_id > 0:
             obj_id = event.tile_id
+            if atlas:
+                dtile(screen_x, screen_y, atlas, obj_id)
+                return
             obj_src_x = (obj_id % 16) * TILE_SIZE
             obj_src_y = (obj_id // 16) * TILE_SIZE
             dsubimage(screen_x, screen_y, self.tileset.img, obj_src_x, obj_src_y, TILE_SIZE, TILE_SIZE) # type: ignore
@@ -34,6 +34,7 @@ class SceneShop(SceneBase):
         # --- State Machine ---
         self._state = "COMMAND"  # COMMAND, BUY, SELL, QUANTITY
         self._active_list = []
+        self._buy_prices = []  # Shop price of each item of _active_list, when buying
         
         # --- UI State ---
         self._command_index = 0
@@ -89,9 +90,7 @@ class SceneShop(SceneBase):
                 self._prepare_sell_list()
             elif self._command_index == 2 or (self._command_index == 1 and self._purchase_only): # Exit
                 if JRPG.game:
-                    self.draw_loading_screen()
-                    from cpgame.game_scenes.scene_map import SceneMap
-                    JRPG.game.change_scene(SceneMap)
+                    JRPG.game.return_scene()
 
     def update_item_selection(self):
         if not self._active_list:
@@ -116,7 +115,7 @@ class SceneShop(SceneBase):
 
         if self.input.is_trigger('confirm'):
             item = self._active_list[self._item_index]
-            can_afford = self._state == 'SELL' or (JRPG.objects and JRPG.objects.party.gold >= item.shop_price)
+            can_afford = self._state == 'SELL' or (JRPG.objects and JRPG.objects.party.gold >= self._buy_prices[self._item_index])
             if can_afford:
                 self._state = "QUANTITY_BUY" if self._state == "BUY" else "QUANTITY_SELL"
                 self._quantity = 1
@@ -188,7 +187,7 @@ class SceneShop(SceneBase):
             can_afford = True
             name = item.name
             if self._state == 'BUY':
-                price = item.shop_price
+                price = self._buy_prices[index]
                 can_afford = (JRPG.objects and JRPG.objects.party.gold >= price)
             else: # SELL
                 price = int(item.price * 0.8)
@@ -231,6 +230,7 @@ class SceneShop(SceneBase):
 
     def _prepare_buy_list(self):
         self._active_list = []
+        self._buy_prices = []
         if not JRPG.data:
             return
 
@@ -238,8 +238,7 @@ class SceneShop(SceneBase):
             proxy = [JRPG.data.items, JRPG.data.weapons, JRPG.data.armors][item_type]
             with proxy.load(item_id) as item_data:
                 if item_data:
-                    # Store price directly on a temporary attribute for convenience
-                    item_data.shop_price = price_override if price_override > 0 else item_data.get('price', 0)
+                    self._buy_prices.append(price_override if price_override > 0 else item_data.get('price', 0))
                     self._active_list.append(item_data)
         self._item_index = self._top_item_index = 0
 
@@ -255,7 +254,7 @@ class SceneShop(SceneBase):
         
         item = self._active_list[self._item_index]
         if self._state == 'QUANTITY_BUY':
-            price = item.shop_price
+            price = self._buy_prices[self._item_index]
             # If price is 0, they can take 99. Otherwise, calculate based on gold.
             return min(JRPG.objects.party.gold // price if price > 0 else 99, 99)
         elif self._state == 'QUANTITY_SELL': # SELL
@@ -268,7 +267,7 @@ class SceneShop(SceneBase):
 
         item = self._active_list[self._item_index]
         if self._state == 'QUANTITY_BUY':
-            price = item.shop_price
+            price = self._buy_prices[self._item_index]
             JRPG.objects.party.lose_gold(price * self._quantity)
             JRPG.objects.party.gain_item(item, self._quantity)
         elif self._state == "QUANTITY_SELL": # SELL
@@ -0,0 +1,55 @@
+# cpgame/modules/compiled.py
+# Shared by the compiled formats (tablefile, mapfile) and their compilers
+# (data_compiler.py, map_compiler.py): the stamp of the source module stored in
+# each .bin header, so an edited module wins over its stale .bin, and the JSON
+# encoding of the values.
+
+import json
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None  # No CRC on this port, the stamp is checked on the size alone
+
+try:
+    from typing import Any, Tuple
+except:
+    pass
+
+STAMP_CHUNK = 512
+
+def source_stamp(path: str) -> Tuple[int, int]:
+    """(size, CRC-32) of a source module; raises OSError if it doesn't exist."""
+    size = crc = 0
+    buf = bytearray(STAMP_CHUNK)
+    view = memoryview(buf)
+    with open(path, 'rb') as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            size += n
+            if crc32 is not None:
+                crc = crc32(view[:n], crc)
+    return size, crc & 0xFFFFFFFF
+
+def is_fresh(path: str, size: int, crc: int) -> bool:
+    """
+    Whether a .bin compiled from `path` with the stamp (size, crc) is up to
+    date. With no source next to it (only the .bin was shipped), it is.
+    """
+    try:
+        source_size, source_crc = source_stamp(path)
+    except OSError:
+        return True
+    if crc32 is None:
+        return source_size == size
+    return source_size == size and source_crc == crc
+
+def to_json(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'))
+
+def check_round_trip(name: str, key: str, value: Any):
+    """The .bin must read back as it was written: JSON has no tuples nor int keys."""
+    if json.loads(to_json(value)) != value:
+        raise ValueError("{}: '{}' does not survive JSON (tuples or non-str keys?)".format(name, key))
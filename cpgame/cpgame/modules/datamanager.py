@@ -3,12 +3,20 @@
 
 import sys
 import gc
+from cpgame.engine.profiler import track_heap
 
 try:
     from typing import Optional, Any, Dict, List, Union
 except:
     pass
 
+# Read maps from map_NNN.bin when compiled. Off, and no .bin is shipped: the
+# decoded events of map_001 and map_003 hold more heap than the modules
+# (map_bench.py); map_compiler.py is an opt-in tool until they don't
+USE_COMPILED_MAPS = False
+USE_COMPILED_DATA = True  # Read data from <category>.bin (data_compiler.py) when compiled
+CACHE_SIZE = 4            # Objects kept by each data proxy after a get(); 0 disables
+
 def _get_public_attributes(module: Any) -> List[str]:
     """Inspects a module and returns a list of its public data attributes."""
     # A simple heuristic for MicroPython: public data is all-caps.
@@ -70,6 +78,43 @@ class DataProxy:
         del self._instance
         gc.collect()
 
+class ObjectCache:
+    """
+    The last `size` objects loaded by a proxy, least recently used first out,
+    so repeated get() calls on the same ids don't load them again.
+    """
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._objects: Dict[str, Any] = {}
+        self._lru: List[str] = []  # Cached names, least recently used first
+
+    def get(self, name: str, load) -> Any:
+        """Returns the cached object, or load(name) and caches it."""
+        if name in self._objects:
+            self.hits += 1
+            self._lru.remove(name)
+            self._lru.append(name)
+            return self._objects[name]
+        self.misses += 1
+        obj = load(name)
+        if self.size > 0:
+            if len(self._lru) >= self.size:
+                del self._objects[self._lru.pop(0)]
+            self._objects[name] = obj
+            self._lru.append(name)
+        return obj
+
+    def resize(self, size: int):
+        self.size = size
+        while len(self._lru) > size:
+            del self._objects[self._lru.pop(0)]
+
+    def clear(self):
+        self._objects.clear()
+        self._lru.clear()
+
 def _title_case(s: str) -> str:
     """Mimics str.title() for MicroPython: capitalizes first char, lowercases the rest."""
     if not s or len(s) <= 1:
@@ -133,18 +178,112 @@ class DataObject:
     def __repr__(self) -> str:
         return "DataObject({})".format(repr(self._data))
 
+def _to_snake_case(name: str) -> str:
+    """Converts camelCaseString to camel_case_string (the reverse of DataObject's fallback)."""
+    out = ''
+    for char in name:
+        if 'A' <= char <= 'Z':
+            out += '_' + char.lower()
+        else:
+            out += char
+    return out
+
+def _is_field_name(name: str) -> bool:
+    if not isinstance(name, str) or not name or name[0] == '_' or '0' <= name[0] <= '9':
+        return False
+    for char in name:
+        if not ('a' <= char <= 'z' or 'A' <= char <= 'Z' or '0' <= char <= '9' or char == '_'):
+            return False
+    return not hasattr(Record, name)
+
+class Record:
+    """
+    Base of the record classes made by record_class(): one attribute per
+    field, read directly, unlike DataObject.__getattr__. Same read interface
+    as DataObject (get, keys, values, items), and obj.__name__ is the category.
+    """
+    __slots__ = ()
+    category = None
+    _fields = ()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for __name__, fields the record doesn't have and typos
+        if name == '__name__':
+            return self.category
+        raise AttributeError("'{}' record has no attribute '{}'".format(self.category, name))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self):
+        return [key for key in self._fields if hasattr(self, key)]
+
+    def values(self):
+        return [getattr(self, key) for key in self.keys()]
+
+    def items(self):
+        return tuple((key, getattr(self, key)) for key in self.keys())
+
+    def __repr__(self) -> str:
+        return "{}Record({})".format(_title_case(self.category or ''), dict(self.items()))
+
+def _alias(field: str):
+    return property(lambda record: getattr(record, field))
+
+def record_class(category: str, fields) -> Optional[type]:
+    """
+    Makes a Record class with a slot per field, plus snake_case aliases of the
+    camelCase ones (e.g. tileset_id for tilesetId). None if a field can't be
+    an attribute (not an identifier, or a name of Record).
+    """
+    fields = tuple(fields)
+    for field in fields:
+        if not _is_field_name(field):
+            return None
+    namespace = {'__slots__': fields, '_fields': fields, 'category': category}
+    for field in fields:
+        alias = _to_snake_case(field)
+        if alias != field and alias not in fields and _is_field_name(alias):
+            namespace[alias] = _alias(field)
+    return type(_title_case(category) + 'Record', (Record,), namespace)
+
+class RecordClasses:
+    """
+    The record classes of a data category, made when a set of fields is first
+    loaded. Dicts whose fields can't be attributes stay in a DataObject.
+    """
+    def __init__(self, category: str):
+        self.category = category
+        self._classes: Dict[tuple, Any] = {}
+
+    def wrap(self, data: Dict) -> Any:
+        fields = tuple(key for key in data if key != '__name__')
+        cls = self._classes.get(fields)
+        if cls is None:
+            cls = self._classes[fields] = record_class(self.category, fields) or DataObject
+        if cls is DataObject:
+            data['__name__'] = self.category
+            return DataObject(data)
+        record = cls()
+        for key in fields:
+            setattr(record, key, data[key])
+        return record
+
 class ModuleProxy:
     """
     Acts as a proxy for a data module (e.g., actors.py).
     It loads the module's HEADER on creation and provides methods to load
     individual objects from it on demand, with cleanup.
     """
-    def __init__(self, data_category: str, module_path: str = "cpgame.game_data.", name_id = None):
+    def __init__(self, data_category: str, module_path: str = "cpgame.game_data.", name_id = None,
+                 cache_size: int = CACHE_SIZE):
         self.category = data_category
         self.module_path = module_path + self.category
         self.name_id = self.category.upper() if not name_id else name_id#+ "_" # HACK: to avoid the "id" int. Should be removed later.
         self._module = None
         self._header = None
+        self.cache = ObjectCache(cache_size)
+        self.records = RecordClasses(self.category)
         self._load_header()
 
     def _load_header(self):
@@ -160,6 +299,9 @@ class ModuleProxy:
             if mod:
                 _cleanup_module(self.module_path, mod)
 
+    def _load_object(self, object_name: str):
+        return self.cache.get(object_name, self._load_object_from_module)
+
     def _load_object_from_module(self, object_name: str):
         """Loads the full module to retrieve a specific object."""
         if not self._header:
@@ -169,15 +311,14 @@ class ModuleProxy:
         
         try:
             # Import the module to get the specific object
-            self._module = __import__(self.module_path, None, None, (object_name,))
+            with track_heap("data"):
+                self._module = __import__(self.module_path, None, None, (object_name,))
             # return getattr(self._module, object_name)
             data = getattr(self._module, object_name)
-            # Inject the category metadata into the loaded data
             if isinstance(data, dict):
-                data['__name__'] = self.category
-                return DataObject(data)
+                return self.records.wrap(data)
             elif isinstance(data, list):
-                return [DataObject(item) if isinstance(item, dict) else item for item in data]
+                return [self.records.wrap(item) if isinstance(item, dict) else item for item in data]
             return data
             
         except (ImportError, AttributeError):
@@ -194,7 +335,7 @@ class ModuleProxy:
         """
         if type(object_name) == int:
             object_name = self._resolve_name(object_name)
-        return self._load_object_from_module(str(object_name))
+        return self._load_object(str(object_name))
     
     def get_or(self, object_name: Union[str, int], default: Any = None) -> Any:
         """
@@ -204,7 +345,7 @@ class ModuleProxy:
         try:
             if type(object_name) == int:
                 object_name = self._resolve_name(object_name)
-            return self._load_object_from_module(str(object_name))
+            return self._load_object(str(object_name))
         except:
             return default
 
@@ -215,7 +356,7 @@ class ModuleProxy:
         """
         if type(object_name) == int:
             object_name = self._resolve_name(object_name)
-        return DataProxy(self._load_object_from_module, str(object_name))
+        return DataProxy(self._load_object, str(object_name))
     
     def exists(self, object_name: Union[str, int]) -> bool:
         """
@@ -233,31 +374,38 @@ class ModuleProxy:
         Loads all exported objects from the module and returns them as a dictionary.
         NOTE: This does not auto-cleanup memory. Use with caution on memory-constrained systems.
         """
+        return dict(self.iter_all())
+
+    def iter_all(self):
+        """
+        Yields (name, object) for every exported object, one at a time, with
+        the same objects as all(). The cache is left as it is.
+        """
         if not self._header:
-            return {}
-        
-        result = {}
+            return
         exports = self._header.get('exports', [])
         
         # Import the entire module once to get all objects
         try:
             self._module = __import__(self.module_path, None, None, tuple(exports))
-            
-            for object_name in exports:
-                try:
-                    data = getattr(self._module, object_name)
-                    # Inject the category metadata into the loaded data
-                    if isinstance(data, dict):
-                        data['__name__'] = self.category
-                    result[object_name] = data
-                except AttributeError:
-                    # Skip objects that can't be found
-                    pass
-                    
         except ImportError:
             print("DataManager Error: Failed to load module for all() method:", self.module_path)
-            
-        return result
+            return
+
+        for object_name in exports:
+            try:
+                data = getattr(self._module, object_name)
+            except AttributeError:
+                # Skip objects that can't be found
+                continue
+            # Inject the category metadata into the loaded data
+            if isinstance(data, dict):
+                data['__name__'] = self.category
+            yield object_name, data
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Cache hits (module import avoided) and misses since the start."""
+        return {'hits': self.cache.hits, 'misses': self.cache.misses, 'size': self.cache.size}
 
     def __del__(self):
         """Ensures the loaded module is cleaned up when the proxy is destroyed."""
@@ -318,45 +466,64 @@ class ClassProxy:
 class MapProxy:
     """
     A proxy that lazy-loads ModuleProxy instances for individual maps on demand.
-    Acts like a dictionary where keys are map IDs.
+    Acts like a dictionary where keys are map IDs. Compiled maps are read from
+    their MapFile instead, which has the same load()/exists() interface.
     """
     def __init__(self):
-        self._proxies: Dict[int, ModuleProxy] = {}
+        self._proxies: Dict[int, Any] = {}
 
-    def __getitem__(self, map_id: int) -> ModuleProxy:
+    def __getitem__(self, map_id: int) -> Any:
         """
-        Gets the ModuleProxy for a given map ID, creating it if it doesn't exist.
+        Gets the proxy for a given map ID, creating it if it doesn't exist.
         """
         if map_id not in self._proxies:
             # print("Creating proxy for Map ID:", map_id)
             map_name = "map_{:03d}".format(map_id)
-            module_path = "cpgame.game_data.maps."
-            self._proxies[map_id] = ModuleProxy(map_name, module_path=module_path)
+            proxy = None
+            if USE_COMPILED_MAPS:
+                from cpgame.modules.mapfile import MapFile
+                proxy = MapFile.find(map_name)
+            if proxy is None:
+                module_path = "cpgame.game_data.maps."
+                # GameMap keeps the properties it loads, no need to cache them twice
+                proxy = ModuleProxy(map_name, module_path=module_path, cache_size=0)
+            self._proxies[map_id] = proxy
         return self._proxies[map_id]
 
     def clear(self):
         """Clears all cached map proxies."""
         self._proxies.clear()
 
+def _data_proxy(data_category: str, name_id = None, cache_size: int = CACHE_SIZE) -> Any:
+    """The compiled table of a data category if there is one, else its ModuleProxy."""
+    if USE_COMPILED_DATA:
+        from cpgame.modules.tablefile import TableFile
+        table = TableFile.find(data_category, name_id, cache_size)
+        if table is not None:
+            return table
+    return ModuleProxy(data_category, name_id=name_id, cache_size=cache_size)
+
 class DataManager:
     """
     A central manager for accessing game data through proxy objects.
     This approach minimizes memory usage by only loading data as needed.
     """
     def __init__(self):
-        self.actors        = ModuleProxy("actors")
-        self.classes       = ModuleProxy("classes")
-        self.skills        = ModuleProxy("skills")
-        self.items         = ModuleProxy("items", name_id="ITEM")
-        self.weapons       = ModuleProxy("weapons", name_id="WEAPON")
-        self.armors        = ModuleProxy("armors", name_id="ARMOR")
-        self.enemies       = ModuleProxy("enemies", name_id="ENEMY")
-        self.troops        = ModuleProxy("troops")
-        self.states        = ModuleProxy("states", name_id="STATE")
+        # No object cache where the caller keeps (and changes) what it gets:
+        # GameActors are kept by GameActors, the party members list by GameParty
+        self.actors        = _data_proxy("actors", cache_size=0)
+        self.classes       = _data_proxy("classes")
+        self.skills        = _data_proxy("skills")
+        self.items         = _data_proxy("items", name_id="ITEM")
+        self.weapons       = _data_proxy("weapons", name_id="WEAPON")
+        self.armors        = _data_proxy("armors", name_id="ARMOR")
+        self.enemies       = _data_proxy("enemies", name_id="ENEMY")
+        self.troops        = _data_proxy("troops")
+        self.states        = _data_proxy("states", name_id="STATE")
         self.animations    = ModuleProxy("animations")
         self.tilesets      = ModuleProxy("tilesets")
         self.common_events = ModuleProxy("common_events")
-        self.system        = ModuleProxy("system")
+        self.system        = _data_proxy("system", cache_size=0)
         self.mapinfos      = ModuleProxy("mapinfos")
 
         # Special object to handle maps
@@ -364,6 +531,11 @@ class DataManager:
     
     def init(self):
         self.setup_battle_test() # TODO: only if test
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Object cache hits and misses of each data proxy, by category."""
+        return {proxy.category: proxy.cache_stats() for proxy in self.__dict__.values()
+                if hasattr(proxy, 'cache_stats')}
     
     def setup_battle_test(self):
         from cpgame.systems.jrpg import JRPG
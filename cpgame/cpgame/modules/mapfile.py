@@ -0,0 +1,132 @@
+# cpgame/modules/mapfile.py
+# Compiled maps (map_NNN.bin, written by map_compiler.py): the tile layer is read
+# into a bytearray and events are decoded one by one, instead of importing the
+# map module with its list of tiles and nested dicts.
+
+import struct
+import json
+from array import array
+from cpgame.engine.logger import log
+from cpgame.engine.profiler import track_heap
+from cpgame.modules.compiled import is_fresh
+from cpgame.modules.datamanager import DataProxy
+
+try:
+    from typing import Optional, Any, Dict, Tuple
+except:
+    pass
+
+# ---- Map format (little-endian)
+# header, tiles (width * height, row by row, 1 or 2 bytes each),
+# event table (one entry per event), event JSON blobs, properties JSON
+MAP_MAGIC = b'GMAP'
+MAP_VERSION = 2
+MAP_HDR_FMT = '<4sBBHHHIIIIII' # magic, version, tile bytes, width, height, event count,
+                               # tiles_off, table_off, props_off, props_len,
+                               # source size, source CRC-32 (compiled.source_stamp)
+MAP_EVENT_FMT = '<HHII'        # x, y, blob_off, blob_len
+MAP_HDR_SIZE = struct.calcsize(MAP_HDR_FMT)
+MAP_EVENT_SIZE = struct.calcsize(MAP_EVENT_FMT)
+MAP_DATA = 'data'
+MAP_EVENTS = 'events'
+MAPS_DIR = __file__.replace('\\', '/').rsplit('/', 2)[0] + '/game_data/maps/'
+
+def _share(value: Any, strings: Dict[str, str]) -> Any:
+    """
+    The decoded value with its strings taken from `strings`: each event is
+    its own json.loads(), and the keys ("code", "parameters", ...) and
+    texts repeated across events are otherwise held once per occurrence.
+    """
+    if isinstance(value, dict):
+        return {strings.setdefault(k, k): _share(v, strings) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_share(v, strings) for v in value]
+    if isinstance(value, str):
+        return strings.setdefault(value, value)
+    return value
+
+class MapFile:
+    """
+    A compiled map, standing in for the map's ModuleProxy: load("data") gives
+    the tile ids (a bytearray, or an array('H') for 16-bit maps), load("events")
+    the event dicts by (x, y), and load(name) any other property. Only the
+    header and the properties stay in memory between loads.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            (magic, version, self._tile_size, self.width, self.height, self._event_count,
+             self._tiles_off, self._table_off, props_off, props_len,
+             self._source_size, self._source_crc) = struct.unpack(
+                 MAP_HDR_FMT, f.read(MAP_HDR_SIZE))
+            if magic != MAP_MAGIC or version != MAP_VERSION:
+                raise ValueError('Bad map header in {}'.format(path))
+            f.seek(props_off)
+            self._properties: Dict[str, Any] = json.loads(f.read(props_len))
+
+    @staticmethod
+    def find(map_name: str) -> Optional['MapFile']:
+        """
+        Opens the compiled version of a map, None if it was not compiled, or
+        compiled by an older map_compiler.py or before the map was last edited.
+        """
+        try:
+            map_file = MapFile(MAPS_DIR + map_name + '.bin')
+        except OSError:
+            return None
+        except ValueError:
+            log("{}.bin has an old format, using {}.py (run map_compiler.py)".format(map_name, map_name))
+            return None
+        if not is_fresh(MAPS_DIR + map_name + '.py', map_file._source_size, map_file._source_crc):
+            log("{}.bin is out of date, using {}.py (run map_compiler.py)".format(map_name, map_name))
+            return None
+        return map_file
+
+    def _read_tiles(self):
+        count = self.width * self.height
+        with open(self.path, 'rb') as f:
+            f.seek(self._tiles_off)
+            tiles = bytearray(count * self._tile_size)
+            f.readinto(tiles)
+        if self._tile_size == 1:
+            return tiles
+        # No memoryview cast on MicroPython, and the file is little-endian anyway
+        wide = array('H')
+        for i in range(0, len(tiles), 2):
+            wide.append(tiles[i] | tiles[i + 1] << 8)
+        return wide
+
+    def _read_events(self) -> Dict[Tuple[int, int], Dict]:
+        events = {}
+        strings = {}
+        with open(self.path, 'rb') as f:
+            f.seek(self._table_off)
+            table = f.read(MAP_EVENT_SIZE * self._event_count)
+            for i in range(self._event_count):
+                x, y, blob_off, blob_len = struct.unpack_from(MAP_EVENT_FMT, table, i * MAP_EVENT_SIZE)
+                f.seek(blob_off)
+                events[(x, y)] = _share(json.loads(f.read(blob_len)), strings)
+        return events
+
+    def get(self, object_name: str) -> Any:
+        """Gets a map property, the tile layer ("data") or the events ("events")."""
+        with track_heap("data"):
+            if object_name == MAP_DATA:
+                return self._read_tiles()
+            if object_name == MAP_EVENTS:
+                return self._read_events()
+        if object_name == 'width':
+            return self.width
+        if object_name == 'height':
+            return self.height
+        if object_name in self._properties:
+            return self._properties[object_name]
+        raise AttributeError("Object '{}' not found in '{}'".format(object_name, self.path))
+
+    def load(self, object_name: str) -> DataProxy:
+        """Same as ModuleProxy.load(): with map_file.load("events") as events: ..."""
+        return DataProxy(self.get, object_name)
+
+    def exists(self, object_name: str) -> bool:
+        return (object_name in (MAP_DATA, MAP_EVENTS, 'width', 'height')
+                or object_name in self._properties)
@@ -17,10 +17,50 @@ except:
 
 
 # ---- PAK Format structs (little-endian)
-HDR_FMT = const('<4sHHII')                # magic, version, count, index_off, reserved
+HDR_FMT = const('<4sHHII')                # magic, version, count, index_off, reserved (v2: data alignment)
 ENT_FMT = const('<32sBBHHHHHIIII')        # name[32], profile,u8,res,u8,cc,u16,w,h,stride,res,u16, plen,u32,dlen,u32, poff,u32, doff,u32
 HDR_SIZE = const(16)
 ENT_SIZE = const(60)
+LOAD_ROWS = const(16)                     # Image rows read per load step
+
+# ---- PAK v2: at index_off, (name hash, entry offset) sorted by hash, then the
+# entries sorted by name. The reserved byte of an entry holds its flags; dlen
+# is the stored size, stride * height once decoded.
+HASH_FMT = const('<II')
+HASH_SIZE = const(8)
+FLAG_RLE = const(1)                       # Data is RLE compressed (P4/P8 images)
+PAK_VERSIONS = (1, 2)
+
+def name_hash(name):
+    """32-bit FNV-1a of an entry name, the key of the v2 hash table."""
+    h = 0x811C9DC5
+    for c in name.encode('ascii') if isinstance(name, str) else name:
+        h = ((h ^ c) * 0x01000193) & 0xFFFFFFFF
+    return h
+
+def rle_decode_steps(src, dst, chunk):
+    """
+    Decodes RLE data into the bytearray `dst`, yielding the progress (0 to 1)
+    every `chunk` output bytes. A control byte n < 128 is followed by n + 1
+    literal bytes; n >= 128 by one byte repeated n - 126 times.
+    """
+    out = 0
+    i = 0
+    total = len(dst)
+    next_yield = chunk
+    while i < len(src):
+        n = src[i]
+        if n < 128:
+            dst[out:out + n + 1] = src[i + 1:i + n + 2]
+            out += n + 1
+            i += n + 2
+        else:
+            dst[out:out + n - 126] = bytes((src[i + 1],)) * (n - 126)
+            out += n - 126
+            i += 2
+        if out >= next_yield:
+            next_yield += chunk
+            yield min(1.0, out / total)
 
 class PakFile:
     """Represents an open PAK file with on-the-fly entry processing"""
@@ -34,6 +74,8 @@ class PakFile:
         self._hdr_buf = None
         self._ent_buf = None
         self._entry_map = None  # Map of name -> entry data for ordered drawing
+        self._version = 1
+        self._entries_off = 0
         self._open()
 
     def _open(self):
@@ -48,10 +90,13 @@ class PakFile:
             self._file.readinto(hdr_mv)
             magic, version, count, index_off, _ = struct.unpack(HDR_FMT, hdr_mv)
             
-            if magic != b'GIPK' or version != 1:
+            if magic != b'GIPK' or version not in PAK_VERSIONS:
                 raise ValueError('Bad PAK header in {}'.format(self.filepath))
             self._count = count
             self._index_off = index_off
+            self._version = version
+            # v2 entries come after the hash table
+            self._entries_off = index_off + (count * HASH_SIZE if version >= 2 else 0)
         except Exception as e:
             print("Error opening PAK file {}: {}".format(self.filepath, e))
             # Ensure file is closed even if header reading fails
@@ -70,30 +115,46 @@ class PakFile:
         if self._dat_buf is None or len(self._dat_buf) < dat_len:
             self._dat_buf = bytearray(dat_len)
 
-    def _load_entry_data(self, palette_off, palette_len, data_off, data_len):
+    def _load_entry_data(self, palette_off, palette_len, data_off, data_len, flags=0, raw_len=0):
         """Load palette and data into buffers, return memoryviews"""
         if not self._file:
             raise RuntimeError("PAK file is not open")
             
-        self._ensure_buffers(palette_len, data_len)
+        if flags & FLAG_RLE:
+            self._ensure_buffers(palette_len, raw_len)
+        else:
+            self._ensure_buffers(palette_len, data_len)
         
         # Read palette using memoryviews
         self._file.seek(palette_off)
         pal_mv = memoryview(self._pal_buf)
         self._file.readinto(pal_mv[:palette_len])
         
+        dat_mv = memoryview(self._dat_buf)
+        if flags & FLAG_RLE:
+            packed = self._read_packed(data_off, data_len)
+            for _ in rle_decode_steps(packed, dat_mv[:raw_len], raw_len):
+                pass
+            return pal_mv[:palette_len], dat_mv[:raw_len]
+
         # Read data using memoryviews
         self._file.seek(data_off)
-        dat_mv = memoryview(self._dat_buf)
         self._file.readinto(dat_mv[:data_len])
         
         return pal_mv[:palette_len], dat_mv[:data_len]
 
+    def _read_packed(self, data_off, data_len):
+        packed = bytearray(data_len)
+        self._file.seek(data_off)
+        self._file.readinto(packed)
+        return packed
+
     def _draw_entry_raw(self, profile, color_count, width, height, stride, 
-                       palette_off, palette_len, data_off, data_len, x, y):
+                       palette_off, palette_len, data_off, data_len, x, y, flags=0):
         """Draw an entry directly from raw data without creating PakEntry objects"""
         try:
-            mv_pal, mv_dat = self._load_entry_data(palette_off, palette_len, data_off, data_len)
+            mv_pal, mv_dat = self._load_entry_data(palette_off, palette_len, data_off, data_len,
+                                                   flags, stride * height)
 
             # Create image object
             # img = gint.image(
@@ -126,6 +187,73 @@ class PakFile:
             print("Error drawing entry at ({},{}): {}".format(x, y, e))
             return False
 
+    def _read_entry(self, entry_off=None):
+        """Reads the entry at entry_off (or at the file position): (name, entry data)"""
+        # Pre-allocate entry buffer
+        if self._ent_buf is None:
+            self._ent_buf = bytearray(ENT_SIZE)
+        ent_mv = memoryview(self._ent_buf)
+        if entry_off is not None:
+            self._file.seek(entry_off)
+
+        # Read entry using memoryview (no copy)
+        if self._file.readinto(ent_mv) < ENT_SIZE:
+            return None, None
+
+        # Unpack directly from memoryview
+        (name, profile, flags, color_count, width, height, stride, _r2,
+         pal_len, data_len, pal_off, data_off) = struct.unpack(ENT_FMT, ent_mv)
+
+        # Decode name
+        z = name.find(b'\x00')
+        entry_name = name[:z if z >= 0 else len(name)].decode('ascii')
+        return entry_name, (profile, color_count, width, height, stride,
+                            pal_off, pal_len, data_off, data_len, flags)
+
+    def _find_entry(self, entry_name):
+        """
+        Entry data by exact name, None if missing. v2: binary search of the
+        hash table, one entry read; v1: through the full entry map.
+        """
+        if self._version < 2:
+            if self._entry_map is None:
+                self._build_entry_map()
+            return self._entry_map.get(entry_name)
+
+        key = name_hash(entry_name)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            self._file.seek(self._index_off + mid * HASH_SIZE)
+            h, _ = struct.unpack(HASH_FMT, self._file.read(HASH_SIZE))
+            if h < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        # Names with the same hash are next to each other
+        while lo < self._count:
+            self._file.seek(self._index_off + lo * HASH_SIZE)
+            h, entry_off = struct.unpack(HASH_FMT, self._file.read(HASH_SIZE))
+            if h != key:
+                break
+            name, entry = self._read_entry(entry_off)
+            if name == entry_name:
+                return entry
+            lo += 1
+        return None
+
+    def _first_entry_from(self, name_prefix):
+        """v2: index of the first entry (sorted by name) not before name_prefix."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name, _ = self._read_entry(self._entries_off + mid * ENT_SIZE)
+            if name < name_prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
     def _build_entry_map(self, name_prefix=None):
         """Build a map of entry names to their data for ordered processing"""
         if self._entry_map is not None:
@@ -134,37 +262,27 @@ class PakFile:
         try:
             if not self._file:
                 raise RuntimeError("PAK file is not open")
-                
-            # Pre-allocate entry buffer
-            if self._ent_buf is None:
-                self._ent_buf = bytearray(ENT_SIZE)
-            ent_mv = memoryview(self._ent_buf)
-            
+
+            # v2 entries are sorted by name: skip to the prefix
+            first = 0
+            if self._version >= 2 and name_prefix:
+                first = self._first_entry_from(name_prefix)
+
             # Seek to index
-            self._file.seek(self._index_off)
+            self._file.seek(self._entries_off + first * ENT_SIZE)
             
             self._entry_map = {}
             
-            for _ in range(self._count):
-                # Read entry using memoryview (no copy)
-                bytes_read = self._file.readinto(ent_mv)
-                if bytes_read < ENT_SIZE:
+            for _ in range(first, self._count):
+                entry_name, entry = self._read_entry()
+                if entry_name is None:
                     break
                 
-                # Unpack directly from memoryview
-                (name, profile, _r1, color_count, width, height, stride, _r2,
-                 pal_len, data_len, pal_off, data_off) = struct.unpack(ENT_FMT, ent_mv)
-                
-                # Decode name
-                z = name.find(b'\x00')
-                entry_name = name[:z if z >= 0 else len(name)].decode('ascii')
-                
                 # Store only entries matching prefix (or all if no prefix)
                 if name_prefix is None or entry_name.startswith(name_prefix):
-                    self._entry_map[entry_name] = (
-                        profile, color_count, width, height, stride,
-                        pal_off, pal_len, data_off, data_len
-                    )
+                    self._entry_map[entry_name] = entry
+                elif self._version >= 2:
+                    break
             
         except Exception as e:
             print("Error building entry map: {}".format(e))
@@ -189,7 +307,7 @@ class PakFile:
             for entry_name in sorted_names:
                 entry_data = self._entry_map[entry_name]
                 (profile, color_count, width, height, stride,
-                 pal_off, pal_len, data_off, data_len) = entry_data
+                 pal_off, pal_len, data_off, data_len, flags) = entry_data
                 
                 # Check if we need to break to next line
                 if current_x + width > max_width and current_x > x:
@@ -200,7 +318,7 @@ class PakFile:
                 # Draw the entry directly
                 if self._draw_entry_raw(profile, color_count, width, height, stride,
                                       pal_off, pal_len, data_off, data_len,
-                                      current_x, current_y):
+                                      current_x, current_y, flags):
                     drawn_count += 1
                 
                 # Move to next position
@@ -228,21 +346,17 @@ class PakFile:
             if not self._file:
                 raise RuntimeError("PAK file is not open")
                 
-            # Build entry map for all entries to find the specific one
-            if self._entry_map is None:
-                self._build_entry_map()
-                
-            if entry_name not in self._entry_map:
+            entry_data = self._find_entry(entry_name)
+            if entry_data is None:
                 print("Entry '{}' not found".format(entry_name))
                 return False
                 
-            entry_data = self._entry_map[entry_name]
             (profile, color_count, width, height, stride,
-             pal_off, pal_len, data_off, data_len) = entry_data
+             pal_off, pal_len, data_off, data_len, flags) = entry_data
             
             # Draw the entry directly
             result = self._draw_entry_raw(profile, color_count, width, height, stride,
-                                        pal_off, pal_len, data_off, data_len, x, y)
+                                        pal_off, pal_len, data_off, data_len, x, y, flags)
             if result:
                 try:
                     gint.dupdate()
@@ -254,6 +368,40 @@ class PakFile:
             print("Error in draw_single_entry: {}".format(e))
             return False
 
+    def load_image_steps(self, entry_name, rows=LOAD_ROWS):
+        """
+        Reads an entry into its own gint image, `rows` rows per step, for load
+        jobs. Yields the progress (0 to 1), returns the image (None if missing).
+        """
+        if not self._file:
+            raise RuntimeError("PAK file is not open")
+        entry = self._find_entry(entry_name)
+        if entry is None:
+            print("Entry '{}' not found".format(entry_name))
+            return None
+        (profile, color_count, width, height, stride,
+         pal_off, pal_len, data_off, data_len, flags) = entry
+
+        palette = bytearray(pal_len)
+        self._file.seek(pal_off)
+        self._file.readinto(palette)
+
+        chunk = stride * rows
+        if flags & FLAG_RLE:
+            # Read the packed data at once, decode it a few rows per step
+            data = bytearray(stride * height)
+            yield from rle_decode_steps(self._read_packed(data_off, data_len), data, chunk)
+            return gint.image(profile, color_count, width, height, stride, data, palette)
+
+        data = bytearray(data_len)
+        dat_mv = memoryview(data)
+        for start in range(0, data_len, chunk):
+            # Seek every step: the file may be read by others in between
+            self._file.seek(data_off + start)
+            self._file.readinto(dat_mv[start:start + chunk])
+            yield min(1.0, (start + chunk) / data_len)
+        return gint.image(profile, color_count, width, height, stride, data, palette)
+
     def list_entries(self, prefix=None):
         """List entries on-the-fly without storing them"""
         try:
@@ -0,0 +1,210 @@
+# cpgame/modules/tablefile.py
+# Compiled data tables (game_data/<category>.bin, written by data_compiler.py):
+# a lookup seeks to one fixed-size record and unpacks it, instead of importing
+# the whole data module for each object.
+
+import struct
+import json
+from cpgame.engine.logger import log
+from cpgame.engine.profiler import track_heap
+from cpgame.modules.compiled import is_fresh
+from cpgame.modules.datamanager import DataProxy, ObjectCache, RecordClasses, CACHE_SIZE
+
+try:
+    from typing import Optional, Any, Dict, List, Tuple, Union
+except:
+    pass
+
+# ---- Table format (little-endian)
+# header, fields (name, type), index (record names, sorted), records, string pool
+TABLE_MAGIC = b'GTBL'
+TABLE_VERSION = 2
+TABLE_HDR_FMT = '<4sBBHHHIIIIII'  # magic, version, kind, field count, record count, record size,
+                                  # fields_off, index_off, records_off, pool_off,
+                                  # source size, source CRC-32 (compiled.source_stamp)
+TABLE_FIELD_FMT = '<IHH'        # name (pool offset), type, reserved
+TABLE_HDR_SIZE = struct.calcsize(TABLE_HDR_FMT)
+TABLE_FIELD_SIZE = struct.calcsize(TABLE_FIELD_FMT)
+TABLE_INDEX_SIZE = 4            # Name of the record (pool offset)
+# A record is a mask of the fields it has, then one 4-byte slot per field
+TABLE_MAX_FIELDS = 32
+
+# Kinds: the exports are the records (dicts), or each export is a record whose
+# single field is the exported value (e.g. system.start_map_id)
+KIND_RECORDS = 0
+KIND_VALUES = 1
+VALUE_FIELD = 'value'
+
+# Field types: the slot holds the value, or the pool offset of a string or of
+# the JSON text of anything else (lists, dicts, floats, None, mixed columns)
+TYPE_INT = 0
+TYPE_BOOL = 1
+TYPE_STR = 2
+TYPE_JSON = 3
+
+DATA_DIR = __file__.replace('\\', '/').rsplit('/', 2)[0] + '/game_data/'
+
+def record_format(field_count: int) -> str:
+    return '<I' + 'i' * field_count
+
+class TableFile:
+    """
+    A compiled data table, standing in for the category's ModuleProxy (same
+    get/get_or/load/exists/all). Only the header and the field names stay in
+    memory: a lookup is a binary search of the index on file, then one read.
+    """
+    def __init__(self, path: str, data_category: str, name_id=None, cache_size: int = CACHE_SIZE):
+        self.path = path
+        self.category = data_category
+        self.name_id = self.category.upper() if not name_id else name_id
+        self.cache = ObjectCache(cache_size)
+        self.records = RecordClasses(self.category)
+        with open(path, 'rb') as f:
+            (magic, version, self._kind, field_count, self._count, self._record_size,
+             fields_off, self._index_off, self._records_off, self._pool_off,
+             self._source_size, self._source_crc) = struct.unpack(
+                 TABLE_HDR_FMT, f.read(TABLE_HDR_SIZE))
+            if magic != TABLE_MAGIC or version != TABLE_VERSION:
+                raise ValueError('Bad table header in {}'.format(path))
+            self._record_fmt = record_format(field_count)
+            self._fields: List[Tuple[str, int]] = []
+            f.seek(fields_off)
+            fields = f.read(TABLE_FIELD_SIZE * field_count)
+            for i in range(field_count):
+                name_off, field_type, _ = struct.unpack_from(TABLE_FIELD_FMT, fields, i * TABLE_FIELD_SIZE)
+                self._fields.append((self._read_str(f, name_off), field_type))
+
+    @staticmethod
+    def find(data_category: str, name_id=None, cache_size: int = CACHE_SIZE) -> Optional['TableFile']:
+        """
+        Opens the compiled version of a data module, None if it was not
+        compiled, or compiled by an older data_compiler.py or before the
+        module was last edited.
+        """
+        try:
+            table = TableFile(DATA_DIR + data_category + '.bin', data_category, name_id, cache_size)
+        except OSError:
+            return None
+        except ValueError:
+            log("{}.bin has an old format, using {}.py (run data_compiler.py)".format(data_category, data_category))
+            return None
+        if not is_fresh(DATA_DIR + data_category + '.py', table._source_size, table._source_crc):
+            log("{}.bin is out of date, using {}.py (run data_compiler.py)".format(data_category, data_category))
+            return None
+        return table
+
+    def _read_str(self, f, pool_off: int) -> str:
+        f.seek(self._pool_off + pool_off)
+        length = struct.unpack('<H', f.read(2))[0]
+        return f.read(length).decode('utf-8')
+
+    def _record_name(self, f, i: int) -> str:
+        f.seek(self._index_off + i * TABLE_INDEX_SIZE)
+        return self._read_str(f, struct.unpack('<I', f.read(TABLE_INDEX_SIZE))[0])
+
+    def _find(self, f, object_name: str) -> int:
+        """Binary search of the index, returns the record number or -1."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self._record_name(f, mid)
+            if name == object_name:
+                return mid
+            if name < object_name:
+                lo = mid + 1
+            else:
+                hi = mid
+        return -1
+
+    def _read_record(self, f, i: int) -> Dict[str, Any]:
+        f.seek(self._records_off + i * self._record_size)
+        slots = struct.unpack(self._record_fmt, f.read(self._record_size))
+        mask = slots[0]
+        record = {}
+        for n, (name, field_type) in enumerate(self._fields):
+            if not mask & (1 << n):
+                continue
+            slot = slots[n + 1]
+            if field_type == TYPE_INT:
+                record[name] = slot
+            elif field_type == TYPE_BOOL:
+                record[name] = slot != 0
+            elif field_type == TYPE_STR:
+                record[name] = self._read_str(f, slot)
+            else:
+                record[name] = json.loads(self._read_str(f, slot))
+        return record
+
+    def _wrap(self, record: Dict[str, Any]) -> Any:
+        """Same objects as ModuleProxy: dicts as records, lists of dicts item-wise."""
+        data = record.get(VALUE_FIELD) if self._kind == KIND_VALUES else record
+        if isinstance(data, dict):
+            return self.records.wrap(data)
+        elif isinstance(data, list):
+            return [self.records.wrap(item) if isinstance(item, dict) else item for item in data]
+        return data
+
+    def _load_object(self, object_name: str) -> Any:
+        return self.cache.get(object_name, self._read_object)
+
+    def _read_object(self, object_name: str) -> Any:
+        with track_heap("data"):
+            with open(self.path, 'rb') as f:
+                i = self._find(f, object_name)
+                if i < 0:
+                    raise AttributeError("Object '{}' not found in '{}'".format(object_name, self.category))
+                return self._wrap(self._read_record(f, i))
+
+    def _resolve_name(self, object_id: int):
+        """Same as ModuleProxy: int IDs are stored as e.g. ITEM_3"""
+        return "{}_{}".format(self.name_id, object_id)
+
+    def get(self, object_name: Union[str, int]) -> Optional[Any]:
+        """Gets a specific data object."""
+        if type(object_name) == int:
+            object_name = self._resolve_name(object_name)
+        return self._load_object(str(object_name))
+
+    def get_or(self, object_name: Union[str, int], default: Any = None) -> Any:
+        """Gets a specific data object, or `default` if it doesn't exist."""
+        try:
+            return self.get(object_name)
+        except:
+            return default
+
+    def load(self, object_name: Union[str, int]) -> DataProxy:
+        """Same as ModuleProxy.load(): with data_manager.actors.load("ACTOR_1") as actor_data: ..."""
+        if type(object_name) == int:
+            object_name = self._resolve_name(object_name)
+        return DataProxy(self._load_object, str(object_name))
+
+    def exists(self, object_name: Union[str, int]) -> bool:
+        if type(object_name) == int:
+            object_name = self._resolve_name(object_name)
+        with open(self.path, 'rb') as f:
+            return self._find(f, str(object_name)) >= 0
+
+    def all(self) -> Dict[str, Any]:
+        """
+        Decodes every record, as ModuleProxy.all(): the values are not wrapped.
+        NOTE: The heap use grows with the table, use with caution.
+        """
+        return dict(self.iter_all())
+
+    def iter_all(self):
+        """
+        Yields (name, object) for every record, decoded one at a time, with
+        the same objects as all(). The cache is left as it is.
+        """
+        with open(self.path, 'rb') as f:
+            for i in range(self._count):
+                record = self._read_record(f, i)
+                if self._kind == KIND_VALUES:
+                    record = record.get(VALUE_FIELD)
+                else:
+                    record['__name__'] = self.category
+                yield self._record_name(f, i), record
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Cache hits (file read avoided) and misses since the start."""
+        return {'hits': self.cache.hits, 'misses': self.cache.misses, 'size': self.cache.size}
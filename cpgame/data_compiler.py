@@ -0,0 +1,116 @@
+# data_compiler.py
+# Compiles the data modules of cpgame/game_data (items.py, actors.py, ...) into
+# the binary tables read by cpgame.modules.tablefile (<category>.bin, next to
+# the module). Run from the cpgame/ folder after editing the data:
+# python data_compiler.py [items ...]
+import os
+import struct
+import sys
+
+from cpgame.modules.tablefile import (TABLE_MAGIC, TABLE_VERSION, TABLE_HDR_FMT, TABLE_HDR_SIZE,
+                                      TABLE_FIELD_FMT, TABLE_FIELD_SIZE, TABLE_INDEX_SIZE,
+                                      TABLE_MAX_FIELDS, KIND_RECORDS, KIND_VALUES, VALUE_FIELD,
+                                      TYPE_INT, TYPE_BOOL, TYPE_STR, TYPE_JSON, DATA_DIR,
+                                      record_format)
+from cpgame.modules.compiled import source_stamp, to_json, check_round_trip
+
+TABLES = ('actors', 'classes', 'items', 'weapons', 'armors', 'skills',
+          'enemies', 'troops', 'states', 'system')
+INT_MIN, INT_MAX = -0x80000000, 0x7FFFFFFF
+
+def _value_type(value) -> int:
+    if isinstance(value, bool):
+        return TYPE_BOOL
+    if isinstance(value, int) and INT_MIN <= value <= INT_MAX:
+        return TYPE_INT
+    if isinstance(value, str):
+        return TYPE_STR
+    return TYPE_JSON
+
+class StringPool:
+    """Strings stored once each, as a 16-bit length then UTF-8."""
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets = {}
+
+    def add(self, text: str) -> int:
+        if text not in self._offsets:
+            raw = text.encode('utf-8')
+            if len(raw) > 0xFFFF:
+                raise ValueError("String too long for the pool: {}...".format(text[:32]))
+            self._offsets[text] = len(self.data)
+            self.data += struct.pack('<H', len(raw)) + raw
+        return self._offsets[text]
+
+def compile_table(module, name: str, stamp=(0, 0)) -> bytes:
+    """Returns the binary table of a data module, `stamp` is its source_stamp()."""
+    exports = [key for key in module.HEADER['exports'] if hasattr(module, key)]
+    values = [getattr(module, key) for key in exports]
+    if all(isinstance(value, dict) for value in values):
+        kind, records = KIND_RECORDS, values
+    else:
+        kind, records = KIND_VALUES, [{VALUE_FIELD: value} for value in values]
+
+    # Columns in order of first appearance, typed by all their values
+    fields = {}
+    for key, record in zip(exports, records):
+        for field, value in record.items():
+            if not isinstance(field, str):
+                raise ValueError("{}: {} has a non-str key {!r}".format(name, key, field))
+            check_round_trip(name, "{}.{}".format(key, field), value)
+            value_type = _value_type(value)
+            if fields.setdefault(field, value_type) != value_type:
+                fields[field] = TYPE_JSON
+    if len(fields) > TABLE_MAX_FIELDS:
+        raise ValueError("{}: {} fields, at most {}".format(name, len(fields), TABLE_MAX_FIELDS))
+
+    pool = StringPool()
+    field_table = bytearray()
+    for field, field_type in fields.items():
+        field_table += struct.pack(TABLE_FIELD_FMT, pool.add(field), field_type, 0)
+
+    record_fmt = record_format(len(fields))
+    record_size = struct.calcsize(record_fmt)
+    index = bytearray()
+    record_data = bytearray()
+    for key, record in sorted(zip(exports, records), key=lambda item: item[0]):
+        mask = 0
+        slots = []
+        for n, (field, field_type) in enumerate(fields.items()):
+            if field not in record:
+                slots.append(0)
+                continue
+            mask |= 1 << n
+            value = record[field]
+            if field_type in (TYPE_INT, TYPE_BOOL):
+                slots.append(int(value))
+            elif field_type == TYPE_STR:
+                slots.append(pool.add(value))
+            else:
+                slots.append(pool.add(to_json(value)))
+        index += struct.pack('<I', pool.add(key))
+        record_data += struct.pack(record_fmt, mask, *slots)
+
+    # Layout: header, fields, index, records, string pool
+    fields_off = TABLE_HDR_SIZE
+    index_off = fields_off + TABLE_FIELD_SIZE * len(fields)
+    records_off = index_off + TABLE_INDEX_SIZE * len(records)
+    pool_off = records_off + len(record_data)
+    header = struct.pack(TABLE_HDR_FMT, TABLE_MAGIC, TABLE_VERSION, kind, len(fields), len(records),
+                         record_size, fields_off, index_off, records_off, pool_off, *stamp)
+    return header + bytes(field_table) + bytes(index) + bytes(record_data) + bytes(pool.data)
+
+def main(argv):
+    for name in argv or TABLES:
+        module = __import__('cpgame.game_data.' + name, None, None, ('HEADER',))
+        stamp = source_stamp(os.path.join(DATA_DIR, name + '.py'))
+        blob = compile_table(module, name, stamp)
+        path = os.path.join(DATA_DIR, name + '.bin')
+        with open(path, 'wb') as f:
+            f.write(blob)
+        source = stamp[0]
+        count = len([key for key in module.HEADER['exports'] if hasattr(module, key)])
+        print("{}: {} records, {} B (source {} B)".format(name, count, len(blob), source))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+# img_decode_bench.py
+# Before/after benchmark of gint.Image decoding over every image in game_assets.
+# Run from the cpgame/ folder: python img_decode_bench.py
+import os
+import sys
+import time
+
+import gint
+import pygame
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cpgame', 'game_assets')
+REPEAT = 3
+
+# Measure decoding itself, not the on-disk image cache
+gint.IMAGE_CACHE = False
+
+def find_asset_modules():
+    """List the importable module names of every asset file."""
+    modules = []
+    for folder, _, files in os.walk(ASSETS_DIR):
+        rel = os.path.relpath(folder, os.path.dirname(os.path.dirname(ASSETS_DIR)))
+        package = rel.replace(os.sep, '.')
+        for name in sorted(files):
+            if name.endswith('.py') and name != '__init__.py':
+                modules.append(package + '.' + name[:-3])
+    return sorted(modules)
+
+def collect_images(module_name):
+    """Import an asset module and return its (name, gint.Image) pairs."""
+    module = __import__(module_name, None, None, ('*',))
+    return [(module_name + '.' + attr, value)
+            for attr, value in sorted(module.__dict__.items())
+            if isinstance(value, gint.Image)]
+
+def best_time(func):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def surface_bytes(img):
+    return pygame.image.tobytes(img.surface, 'RGBA')
+
+def bench_image(img):
+    """Returns (legacy_s, fast_s, fast_no_numpy_s, identical)."""
+    legacy = best_time(img._decode_image_legacy)
+    reference = surface_bytes(img)
+
+    fast = best_time(img._decode_image)
+    identical = surface_bytes(img) == reference
+
+    np = gint.np
+    gint.np = None
+    try:
+        pure = best_time(img._decode_image)
+        identical = identical and surface_bytes(img) == reference
+    finally:
+        gint.np = np
+    return legacy, fast, pure, identical
+
+def main():
+    print("numpy: {}".format("yes" if gint.np is not None else "no"))
+    print("{:<48} {:>9} {:>9} {:>9} {:>8}  {}".format(
+        "image", "legacy", "fast", "no-numpy", "speedup", "same"))
+
+    totals = [0.0, 0.0, 0.0]
+    all_identical = True
+    for module_name in find_asset_modules():
+        for name, img in collect_images(module_name):
+            legacy, fast, pure, identical = bench_image(img)
+            totals[0] += legacy
+            totals[1] += fast
+            totals[2] += pure
+            all_identical = all_identical and identical
+            print("{:<48} {:>8.1f}ms {:>8.1f}ms {:>8.1f}ms {:>7.1f}x  {}".format(
+                name[len('cpgame.game_assets.'):], legacy * 1000, fast * 1000, pure * 1000,
+                legacy / fast if fast else 0.0, "ok" if identical else "DIFF"))
+
+    print("{:<48} {:>8.1f}ms {:>8.1f}ms {:>8.1f}ms {:>7.1f}x".format(
+        "TOTAL", totals[0] * 1000, totals[1] * 1000, totals[2] * 1000,
+        totals[0] / totals[1] if totals[1] else 0.0))
+    if not all_identical:
+        print("Decoded surfaces differ from the legacy decoder!")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# map_bench.py
+# Map transfer cost, module maps (map_NNN.py imported by ModuleProxy) against
+# compiled maps (map_NNN.bin read by MapFile, see map_compiler.py): time of
+# GameMap.setup() plus a read of every tile, and the Python heap still held by
+# the loaded map afterwards (tracemalloc, measured on its own pass). No compiled
+# map is shipped: run map_compiler.py first, and delete the .bin files after.
+# Run from the cpgame/ folder: python map_bench.py [map_001 ...] [--runs N]
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('GINT_HEADLESS', '1')  # Must be set before gint is imported
+
+from cpgame.engine.game import Game
+from cpgame.modules import datamanager
+from cpgame.modules.mapfile import MapFile
+from map_compiler import map_names
+from scene_bench import load_scene
+
+RUNS = 20
+BACKENDS = (('module', False), ('binary', True))
+
+def transfer(map_id):
+    """A transfer to the map: setup, then every tile read once (first draw)."""
+    from cpgame.game_objects.map import GameMap
+    game_map = GameMap()
+    game_map.setup(map_id)
+    for y in range(game_map.height):
+        for x in range(game_map.width):
+            game_map.tile_id(x, y)
+    return game_map
+
+def fresh_maps(compiled):
+    """Drops the cached map proxies, so the next transfer loads from scratch."""
+    from cpgame.systems.jrpg import JRPG
+    datamanager.USE_COMPILED_MAPS = compiled
+    JRPG.data.maps.clear()
+    gc.collect()
+
+def time_transfer(map_id, compiled, runs):
+    times = []
+    for _ in range(runs):
+        fresh_maps(compiled)
+        start = time.perf_counter()
+        game_map = transfer(map_id)
+        times.append(time.perf_counter() - start)
+        del game_map
+    times.sort()
+    return times[len(times) // 2]
+
+def heap_after_transfer(map_id, compiled):
+    fresh_maps(compiled)
+    tracemalloc.start()
+    game_map = transfer(map_id)
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del game_map
+    return held, peak
+
+def main(argv):
+    runs = RUNS
+    names = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--runs':
+            runs = int(next(args))
+        else:
+            names.append(arg)
+    names = names or map_names()
+
+    use_compiled = datamanager.USE_COMPILED_MAPS
+    # The boot scene sets up the JRPG session (data manager, game objects)
+    game = Game()
+    game.running = True
+    game.change_scene(load_scene('map'))
+    for _, compiled in BACKENDS:  # Warm up imports and tracemalloc, the first pass is off
+        heap_after_transfer(1, compiled)
+
+    print("{:<9} {:<7} {:>10} {:>10} {:>10}".format("map", "backend", "transfer", "held", "peak"))
+    for name in names:
+        if MapFile.find(name) is None:
+            print("{:<9} not compiled, run map_compiler.py".format(name))
+            continue
+        map_id = int(name[4:])
+        for backend, compiled in BACKENDS:
+            median = time_transfer(map_id, compiled, runs)
+            held, peak = heap_after_transfer(map_id, compiled)
+            print("{:<9} {:<7} {:>8.2f}ms {:>8} B {:>8} B".format(
+                name, backend, median * 1000, held, peak))
+
+    while game.scenes:
+        game.scenes.pop().destroy()
+    datamanager.USE_COMPILED_MAPS = use_compiled
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,81 @@
+# map_compiler.py
+# Compiles the map modules of cpgame/game_data/maps (map_NNN.py) into the binary
+# map format read by cpgame.modules.mapfile (map_NNN.bin, next to the module).
+# Opt-in: no map_NNN.bin is shipped, as the decoded events still hold more heap
+# than the modules on some maps (map_bench.py). To try them, compile the maps
+# and set datamanager.USE_COMPILED_MAPS.
+# Run from the cpgame/ folder: python map_compiler.py [map_001 ...]
+import os
+import struct
+import sys
+
+from cpgame.modules.mapfile import (MAP_MAGIC, MAP_VERSION, MAP_HDR_FMT, MAP_HDR_SIZE,
+                                    MAP_EVENT_FMT, MAP_EVENT_SIZE, MAP_DATA, MAP_EVENTS, MAPS_DIR)
+from cpgame.modules.compiled import source_stamp, to_json, check_round_trip
+
+def compile_map(module, name: str, stamp=(0, 0)) -> bytes:
+    """Returns the binary map of a map module, `stamp` is its source_stamp()."""
+    exports = module.HEADER['exports']
+    width, height = module.width, module.height
+    data = list(module.data)
+    if len(data) != width * height:
+        raise ValueError("{}: data has {} tiles, expected {}x{}".format(name, len(data), width, height))
+    if min(data) < 0 or max(data) > 0xFFFF:
+        raise ValueError("{}: tile ids must fit in 16 bits".format(name))
+    tile_size = 1 if max(data) <= 0xFF else 2
+
+    tiles = bytearray()
+    for tile in data:
+        tiles += tile.to_bytes(tile_size, 'little')
+
+    events = getattr(module, MAP_EVENTS, None) or {}
+    event_blobs = []
+    for (x, y), event in sorted(events.items(), key=lambda item: (item[0][1], item[0][0])):
+        check_round_trip(name, "events[({}, {})]".format(x, y), event)
+        event_blobs.append((x, y, to_json(event).encode('utf-8')))
+
+    properties = {}
+    for key in exports:
+        if key in (MAP_DATA, MAP_EVENTS) or not hasattr(module, key):
+            continue
+        properties[key] = getattr(module, key)
+    check_round_trip(name, "properties", properties)
+    properties_blob = to_json(properties).encode('utf-8')
+
+    # Layout: header, tiles, event table, event blobs, properties
+    tiles_off = MAP_HDR_SIZE
+    table_off = tiles_off + len(tiles)
+    blob_off = table_off + MAP_EVENT_SIZE * len(event_blobs)
+    table = bytearray()
+    blobs = bytearray()
+    offsets = {}  # Events sharing one dict in the module share their blob
+    for x, y, blob in event_blobs:
+        if blob not in offsets:
+            offsets[blob] = blob_off + len(blobs)
+            blobs += blob
+        table += struct.pack(MAP_EVENT_FMT, x, y, offsets[blob], len(blob))
+    props_off = blob_off + len(blobs)
+
+    header = struct.pack(MAP_HDR_FMT, MAP_MAGIC, MAP_VERSION, tile_size, width, height,
+                         len(event_blobs), tiles_off, table_off, props_off, len(properties_blob), *stamp)
+    return header + bytes(tiles) + bytes(table) + bytes(blobs) + properties_blob
+
+def map_names():
+    return sorted(f[:-3] for f in os.listdir(MAPS_DIR)
+                  if f.startswith('map_') and f.endswith('.py'))
+
+def main(argv):
+    for name in argv or map_names():
+        module = __import__('cpgame.game_data.maps.' + name, None, None, ('HEADER',))
+        stamp = source_stamp(os.path.join(MAPS_DIR, name + '.py'))
+        blob = compile_map(module, name, stamp)
+        path = os.path.join(MAPS_DIR, name + '.bin')
+        with open(path, 'wb') as f:
+            f.write(blob)
+        source = stamp[0]
+        print("{}: {}x{}, {} events, {} B (source {} B)".format(
+            name, module.width, module.height, len(getattr(module, MAP_EVENTS, None) or {}),
+            len(blob), source))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
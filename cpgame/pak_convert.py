@@ -0,0 +1,128 @@
+# pak_convert.py
+# Rewrites PAK files (v1 or v2) as PAK v2, read by cpgame.modules.pakloader:
+# sorted name hash table, entries sorted by name, aligned palettes and data, and
+# P4/P8 pixel data RLE compressed where that makes it smaller.
+# Run from the cpgame/ folder: python pak_convert.py in.pak [out.pak] [--no-rle] [--align N]
+import os
+import struct
+import sys
+
+os.environ.setdefault('GINT_HEADLESS', '1')  # Must be set before gint is imported
+
+import gint
+from cpgame.modules.pakloader import (PakFile, HDR_FMT, ENT_FMT, HASH_FMT, HASH_SIZE, ENT_SIZE,
+                                      FLAG_RLE, name_hash)
+
+ALIGN = 4
+RLE_PROFILES = (gint.IMAGE_P8_RGB565, gint.IMAGE_P8_RGB565A,
+                gint.IMAGE_P4_RGB565, gint.IMAGE_P4_RGB565A)
+
+def rle_encode(data: bytes) -> bytes:
+    """The RLE of pakloader.rle_decode_steps: runs of 2 to 129 bytes, literals of 1 to 128."""
+    out = bytearray()
+    literal = bytearray()
+    i = 0
+    while i < len(data):
+        run = 1
+        while i + run < len(data) and run < 129 and data[i + run] == data[i]:
+            run += 1
+        if run >= 2:
+            if literal:
+                out += bytes((len(literal) - 1,)) + literal
+                literal = bytearray()
+            out += bytes((run + 126, data[i]))
+            i += run
+        else:
+            literal.append(data[i])
+            if len(literal) == 128:
+                out += bytes((127,)) + literal
+                literal = bytearray()
+            i += 1
+    if literal:
+        out += bytes((len(literal) - 1,)) + literal
+    return bytes(out)
+
+def read_entries(path):
+    """Every entry of a PAK file, as dicts with the palette and the raw data."""
+    entries = []
+    with PakFile(path) as pak:
+        pak._build_entry_map()
+        for name in sorted(pak._entry_map):
+            (profile, color_count, width, height, stride,
+             pal_off, pal_len, data_off, data_len, flags) = pak._entry_map[name]
+            pal, data = pak._load_entry_data(pal_off, pal_len, data_off, data_len, flags, stride * height)
+            entries.append({'name': name, 'profile': profile, 'color_count': color_count,
+                            'width': width, 'height': height, 'stride': stride,
+                            'palette': bytes(pal), 'data': bytes(data)})
+    return entries
+
+def _pad(f, align):
+    f.write(b'\x00' * (-f.tell() % align))
+
+def pack_v2(out_path, entries, align=ALIGN, rle=True):
+    """Writes a PAK v2. Returns the number of RLE compressed entries."""
+    compressed = 0
+    entries = sorted(entries, key=lambda e: e['name'])
+    with open(out_path, 'wb') as f:
+        f.write(struct.pack(HDR_FMT, b'GIPK', 2, len(entries), 0, align))  # index_off patched below
+
+        records = []
+        for e in entries:
+            name = e['name'].encode('ascii')
+            if len(name) > 31:
+                raise ValueError("Entry name too long: {}".format(e['name']))
+            data, flags = e['data'], 0
+            if rle and e['profile'] in RLE_PROFILES:
+                packed = rle_encode(data)
+                if len(packed) < len(data):
+                    data, flags = packed, FLAG_RLE
+                    compressed += 1
+            _pad(f, align)
+            pal_off = f.tell()
+            f.write(e['palette'])
+            _pad(f, align)
+            data_off = f.tell()
+            f.write(data)
+            records.append((name + b'\x00' * (32 - len(name)), e['profile'], flags,
+                            e['color_count'], e['width'], e['height'], e['stride'], 0,
+                            len(e['palette']), len(data), pal_off, data_off))
+
+        _pad(f, align)
+        index_off = f.tell()
+        entries_off = index_off + HASH_SIZE * len(records)
+        hashes = sorted((name_hash(r[0].rstrip(b'\x00')), entries_off + i * ENT_SIZE)
+                        for i, r in enumerate(records))
+        for h, entry_off in hashes:
+            f.write(struct.pack(HASH_FMT, h, entry_off))
+        for r in records:
+            f.write(struct.pack(ENT_FMT, *r))
+
+        f.seek(8)
+        f.write(struct.pack('<I', index_off))
+    return compressed
+
+def main(argv):
+    rle = True
+    align = ALIGN
+    paths = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--no-rle':
+            rle = False
+        elif arg == '--align':
+            align = int(next(args))
+        else:
+            paths.append(arg)
+    if not paths:
+        print("usage: python pak_convert.py in.pak [out.pak] [--no-rle] [--align N]")
+        return
+    src = paths[0]
+    dst = paths[1] if len(paths) > 1 else src
+    entries = read_entries(src)
+    before = os.path.getsize(src)
+    compressed = pack_v2(dst, entries, align, rle)
+    print("{}: {} entries ({} RLE), {} B -> {} B".format(
+        dst, len(entries), compressed, before, os.path.getsize(dst)))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
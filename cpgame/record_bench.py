@@ -0,0 +1,73 @@
+# record_bench.py
+# Data objects: DataObject (dict + __getattr__ with the camelCase fallback)
+# against the generated Record classes (one slot per field), for items, enemies
+# and event pages. Times one attribute read, and measures the Python heap of
+# one object made from a copy of its dict (DataObject keeps the dict, a
+# Record doesn't; the values are shared in both cases).
+# Run from the cpgame/ folder: python record_bench.py [--reads N]
+import gc
+import sys
+import time
+import tracemalloc
+
+from cpgame.modules.datamanager import DataObject, RecordClasses
+
+READS = 100000
+
+def module_dicts(module_path):
+    module = __import__(module_path, None, None, ('HEADER',))
+    return [getattr(module, name) for name in module.HEADER['exports'] if hasattr(module, name)]
+
+def event_pages():
+    from map_compiler import map_names
+    pages = []
+    for name in map_names():
+        module = __import__('cpgame.game_data.maps.' + name, None, None, ('events',))
+        for event in module.events.values():
+            pages.extend(event['pages'])
+    return pages
+
+# Table: (records, attribute read)
+TABLES = {
+    'items': (lambda: module_dicts('cpgame.game_data.items'), 'price'),
+    'enemies': (lambda: module_dicts('cpgame.game_data.enemies'), 'battler_name'),
+    'pages': (event_pages, 'graphic'),
+}
+
+def time_reads(obj, attr, reads):
+    start = time.perf_counter()
+    for _ in range(reads):
+        getattr(obj, attr)
+    return (time.perf_counter() - start) / reads
+
+def heap_per_object(make, dicts):
+    gc.collect()
+    tracemalloc.start()
+    objects = [make(dict(d)) for d in dicts]
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return held // len(dicts)
+
+def main(argv):
+    reads = READS
+    args = iter(argv)
+    for arg in args:
+        if arg == '--reads':
+            reads = int(next(args))
+
+    print("{:<8} {:>4} {:<10} {:>10} {:>10}".format("table", "n", "object", "read", "heap/obj"))
+    for name, (load, attr) in TABLES.items():
+        dicts = [d for d in load() if attr in d]
+        records = RecordClasses(name)
+        makers = (('DataObject', DataObject), ('Record', records.wrap))
+        for label, make in makers:
+            sample = make(dict(dicts[0]))
+            per_read = time_reads(sample, attr, reads)
+            heap = heap_per_object(make, dicts)
+            print("{:<8} {:>4} {:<10} {:>8.0f}ns {:>8} B".format(
+                name, len(dicts), label, per_read * 1e9, heap))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,103 @@
+# scene_bench.py
+# Headless throughput benchmark: runs scenes for many frames without a display,
+# through the real Game.start loop (fixed timestep, frame skip, virtual frame cap).
+# Input can be recorded in a window (GINT_HEADLESS=0 ... --record FILE), then
+# fed back with --replay FILE: the scene runs until the end of the recording.
+# Run from the cpgame/ folder: python scene_bench.py [scene ...] [--frames N] [--record FILE | --replay FILE]
+import os
+import sys
+import time
+
+os.environ.setdefault('GINT_HEADLESS', '1')  # Must be set before gint is imported
+
+import gint
+from cpgame.engine.game import Game
+from cpgame.engine.systems import InputManager
+
+SCENES = {
+    # The boot scene sets up the JRPG session, then switches to SceneMap
+    'map': ('cpgame.game_scenes.jrpg_boot_scene', 'JRPG_BootScene'),
+}
+FRAMES = 2000
+USAGE = "usage: python scene_bench.py [scene ...] [--frames N] [--record FILE | --replay FILE]"
+
+def load_scene(name):
+    module_path, class_name = SCENES[name]
+    module = __import__(module_path, None, None, (class_name,))
+    return getattr(module, class_name)
+
+class ReplayInput(InputManager):
+    """Stops the game once the replay has reached its last recorded frame."""
+    def __init__(self, game):
+        super().__init__()
+        self.game = game
+
+    def update(self):
+        super().update()
+        if gint.input_replay_done():
+            self.game.running = False
+
+def run_scene(scene_class, frames, replay=None, record=None):
+    """Runs Game.start for `frames` frames, or to the end of `replay`. Returns (frames, seconds)."""
+    if replay:
+        gint.input_replay(replay)
+    elif record:
+        gint.input_record(record)
+    game = Game()
+    if replay:
+        game.input = ReplayInput(game)
+    else:
+        game.max_frames = frames
+
+    start = time.perf_counter()
+    game.start(scene_class)
+    elapsed = time.perf_counter() - start
+    gint.input_stop()
+
+    while game.scenes:
+        game.scenes.pop().destroy()
+    return game.frames, elapsed
+
+def usage(error=None):
+    if error:
+        print(error)
+    print(USAGE)
+    print("scenes: {}".format(", ".join(sorted(SCENES))))
+    sys.exit(2 if error else 0)
+
+def main(argv):
+    frames = FRAMES
+    replay = record = None
+    names = []
+    args = iter(argv)
+    for arg in args:
+        if arg in ('-h', '--help'):
+            usage()
+        elif arg in ('--frames', '--replay', '--record'):
+            value = next(args, None)
+            if value is None:
+                usage("{} needs a value".format(arg))
+            if arg == '--frames':
+                if not value.isdigit():
+                    usage("--frames needs a number, not '{}'".format(value))
+                frames = int(value)
+            elif arg == '--replay':
+                replay = value
+            else:
+                record = value
+        elif arg in SCENES:
+            names.append(arg)
+        else:
+            usage("unknown scene or option '{}'".format(arg))
+    names = names or sorted(SCENES)
+
+    print("headless: {}".format("yes" if gint.HEADLESS else "no"))
+    print("{:<12} {:>8} {:>10} {:>10} {:>9}".format("scene", "frames", "total", "per frame", "fps"))
+    for name in names:
+        done, elapsed = run_scene(load_scene(name), frames, replay, record)
+        print("{:<12} {:>8} {:>9.2f}s {:>8.3f}ms {:>9.1f}".format(
+            name, done, elapsed, elapsed * 1000 / done if done else 0.0,
+            done / elapsed if elapsed else 0.0))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+# scene_stack_bench.py
+# Map -> shop -> map round trips: cold rebuild (change_scene both ways, as before
+# the scene stack) against call_scene/return_scene (suspend and restore the map).
+# With --heap the heap emulator runs and the peak is printed; run one mode per
+# process so the peaks don't mix.
+# Run from the cpgame/ folder: python scene_stack_bench.py cold|stack [--trips N] [--heap]
+import os
+import sys
+import time
+
+os.environ.setdefault('GINT_HEADLESS', '1')  # Must be set before gint is imported
+
+import gint
+from cpgame.engine.game import Game
+from scene_bench import load_scene
+
+TRIPS = 20
+GOODS = [[0, 1, 0, 0, False]]
+
+def round_trip(game, mode):
+    """Opens the shop from the map and goes back. Returns the seconds spent going back."""
+    from cpgame.game_scenes.scene_map import SceneMap
+    from cpgame.game_scenes.shop_scene import SceneShop
+    if mode == 'cold':
+        game.change_scene(SceneShop, goods=GOODS, purchase_only=False)
+    else:
+        game.call_scene(SceneShop, goods=GOODS, purchase_only=False)
+    game.scenes[-1].draw(0)
+
+    start = time.perf_counter()
+    if mode == 'cold':
+        game.change_scene(SceneMap)
+    else:
+        game.return_scene()
+    game.scenes[-1].draw(0)  # The map is only back once drawn
+    return time.perf_counter() - start
+
+def main(argv):
+    trips = TRIPS
+    heap = False
+    modes = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--trips':
+            trips = int(next(args))
+        elif arg == '--heap':
+            heap = True
+        else:
+            modes.append(arg)
+    mode = modes[0] if modes else 'stack'
+    if heap:
+        gint.heap_enable(enforce=False)
+
+    game = Game()
+    game.running = True
+    game.change_scene(load_scene('map'))
+    game.scenes[-1].draw(0)
+    round_trip(game, mode)  # Warm up module imports
+
+    times = sorted(round_trip(game, mode) for _ in range(trips))
+    print("{}: back to the map in {:.2f}ms (median of {}), best {:.2f}ms".format(
+        mode, times[len(times) // 2] * 1000, trips, times[0] * 1000))
+    if heap:
+        print("{}: heap peak {}B (traced bytes x HEAP_SCALE {})".format(
+            mode, gint.heap_stats()['peak'], gint.HEAP_SCALE))
+
+    while game.scenes:
+        game.scenes.pop().destroy()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+# device_bench.py
+# Measures the cost model of gint draw calls on the device, for the simulator's
+# device speed estimate (GINT_DEVICE_SPEED=1 GINT_DEVICE_COSTS=costs.json).
+# Run it on the calculator and copy the printed JSON into costs.json.
+import gc, gint
+import time  # MicroPython exposes ticks_* here
+
+REPEAT = 50
+
+def _screen_size():
+    try:
+        return gint.DWIDTH, gint.DHEIGHT
+    except Exception:
+        return 320, 528
+
+def _interpreter_probe(n=2000):
+    # Must stay identical to gint._interpreter_probe() of the simulator
+    total = 0
+    values = [1, 2, 3, 4]
+    for i in range(n):
+        total += values[i & 3] * i
+        if total > 1000000:
+            total -= 1000000
+    return total
+
+def _time_us(func, *args):
+    """Average time of one func(*args) call, in microseconds."""
+    gc.collect()
+    t0 = time.ticks_us()
+    for _ in range(REPEAT):
+        func(*args)
+    return time.ticks_diff(time.ticks_us(), t0) / REPEAT
+
+def _fit(small_us, small_px, large_us, large_px):
+    """Solve cost = call + pixels * pixel from two measurements."""
+    pixel_us = (large_us - small_us) / (large_px - small_px)
+    return max(0.0, small_us - pixel_us * small_px), max(0.0, pixel_us)
+
+def bench(image):
+    screen_w, screen_h = _screen_size()
+    call_us = {}
+    pixel_us = {}
+
+    def measure(name, small, small_px, large, large_px):
+        call_us[name], pixel_us[name] = _fit(_time_us(*small), small_px,
+                                             _time_us(*large), large_px)
+
+    measure('drect', (gint.drect, 0, 0, 1, 1, gint.C_RED), 4,
+            (gint.drect, 0, 0, 99, 99, gint.C_RED), 10000)
+    measure('dsubimage', (gint.dsubimage, 0, 0, image, 0, 0, 8, 8), 64,
+            (gint.dsubimage, 0, 0, image, 0, 0, 64, 64), 4096)
+    measure('dline', (gint.dline, 0, 0, 1, 0, gint.C_BLUE), 2,
+            (gint.dline, 0, 0, 199, 0, gint.C_BLUE), 200)
+
+    text = "Hello, world! 0123456789"
+    text_w, text_h = gint.dsize(text, None)
+    char_w, char_h = gint.dsize("a", None)
+    measure('dtext', (gint.dtext, 0, 0, gint.C_BLACK, "a"), char_w * char_h,
+            (gint.dtext, 0, 0, gint.C_BLACK, text), text_w * text_h)
+    call_us['dtext_opt'], pixel_us['dtext_opt'] = call_us['dtext'], pixel_us['dtext']
+    call_us['dtile'], pixel_us['dtile'] = call_us['dsubimage'], pixel_us['dsubimage']
+
+    image_px = image.width * image.height
+    call_us['dimage'] = call_us['dsubimage']
+    pixel_us['dimage'] = max(0.0, (_time_us(gint.dimage, 0, 0, image) - call_us['dimage']) / image_px)
+
+    call_us['dpixel'] = _time_us(gint.dpixel, 0, 0, gint.C_RED)
+    screen_px = screen_w * screen_h
+    call_us['dclear'] = 0.0
+    pixel_us['dclear'] = _time_us(gint.dclear, gint.C_WHITE) / screen_px
+    call_us['dupdate'] = _time_us(gint.dupdate)
+
+    python_us = _time_us(_interpreter_probe)
+    return call_us, pixel_us, python_us
+
+def _json_dict(values):
+    return "{" + ", ".join('"%s": %.4f' % (k, values[k]) for k in sorted(values)) + "}"
+
+# ---------------- run ----------------
+
+mod = __import__('a_img', None, None, ('image',))
+call_us, pixel_us, python_us = bench(mod.image)
+del mod
+
+print('{"call_us": %s,\n "pixel_us": %s,\n "python_us": %.2f}' % (
+    _json_dict(call_us), _json_dict(pixel_us), python_us))
@@ -3,6 +3,7 @@
 
 from cpgame.engine.animation import AnimationFrame, Animation
 from cpgame.engine.logger import log
+from cpgame.engine.profiler import track_heap
 
 try:
     from typing import Optional, Dict, Any, Set, List, Tuple, Union
@@ -58,7 +59,8 @@ class AssetManager:
         try:
             # Dynamic import
             module_path = f"{base_path}.{asset_name}"
-            module = __import__(module_path, None, None, ('',))
+            with track_heap("assets"):
+                module = __import__(module_path, None, None, ('',))
             self._loaded_modules[asset_name] = module
             
             if isinstance(elements, tuple) and len(elements) == 3:
@@ -131,7 +133,8 @@ class AssetManager:
             elif isinstance(animation_identifier, str):
                 # Load from module attribute (consolidated dict like "sprites")
                 module_path = f"{base_path}.{asset_name}"
-                module = __import__(module_path, None, None, ('',))
+                with track_heap("assets"):
+                    module = __import__(module_path, None, None, ('',))
                 self._loaded_modules[asset_name] = module
                 animation_dict = getattr(module, animation_identifier)
             else:
@@ -7,17 +7,32 @@ try:
 except:
     pass
 
+# Game loop timing of a scene (Scene.timing)
+TIMING_LOCKSTEP = "lockstep"  # One update() per drawn frame, a slow frame slows the game
+TIMING_REALTIME = "realtime"  # update() follows the clock, frames are dropped to keep up
+
 class Scene:
     """
     The base class for all game states, inspired by Phaser.Scene.
-    A Scene has a lifecycle: init -> create -> update/draw -> destroy.
+    A Scene has a lifecycle: init -> preload -> create -> update/draw -> destroy.
     """
+    timing = TIMING_LOCKSTEP
+
     def __init__(self, game: 'Game', **kwargs):
         self.game = game
         self.assets = game.assets
         self.input = game.input
         self._kwargs = kwargs # Store arguments for the scene
 
+    def preload(self) -> List[Any]:
+        """
+        Called before create() and restore(). Returns the load jobs of the
+        scene: generators doing a long load in steps, yielding after each one
+        its progress from 0 to 1 (or None). The game runs them in time slices
+        and shows a progress bar in between.
+        """
+        return []
+
     def create(self):
         """Called once when the scene is started."""
         pass
@@ -29,6 +44,22 @@ class Scene:
         """
         pass
 
+    def suspend(self) -> bytes:
+        """
+        Called when a scene is pushed on top of this one. Returns the state to
+        bring back as bytes, and frees everything else: the scene object is
+        dropped until restore(). By default nothing is kept.
+        """
+        self.destroy()
+        return b''
+
+    def restore(self, snapshot: bytes):
+        """
+        Called instead of create() on a new instance of the scene, with the
+        bytes returned by suspend(). resume() is called next.
+        """
+        self.create()
+
     def update(self, dt: float) -> Optional[str]:
         """
         Called every logic frame. 'dt' is the fixed timestep.
@@ -37,7 +68,11 @@ class Scene:
         pass
 
     def draw(self, frame_time_ms: int):
-        """Called every render frame to draw the scene."""
+        """
+        Called every render frame to draw the scene. 'frame_time_ms' is the
+        duration of the previous frame. In real-time scenes, game.alpha is how
+        far the clock is past the last update, in steps (0 to 1).
+        """
         pass
 
     def destroy(self):
@@ -8,7 +8,7 @@ except:                         # MicroPython or stripped env
     pass
 
 # Engine imports
-from cpgame.engine.scene import Scene
+from cpgame.engine.scene import Scene, TIMING_REALTIME
 from cpgame.engine.geometry import Vec2, Rect
 from cpgame.engine.animation import AnimationState
 
@@ -100,6 +100,8 @@ class Block:
         return C_WHITE
 
 class GeoDashScene(Scene):
+    timing = TIMING_REALTIME # The level scrolls at the same speed however slow drawing is
+
     def __init__(self, game):
         super().__init__(game)
         self.player = Player()
@@ -255,12 +257,17 @@ class GeoDashScene(Scene):
         
         # Clear background
         dclear(COLOR_BG)
+
+        # Scroll on by the time elapsed since the last update
+        camera_x = self.camera_x
+        if self.player.state in (STATE_NORMAL, STATE_JUMPING):
+            camera_x += PLAYER_SPEED * self.game.fixed_timestep * self.game.alpha
         
         # Draw blocks
         for block in self.blocks:
             block_rect = block.get_rect()
             # Only draw blocks that are on screen
-            screen_x = block_rect.x - self.camera_x
+            screen_x = block_rect.x - camera_x
             if screen_x > -BLOCK_SIZE and screen_x < DWIDTH + BLOCK_SIZE:
                 drect(
                     int(screen_x), 
@@ -1,7 +1,16 @@
 # scenes/templar_scene.py
 # The complete Templar platformer game, refactored into a Scene.
 
+from array import array
 from gint import *
+try:
+    from gint import TileAtlas # Simulator only
+except ImportError:
+    TileAtlas = None
+try:
+    from gint import dtiles # Simulator only, no PythonExtra version yet
+except ImportError:
+    dtiles = None
 try:
     from typing import Optional, Tuple, List, Dict, Any, Generator
 except:                         # MicroPython or stripped env
@@ -124,6 +133,7 @@ class TemplarScene(Scene):
         self.flags_taken: int = 0
         self.flag_cursor: int = 0
         self.dirty_tiles: Optional[bytearray] = None
+        self.tile_batch = None # (x, y, tile_id) triples for dtiles()
         self.game_time: float = 0.0
         self.deaths: int = 0
         self.reset_timer: float = -1.0
@@ -133,6 +143,7 @@ class TemplarScene(Scene):
         self.debug_resolution: Rect = Rect(0,0,0,0)
         # --- Asset References ---
         self.tileset: Optional[Tilemap] = None
+        self.atlas = None
         # self.animations: Dict = {}
         self.animation_variant_manager: AnimationVariantManager = AnimationVariantManager()
         self.dt = 0.0
@@ -146,6 +157,8 @@ class TemplarScene(Scene):
         self.tileset = self.assets.tileset("templar_data", ("tilesetImage", "tilesetBoxes", "tilesetSolid"))
         if not self.tileset:
             raise Exception("Failed to load 'templar_data' tileset.")
+        if TileAtlas:
+            self.atlas = TileAtlas(self.tileset.img, 16)
         
         # self.tileset = self.assets.tilesets["templar"]
 
@@ -203,6 +216,9 @@ class TemplarScene(Scene):
         # Setup rendering state
         self.dirty_tiles = bytearray(self.room.w * self.room.h)
         for i in range(len(self.dirty_tiles)): self.dirty_tiles[i] = 1
+        if dtiles:
+            # Background and tile for every cell of the room
+            self.tile_batch = array('h', bytes(12 * self.room.w * self.room.h))
         
         self.show_next_flags(1)
 
@@ -434,6 +450,9 @@ class TemplarScene(Scene):
 
     def draw_room(self):
         assert self.room
+        if self.tile_batch and self.room.tiles and self.dirty_tiles:
+            self.draw_room_batched()
+            return
         i = 0
         if self.room.tiles:
             for ty in range(self.room.h):
@@ -445,12 +464,44 @@ class TemplarScene(Scene):
                         self.dirty_tiles[i] = 0
                     i += 1
     
+    def draw_room_batched(self):
+        """draw_room() through dtiles(): all the dirty tiles in one call."""
+        room = self.room
+        img = room.tileset.img
+        w = img.width >> 4
+        background = 3 * w + 11 # (176, 48)
+        tiles = self.tile_batch
+        dirty = self.dirty_tiles
+        n = 0
+        i = 0
+        for ty in range(room.h):
+            for tx in range(room.w):
+                if dirty[i]:
+                    t = room.tiles[i]
+                    if t == 101 and self.flags_data.get((tx, ty), True): t = 0xff
+                    sx, sy = MAP_X + 16 * tx, MAP_Y + 16 * ty
+                    tiles[n], tiles[n + 1], tiles[n + 2] = sx, sy, background
+                    n += 3
+                    if 16 * (t // w) < img.height:
+                        tiles[n], tiles[n + 1], tiles[n + 2] = sx, sy, t
+                        n += 3
+                    dirty[i] = 0
+                i += 1
+        dtiles(img, 16, 16, w, tiles, n // 3)
+
     def draw_tile(self, x: int, y: int, tileID: int):
         assert self.room
         assert self.tileset
         img = self.room.tileset.img # self.tileset.img ?
         sx, sy = MAP_X + 16 * x, MAP_Y + 16 * y
-        w = img.width >> 4; tx, ty = tileID % w, tileID // w
+        w = img.width >> 4
+        atlas = self.atlas
+        if atlas and atlas.img is img:
+            dtile(sx, sy, atlas, 3 * w + 11) # background (176, 48)
+            if 16 * (tileID // w) < img.height:
+                dtile(sx, sy, atlas, tileID)
+            return
+        tx, ty = tileID % w, tileID // w
         dsubimage(sx, sy, img, 176, 48, 16, 16) # background
         if 16 * ty < img.height:
             dsubimage(sx, sy, img, 16 * tx, 16 * ty, 16, 16)
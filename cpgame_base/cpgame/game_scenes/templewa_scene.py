@@ -1,7 +1,12 @@
 # cpgame/game_scenes/templewa_scene.py
 # A complete and faithful port of the "templewa" game into a cpgame scene.
 
+from array import array
 from gint import *
+try:
+    from gint import dtiles # Simulator only, no PythonExtra version yet
+except ImportError:
+    dtiles = None
 try:
     from typing import Optional, List, Dict, Any, Tuple, Set
     from cpgame.engine.game import Game
@@ -546,6 +551,7 @@ class TemplewaScene(Scene):
         self.crystal_hp = 100
         self.to_remove_entities: List[Entity] = []
         self.to_draw_calls = []
+        self.tile_batch = None # (x, y, tile_id) triples for dtiles()
         self.menu_idx = 0
         self.pause_idx = 0
         self.debug_mode = False
@@ -734,6 +740,9 @@ class TemplewaScene(Scene):
 
     def draw_map_full(self):
         dclear(C_BLACK) # Or a background color
+        if dtiles:
+            self.draw_map_full_batched()
+            return
         for y in range(
             max(0, self.camera.y // self.map.tile_size),
             min(self.map.height, ((self.camera.y + DH) // self.map.tile_size)),
@@ -747,6 +756,27 @@ class TemplewaScene(Scene):
         self.refreshCrystal = True
         self.refreshLife = True
     
+    def draw_map_full_batched(self):
+        """draw_map_full() through dtiles(): the visible map in one call."""
+        size = self.map.tile_size
+        y_range = range(max(0, self.camera.y // size), min(self.map.height, ((self.camera.y + DH) // size)))
+        x_range = range(max(0, self.camera.x // size), min(self.map.width, ((self.camera.x + DW) // size) + 1))
+        count = len(y_range) * len(x_range)
+        if self.tile_batch is None or len(self.tile_batch) < 3 * count:
+            self.tile_batch = array('h', bytes(6 * count))
+        tiles = self.tile_batch
+        n = 0
+        for y in y_range:
+            draw_y = int((y * size) - self.camera.y)
+            for x in x_range:
+                tiles[n] = int((x * size) - self.camera.x)
+                tiles[n + 1] = draw_y
+                tiles[n + 2] = self.map.get(x, y)
+                n += 3
+        dtiles(templewa_data.tiles, size, size, 5, tiles, count)
+        self.refreshCrystal = True
+        self.refreshLife = True
+
     def draw_map_edited(self):
         for x, y in self.map.edited:
             self.draw_tile(x, y)
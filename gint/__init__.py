@@ -0,0 +1,2587 @@
+import time
+import pygame
+from pygame.locals import *
+import sys
+import os
+import struct
+import zlib
+import atexit
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np  # Optional, speeds up image decoding
+except ImportError:
+    np = None
+
+
+# Display dimensions: 396x224 (fx-CG50) by default, GINT_SCREEN=320x528 for
+# the ClassPad (fx-CP400)
+DWIDTH, DHEIGHT = map(int, os.environ.get('GINT_SCREEN', '396x224').lower().split('x'))
+
+C_WHITE = 0xFFFF
+C_LIGHT = 0xad55
+C_DARK  = 0x528a
+C_BLACK = 0x0000
+C_RED = 0b11111_000000_00000
+C_GREEN = 0b00000_111111_00000
+C_BLUE = 0b00000_000000_11111
+C_NONE = -1
+C_INVERT = -2
+
+# Text alignment constants
+DTEXT_LEFT = 'left'
+DTEXT_CENTER = 'center'
+DTEXT_RIGHT = 'right'
+DTEXT_TOP = 'top'
+DTEXT_MIDDLE = 'middle'
+DTEXT_BOTTOM = 'bottom'
+
+# Headless mode (benchmarks, CI): set GINT_HEADLESS=1 to render into VRAM
+# only, on the SDL dummy driver. dupdate() then skips presenting and the FPS
+# throttle, and time.ticks_ms() follows a virtual clock instead of the wall.
+HEADLESS = os.environ.get('GINT_HEADLESS', '0') not in ('', '0')
+if HEADLESS:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# The window opens on first use (dupdate(), key input) in _display_init(), so
+# tools that only need images import gint without one. VRAM needs no display.
+screen = None
+# RGB565 VRAM: set GINT_VRAM_RGB565=1 to keep VRAM in the device layout (one
+# uint16 RGB565 word per pixel). Draw calls then write RGB565 values as-is,
+# dgetpixel() returns them, and conversion to RGB888 only happens in dupdate().
+VRAM_RGB565 = os.environ.get('GINT_VRAM_RGB565', '0') not in ('', '0')
+_RGB565_MASKS = (0xF800, 0x07E0, 0x001F, 0)
+if VRAM_RGB565:
+    vram = pygame.Surface((DWIDTH, DHEIGHT), 0, 16, _RGB565_MASKS)
+else:
+    vram = pygame.Surface((DWIDTH, DHEIGHT))
+clock = pygame.time.Clock()
+FPS = 100  # Adjust to control game speed
+
+# Virtual clock of headless mode, in microseconds. It only moves forward on
+# dupdate() (one FPS frame) and time.sleep_ms(), so runs are deterministic.
+_virtual_time_us = 0
+
+_slept = {'seconds': 0.0}  # Wall time of sleep_ms/sleep_us, not running the game
+
+def _host_sleep(seconds: float):
+    time.sleep(seconds)
+    _slept['seconds'] += seconds
+
+def _virtual_sleep_us(us: int):
+    global _virtual_time_us
+    if us > 0:
+        _virtual_time_us += int(us)
+
+# Dirty rectangles: drawing calls record the VRAM area they touched, and
+# dupdate() only presents those regions instead of flipping the whole screen.
+DIRTY_RECTS = True
+DIRTY_RECTS_MAX = 8  # More regions than this are presented as their union
+DEBUG_DIRTY_RECTS = os.environ.get('GINT_DEBUG_DIRTY', '0') != '0'  # Flash presented regions
+DEBUG_DIRTY_COLOR = (255, 0, 255)
+
+_dirty_rects = [pygame.Rect(0, 0, DWIDTH, DHEIGHT)]  # Present everything on the first frame
+_flashed_rects = []
+
+def _display_init():
+    """Initializes pygame and opens the window."""
+    global screen
+    if screen is not None:
+        return
+    pygame.init()
+    screen = pygame.display.set_mode((DWIDTH, DHEIGHT))
+    pygame.display.set_caption("ClassPad")
+    pygame.event.set_allowed(None) # Allow all events initially
+    pygame.event.set_blocked([MOUSEMOTION, MOUSEBUTTONUP, MOUSEBUTTONDOWN]) # Block mouse by default
+
+# --- NEW: Window Clipping State ---
+_dwindow = (0, 0, DWIDTH, DHEIGHT)
+
+def _to_rgb(color: int) -> tuple:
+    """Convert RGB888 int to pygame color tuple"""
+    # return ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+    # if it fits in 16 bits, decode RGB565 → RGB888
+    if 0 <= color <= 0xFFFF:
+        r5 = (color >> 11) & 0x1F
+        g6 = (color >>  5) & 0x3F
+        b5 =  color        & 0x1F
+        # expand to 8 bits:   abcde → abcde00 | abcde>>3
+        r8 = (r5 << 3) | (r5 >> 2)
+        g8 = (g6 << 2) | (g6 >> 4)
+        b8 = (b5 << 3) | (b5 >> 2)
+        return (r8, g8, b8)
+    # otherwise assume it’s already RGB888
+    return ((color >> 16) & 0xFF,
+            (color >>  8) & 0xFF,
+             color        & 0xFF)
+
+def _to_rgb565_mapped(color: int) -> int:
+    """Convert a color to the pixel value of the RGB565 VRAM"""
+    if 0 <= color <= 0xFFFF:
+        return color
+    return vram.map_rgb(_to_rgb(color))
+
+# Color argument of draw calls on VRAM
+_vram_color = _to_rgb565_mapped if VRAM_RGB565 else _to_rgb
+
+def _from_rgb(pixel: pygame.Color) -> int:
+    """Convert pygame color to RGB888 int"""
+    return (pixel[0] << 16) | (pixel[1] << 8) | pixel[2]
+
+def C_RGB(r: int, g: int, b: int) -> int:
+    """Create RGB888 from RGB555 components"""
+    # r8 = (r << 3) | (r >> 2)
+    # g8 = (g << 3) | (g >> 2)
+    # b8 = (b << 3) | (b >> 2)
+    # return (r8 << 16) | (g8 << 8) | b8
+    return ((r & 0x1F) << 11) | ((g & 0x3F) << 6) | (b & 0x1F)
+
+def dwindow_get() -> Tuple[int, int, int, int]:
+    """Get the current rendering window clipping rectangle."""
+    return _dwindow
+
+def dwindow_set(left: int, top: int, right: int, bottom: int):
+    """Set the rendering window to clip drawing operations."""
+    global _dwindow
+    _dwindow = (left, top, right, bottom)
+    
+    # Use pygame's built-in clipping for efficiency
+    clip_rect = pygame.Rect(left, top, right - left, bottom - top)
+    vram.set_clip(clip_rect)
+
+# Drawing functions
+def dclear(color: int):
+    if color == C_NONE:
+        return
+    _dirty_rects.append(vram.fill(_vram_color(color)))
+
+def _coalesce_rects(rects: List[pygame.Rect], max_rects: int) -> List[pygame.Rect]:
+    """Merge touching or overlapping rects, down to max_rects regions"""
+    merged = []
+    for rect in rects:
+        if not rect.width or not rect.height:
+            continue
+        index = rect.inflate(2, 2).collidelist(merged)
+        while index >= 0:
+            rect = rect.union(merged.pop(index))
+            index = rect.inflate(2, 2).collidelist(merged)
+        merged.append(rect)
+    if len(merged) > max_rects:
+        merged = [merged[0].unionall(merged[1:])]
+    return merged
+
+def dupdate():
+    """Update display with VRAM changes"""
+    global _flashed_rects, _frame_count
+    _frame_count += 1
+    if _memory_tracker['enabled']:
+        _heap_sample()  # Per-frame peak, and the budget check
+    if HEADLESS:
+        _dirty_rects.clear()
+        _virtual_sleep_us(1_000_000 // FPS)  # Stands in for clock.tick(FPS)
+        return
+    if screen is None:
+        _display_init()
+    if DIRTY_RECTS:
+        # Regions flashed last frame are restored from VRAM
+        rects = _coalesce_rects(_dirty_rects + _flashed_rects, DIRTY_RECTS_MAX)
+        for rect in rects:
+            screen.blit(vram, rect, rect)
+        _flashed_rects = []
+        if DEBUG_DIRTY_RECTS:
+            for rect in rects:
+                pygame.draw.rect(screen, DEBUG_DIRTY_COLOR, rect, 1)
+            _flashed_rects = rects[:]
+        if _profile_overlay:
+            overlay = _draw_profile_overlay(screen)
+            rects.append(overlay)
+            _flashed_rects.append(overlay)
+        if rects:
+            pygame.display.update(rects)
+    else:
+        screen.blit(vram, (0, 0))
+        if _profile_overlay:
+            _draw_profile_overlay(screen)
+        pygame.display.flip()
+    _dirty_rects.clear()
+    for event in pygame.event.get(QUIT): # Essential to keep window responsive
+        pygame.quit()
+        sys.exit()
+    if _replay is None:
+        clock.tick(FPS)
+
+def dpixel(x: int, y: int, color: int):
+    if color == C_NONE or not (0 <= x < DWIDTH and 0 <= y < DHEIGHT):
+        return
+    vram.set_at((x, y), _vram_color(color))
+    _dirty_rects.append(pygame.Rect(x, y, 1, 1))
+
+def dgetpixel(x: int, y: int) -> int:
+    if not (0 <= x < DWIDTH and 0 <= y < DHEIGHT):
+        return C_NONE
+    if VRAM_RGB565:
+        return vram.get_at_mapped((x, y))
+    return _from_rgb(vram.get_at((x, y)))
+
+def drect(x1: int, y1: int, x2: int, y2: int, color: int):
+    if color == C_NONE:
+        return
+    x = min(x1, x2)
+    y = min(y1, y2)
+    w = abs(x2 - x1) + 1
+    h = abs(y2 - y1) + 1
+    _dirty_rects.append(pygame.draw.rect(vram, _vram_color(color), pygame.Rect(x, y, w, h)))
+
+def drect_border(x1: int, y1: int, x2: int, y2: int,
+               fill: int, border_width: int, border: int):
+    if fill != C_NONE:
+        drect(x1, y1, x2, y2, fill)
+    
+    if border != C_NONE and border_width > 0:
+        x = min(x1, x2)
+        y = min(y1, y2)
+        w = abs(x2 - x1)
+        h = abs(y2 - y1)
+        _dirty_rects.append(pygame.draw.rect(vram, _vram_color(border), pygame.Rect(x, y, w, h), border_width))
+
+class _VRAMView:
+    """Context manager of dvram_view()"""
+    def __init__(self):
+        self._buffer = None
+        self.pixels = None
+
+    def __enter__(self) -> memoryview:
+        self._buffer = vram.get_buffer()
+        self.pixels = memoryview(self._buffer).cast('B').cast(
+            'H', (DHEIGHT, vram.get_pitch() // 2))
+        return self.pixels
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.pixels.release()
+        self.pixels = None
+        self._buffer = None  # Unlocks VRAM
+        _dirty_rects.append(vram.get_rect())
+
+def dvram_view() -> _VRAMView:
+    """
+    Simulator only: direct access to the RGB565 VRAM, as a 2D memoryview
+    of uint16 indexed [y, x]. VRAM is locked while the view is open.
+
+        with dvram_view() as pixels:
+            pixels[y, x] = C_RED
+    """
+    if not VRAM_RGB565:
+        raise RuntimeError("dvram_view() needs the RGB565 VRAM (GINT_VRAM_RGB565=1)")
+    return _VRAMView()
+
+def dline(x1: int, y1: int, x2: int, y2: int, color: int):
+    if color == C_NONE:
+        return
+    _dirty_rects.append(pygame.draw.line(vram, _vram_color(color), (x1, y1), (x2, y2)))
+
+def dhline(y: int, color: int):
+    dline(0, y, DWIDTH-1, y, color)
+
+def dvline(x: int, color: int):
+    dline(x, 0, x, DHEIGHT-1, color)
+
+def dcircle(x: int, y: int, r: int, fill: int, border: int):
+    if fill != C_NONE:
+        _dirty_rects.append(pygame.draw.circle(vram, _vram_color(fill), (x, y), r))
+    if border != C_NONE:
+        _dirty_rects.append(pygame.draw.circle(vram, _vram_color(border), (x, y), r, 1))
+
+def dellipse(x1: int, y1: int, x2: int, y2: int, fill: int, border: int):
+    rect = pygame.Rect(min(x1, x2), min(y1, y2), abs(x2-x1), abs(y2-y1))
+    if fill != C_NONE:
+        _dirty_rects.append(pygame.draw.ellipse(vram, _vram_color(fill), rect))
+    if border != C_NONE:
+        _dirty_rects.append(pygame.draw.ellipse(vram, _vram_color(border), rect, 1))
+
+def _int16_buffer(vertices):
+    """Flat coordinates as indexable ints: lists and tuples as they are,
+    int16 buffers (array('h'), memoryview) read in place. Used by dpoly(),
+    PolyShape and dtiles()"""
+    if isinstance(vertices, (list, tuple)):
+        return vertices
+    view = memoryview(vertices)
+    if view.format != 'h':
+        raise TypeError("Buffer must hold int16 ('h'), not '{}'".format(view.format))
+    return view.cast('B').cast('h')
+
+def dpoly(vertices, fill: int, border: int):
+    """
+    Draw polygon with fill and border. `vertices` is a flat x0, y0, x1, y1...
+    list, or an int16 buffer (array('h'), memoryview) read without a copy.
+    """
+    vertices = _int16_buffer(vertices)
+    if len(vertices) & 1:
+        raise ValueError("Vertices must contain even number of coordinates")
+
+    points = list(zip(vertices[0::2], vertices[1::2]))
+
+    # Draw filled polygon
+    if fill != C_NONE:
+        _dirty_rects.append(pygame.draw.polygon(vram, _vram_color(fill), points, 0))
+
+    # Draw border
+    if border != C_NONE:
+        _dirty_rects.append(pygame.draw.polygon(vram, _vram_color(border), points, 1))
+
+def _draw_polys(surface: pygame.Surface, coords, sizes, fills, borders) -> List[pygame.Rect]:
+    """dpolys() on any surface, returns the drawn rects"""
+    rects = []
+    draw = pygame.draw.polygon
+    fill = fills if isinstance(fills, int) else None
+    border = borders if isinstance(borders, int) else None
+    start = 0
+    for k, size in enumerate(sizes):
+        end = start + 2 * size
+        if end > len(coords):
+            raise ValueError("Vertex buffer is shorter than the polygon sizes")
+        points = list(zip(coords[start:end:2], coords[start + 1:end:2]))
+        start = end
+        color = fills[k] if fill is None else fill
+        if color != C_NONE:
+            rects.append(draw(surface, _vram_color(color), points, 0))
+        color = borders[k] if border is None else border
+        if color != C_NONE:
+            rects.append(draw(surface, _vram_color(color), points, 1))
+    return rects
+
+def dpolys(vertices, sizes, fills, borders=C_NONE):
+    """
+    Draw many polygons from one packed int16 buffer (array('h')) of their x, y
+    coordinates, one polygon after the other. sizes[k] is the number of points
+    of polygon k; fills and borders are one color per polygon (a sequence,
+    like array('i')) or a single color for all of them. Same pixels as one
+    dpoly() per polygon, in order.
+    """
+    _dirty_rects.extend(_draw_polys(vram, _int16_buffer(vertices), sizes, fills, borders))
+
+class PolyShape:
+    """
+    Polygons compiled once for shapes that are redrawn unchanged: the dpolys()
+    arguments are rasterized into a cached surface, and dshape() draws it with
+    a single blit. dshape(0, 0, shape) gives the same pixels as dpolys() with
+    the same arguments; other offsets move the shape, minus what was
+    offscreen. Simulator only, call dpolys() or dpoly() on the calculator.
+    """
+    def __init__(self, vertices, sizes, fills, borders=C_NONE):
+        # Pixel value of every color, plus an unused one for the transparent key
+        pixels = set()
+        for colors in (fills, borders):
+            for color in ((colors,) if isinstance(colors, int) else colors[:len(sizes)]):
+                if color != C_NONE:
+                    pixels.add(vram.map_rgb(_to_rgb(color)))
+        key = 0
+        while key in pixels:
+            key += 1
+
+        # Rasterized where dpolys() would draw them, so that borders crossing
+        # the screen edge are clipped the same way; what is offscreen is cut
+        screen = pygame.Surface((DWIDTH, DHEIGHT), 0, vram)
+        screen.fill(key)
+        rects = _draw_polys(screen, _int16_buffer(vertices), sizes, fills, borders)
+        area = rects[0].unionall(rects) if rects else pygame.Rect(0, 0, 0, 0)
+        self.x, self.y = area.topleft
+        surface = self.surface = screen.subsurface(area).copy()
+        surface.set_colorkey(surface.unmap_rgb(key))
+
+def dshape(x: int, y: int, shape: PolyShape):
+    """Draw a PolyShape with its coordinates offset by (x, y)"""
+    _dirty_rects.append(vram.blit(shape.surface, (x + shape.x, y + shape.y)))
+
+
+
+# ------------------------------------------------------------------------------
+
+# Fonts
+        
+
+class GintFont:
+    def __init__(self, prop, line_height, data_height, block_count, glyph_count,
+                 char_spacing, line_distance, blocks, data, width, storage_size,
+                 glyph_index, glyph_width):
+        self.prop = prop
+        self.line_height = line_height
+        self.data_height = data_height
+        self.block_count = block_count
+        self.glyph_count = glyph_count
+        self.char_spacing = char_spacing
+        self.line_distance = line_distance
+        self.blocks = blocks
+        self.data = data
+        self.width = width
+        self.storage_size = storage_size
+        self.glyph_index = glyph_index
+        self.glyph_width = glyph_width
+
+
+_default_font = GintFont(  # Create a default font object
+    prop=1, line_height=9, data_height=9, block_count=1,
+    glyph_count=95, char_spacing=1, line_distance=14,
+    blocks=b'', data=b'', width=0, storage_size=0,
+    glyph_index=b'', glyph_width=b''
+)
+_current_font = _default_font
+
+def dfont(font: GintFont):
+    global _current_font
+    _current_font = font
+
+# ------------------------------------------------------------------------------
+
+# Bitmap font, loaded by the first text call
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '_data', 'font8x9.png')
+_uf8x9_font = None
+
+def _load_font_atlas() -> pygame.Surface:
+    """Loads the font atlas, white made transparent. Needs no display."""
+    global _uf8x9_font
+    atlas = pygame.image.load(FONT_PATH)
+    atlas.set_colorkey((255, 255, 255))
+    _uf8x9_font = pygame.Surface(atlas.get_size(), SRCALPHA, 32)
+    _uf8x9_font.fill((255, 255, 255, 0))
+    _uf8x9_font.blit(atlas, (0, 0))
+    return _uf8x9_font
+
+# Font character cache {unicode_code: (surface, width)}
+_font_cache = {}
+
+# Font grid constants
+GLYPH_WIDTH = 8
+GLYPH_HEIGHT = 10
+GAP = 1
+FONT_CELL_WIDTH = GLYPH_WIDTH + GAP*2
+FONT_CELL_HEIGHT = GAP + GLYPH_HEIGHT + GAP*2
+
+# Line definitions (start code, chars per line)
+LINE_DEFS = [
+    (0x0020, 16),  # Space to / (16 chars)
+    (0x0030, 16),  # 0 to ? 
+    (0x0040, 16),  # @ to O
+    (0x0050, 16),  # P to _
+    (0x0060, 16),  # ` to o
+    (0x0070, 16)   # p to DEL
+]
+
+def _get_glyph(font: GintFont, char: str):
+    """Get glyph surface and width with 1px gap grid layout"""
+    code = ord(char)
+    
+    if code in _font_cache:
+        return _font_cache[code]
+    
+    # Find which line the character is in
+    line_index = -1
+    for i, (start, count) in enumerate(LINE_DEFS):
+        if start <= code < start + count:
+            line_index = i
+            break
+    
+    if line_index == -1:
+        _font_cache[code] = _get_glyph(font, ' ')  # Fallback to space
+        return _font_cache[code]
+    
+    # Calculate grid position
+    col = code - LINE_DEFS[line_index][0]
+    row = line_index
+    
+    # Calculate coordinates in texture (with 1px gaps)
+    x = (col * FONT_CELL_WIDTH) - GAP  # Compensate left offset
+    y = (row * FONT_CELL_HEIGHT) - GAP  # Compensate top offset
+    
+    try:
+        # Extract glyph (8x9 area inside cell)
+        glyph = (_uf8x9_font or _load_font_atlas()).subsurface(
+            x + GAP,  # Original GAP compensation
+            y + GAP,   # Original GAP compensation
+            GLYPH_WIDTH + GAP, 
+            GLYPH_HEIGHT + GAP
+        )
+    except ValueError:
+        _font_cache[code] = _get_glyph(font, ' ')  # Fallback
+        return _font_cache[code]
+    
+    # Calculate proportional width from the rightmost non-transparent column
+    bounds = glyph.subsurface(0, 0, GLYPH_WIDTH, GLYPH_HEIGHT).get_bounding_rect()
+    width = bounds.right if bounds.width else GLYPH_WIDTH + 1
+    
+    _font_cache[code] = (glyph, width)
+    return glyph, width
+
+def _build_font_widths(font: GintFont) -> bytes:
+    """Build the glyph width table, indexed by codepoint (ASCII range)"""
+    return bytes(_get_glyph(font, chr(code))[1] for code in range(128))
+
+# Glyph widths {codepoint: width}, non-ASCII characters use the space width.
+# Built by the first text call, see _get_font_widths().
+_font_widths = None
+
+def _get_font_widths() -> bytes:
+    """Builds the glyph width table on first use."""
+    global _font_widths
+    _font_widths = _build_font_widths(_default_font)
+    return _font_widths
+
+def dsize(text: str, font: Optional[GintFont]) -> Tuple[int, int]:
+    """Get the width and height of rendered text."""
+    if not text:
+        return 0, GLYPH_HEIGHT
+    
+    font = font or _current_font
+    
+    if text.isascii():
+        total_width = sum(map((_font_widths or _get_font_widths()).__getitem__, text.encode()))
+    else:
+        widths = _font_widths or _get_font_widths()
+        space_w = widths[32]
+        total_width = sum(widths[code] if code < 128 else space_w
+                          for code in map(ord, text))
+    # Sum of glyph widths + spacing between them
+    total_width += (len(text) - 1) * font.char_spacing
+    
+    return total_width, GLYPH_HEIGHT
+
+def dnsize(text: str, size: int, font: Optional[GintFont]) -> Tuple[int, int]:
+    """Get the width and height of a prefix of a rendered text."""
+    if size < 0:
+        return dsize(text, font)
+    
+    # Simulate byte limit by encoding, slicing, and decoding
+    limited_text = text.encode('utf-8')[:size].decode('utf-8', errors='ignore')
+    return dsize(limited_text, font)
+
+def drsize(text: str, font: Optional[GintFont], width: int) -> Tuple[int, int]:
+    """
+    Determine how many characters fit in a given width.
+
+    Note:
+        The returned byte_offset is not reliable for slicing strings that
+        contain multi-byte Unicode characters. Slicing with `str[:offset]`
+        may fail. This is a known issue.
+    """
+    font = font or _current_font
+    widths = _font_widths or _get_font_widths()
+    spacing = font.char_spacing
+    
+    if text.isascii():
+        # One byte per character: the offset is the number of glyphs that fit
+        actual_width = 0
+        byte_offset = 0
+        for code in text.encode():
+            # Width this character would occupy (including preceding space)
+            char_total_w = widths[code] + (spacing if byte_offset else 0)
+            if actual_width + char_total_w > width:
+                break # Character does not fit, stop here.
+            actual_width += char_total_w
+            byte_offset += 1
+        return byte_offset, actual_width
+    
+    byte_offset = 0
+    actual_width = 0
+    space_w = widths[32]
+    
+    for i, char in enumerate(text):
+        code = ord(char)
+        glyph_w = widths[code] if code < 128 else space_w
+        
+        # Width this character would occupy (including preceding space)
+        char_total_w = glyph_w + (spacing if i > 0 else 0)
+        
+        if actual_width + char_total_w > width:
+            break # Character does not fit, stop here.
+        
+        # It fits, commit the changes
+        actual_width += char_total_w
+        byte_offset += 1 if code < 0x80 else 2 if code < 0x800 else 3 if code < 0x10000 else 4
+        
+    return byte_offset, actual_width
+
+def dwrap(text: str, width: int, font: Optional[GintFont] = None) -> List[Tuple[int, int]]:
+    """
+    Word-wrap text to a given width in one pass.
+
+    Returns the (start, end) character offsets of each line, so that the lines
+    are `text[start:end]`. Lines break on '\n', then at the last space that
+    fits (the space is dropped), and words wider than the line are split.
+    """
+    font = font or _current_font
+    widths = _font_widths or _get_font_widths()
+    space_w = widths[32]
+    spacing = font.char_spacing
+    
+    lines = []
+    start = 0   # Offset of the current line
+    line_w = 0  # Width of text[start:i]
+    space = -1  # Offset of the last space of the current line
+    word_w = 0  # Width of text[space+1:i]
+    i = 0
+    n = len(text)
+    
+    while i < n:
+        char = text[i]
+        if char == '\n':
+            lines.append((start, i))
+            start, line_w, word_w, space = i + 1, 0, 0, -1
+            i += 1
+            continue
+        
+        code = ord(char)
+        char_w = (widths[code] if code < 128 else space_w) + (spacing if i > start else 0)
+        
+        if line_w + char_w > width and i > start:
+            if char == ' ':
+                # Break on this space
+                lines.append((start, i))
+                start, line_w, word_w, space = i + 1, 0, 0, -1
+                i += 1
+            elif space >= 0:
+                # Move the current word to the next line
+                lines.append((start, space))
+                start, line_w, space = space + 1, word_w, -1
+            else:
+                # No space to break on, split the word
+                lines.append((start, i))
+                start, line_w, word_w = i, 0, 0
+            continue
+        
+        line_w += char_w
+        if char == ' ':
+            space, word_w = i, 0
+        else:
+            word_w += char_w if i > space + 1 else char_w - (spacing if i > start else 0)
+        i += 1
+    
+    lines.append((start, n))
+    return lines
+
+
+# --- Text rendering caches ---
+# Tinted glyphs are cached per (font, codepoint, color), and whole rendered strings
+# per (text, color, font) in an LRU, so repeated labels are a single blit.
+GLYPH_CACHE_SIZE = 1024
+TEXT_CACHE_SIZE = 128
+
+_glyph_cache = {}  # {(font, code, color): (surface, width)}
+_text_cache = OrderedDict()  # {(text, color, font): (surface, width, height)}
+_text_cache_stats = {'glyph_hits': 0, 'glyph_misses': 0, 'text_hits': 0, 'text_misses': 0}
+
+def _get_tinted_glyph(font: GintFont, char: str, color: int):
+    """Get glyph surface drawn in color, and its width"""
+    key = (font, ord(char), color)
+    entry = _glyph_cache.get(key)
+    if entry is not None:
+        _text_cache_stats['glyph_hits'] += 1
+        return entry
+    _text_cache_stats['glyph_misses'] += 1
+
+    glyph, width = _get_glyph(font, char)
+    mask = pygame.mask.from_surface(glyph)
+    colored = pygame.Surface(glyph.get_size(), pygame.SRCALPHA)
+    mask.to_surface(colored, setcolor=_to_rgb(color), unsetcolor=(0,0,0,0))
+
+    if len(_glyph_cache) >= GLYPH_CACHE_SIZE:
+        del _glyph_cache[next(iter(_glyph_cache))]  # Drop the oldest glyph
+    entry = _glyph_cache[key] = (colored, width)
+    return entry
+
+def _render_text(text: str, color: int, font: GintFont):
+    """
+    Get the surface of a whole string drawn in color, with its text size.
+    The surface origin is at (-GAP, -GAP) from the text position.
+    """
+    key = (text, color, font)
+    entry = _text_cache.get(key)
+    if entry is not None:
+        _text_cache.move_to_end(key)
+        _text_cache_stats['text_hits'] += 1
+        return entry
+    _text_cache_stats['text_misses'] += 1
+
+    total_width, total_height = dsize(text, font)
+    surface = pygame.Surface((total_width + GLYPH_WIDTH + GAP, GLYPH_HEIGHT + GAP),
+                             pygame.SRCALPHA)
+    cursor_x = 0
+    for char in text:
+        colored, width = _get_tinted_glyph(font, char, color)
+        surface.blit(colored, (cursor_x, 0))
+        cursor_x += width + font.char_spacing
+
+    if TEXT_CACHE_SIZE > 0:
+        if len(_text_cache) >= TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)  # Drop the least recently used run
+        _text_cache[key] = (surface, total_width, total_height)
+    return surface, total_width, total_height
+
+def dtext_cache_stats() -> dict:
+    """Get hit/miss counters and sizes of the glyph and text caches."""
+    stats = dict(_text_cache_stats)
+    stats['glyphs'] = len(_glyph_cache)
+    stats['texts'] = len(_text_cache)
+    return stats
+
+def dtext_cache_clear():
+    """Empty the glyph and text caches and reset their counters."""
+    _glyph_cache.clear()
+    _text_cache.clear()
+    for key in _text_cache_stats:
+        _text_cache_stats[key] = 0
+
+# Updated text rendering with precise spacing
+def dtext(x: int, y: int, color: int, text: str,
+          align=DTEXT_LEFT, valign=DTEXT_TOP):
+    if color == C_NONE or not text:
+        return
+    
+    font = _current_font or _default_font
+    surface, total_width, total_height = _render_text(text, color, font)
+    
+    # Horizontal alignment
+    if align == DTEXT_CENTER:
+        x -= total_width // 2
+    elif align == DTEXT_RIGHT:
+        x -= total_width
+    
+    # Vertical alignment
+    if valign == DTEXT_MIDDLE:
+        y -= total_height // 2
+    elif valign == DTEXT_BOTTOM:
+        y -= total_height
+    
+    _dirty_rects.append(vram.blit(surface, (x - GAP, y - GAP)))
+
+
+def dtext_opt(x: int, y: int, fg: int, bg: int, 
+            halign: str, valign: str, text: str, size: int = -1):
+    if not text:
+        return
+    
+    font = _current_font or _default_font
+    surface, total_width, total_height = _render_text(text, fg, font)
+
+
+    # Horizontal alignment
+    if halign == DTEXT_CENTER:
+        x -= total_width // 2
+    elif halign == DTEXT_RIGHT:
+        x -= total_width
+    
+    # Vertical alignment
+    if valign == DTEXT_MIDDLE:
+        y -= total_height // 2
+    elif valign == DTEXT_BOTTOM:
+        y -= total_height
+    
+    
+    # Draw background (if requested)
+    if bg != C_NONE:
+        bg_rect = pygame.Rect(
+            x - 1, y - 1,
+            total_width + 2, total_height + 2
+        )
+        _dirty_rects.append(pygame.draw.rect(vram, _vram_color(bg), bg_rect))
+    
+    # Draw text characters
+    _dirty_rects.append(vram.blit(surface, (x - GAP, y - GAP)))
+
+# Key Events (filtered in _display_init())
+
+# pygame.event.set_allowed([
+#     QUIT, KEYDOWN, KEYUP,
+#     ACTIVEEVENT, VIDEORESIZE, VIDEOEXPOSE,
+#     MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION
+# ])
+
+# Key constants
+KEY_F1		= 0x91
+KEY_F2		= 0x92
+KEY_F3		= 0x93
+KEY_F4		= 0x94
+KEY_F5		= 0x95
+KEY_F6		= 0x96
+
+KEY_SHIFT	= 0x81
+KEY_OPTN	= 0x82
+KEY_VARS	= 0x83
+KEY_MENU	= 0x84
+KEY_LEFT	= 0x85
+KEY_UP		= 0x86
+
+KEY_ALPHA	= 0x71
+KEY_SQUARE	= 0x72
+KEY_POWER	= 0x73
+KEY_EXIT	= 0x74
+KEY_DOWN	= 0x75
+KEY_RIGHT	= 0x76
+
+KEY_XOT		= 0x61
+KEY_LOG		= 0x62
+KEY_LN		= 0x63
+KEY_SIN		= 0x64
+KEY_COS		= 0x65
+KEY_TAN		= 0x66
+
+KEY_FRAC	= 0x51
+KEY_FD		= 0x52
+KEY_LEFTP	= 0x53
+KEY_RIGHTP	= 0x54
+KEY_COMMA	= 0x55
+KEY_ARROW	= 0x56
+
+KEY_7		= 0x41
+KEY_8		= 0x42
+KEY_9		= 0x43
+KEY_DEL		= 0x44
+# AC/ON has keycode 0x07 instead of 0x45
+
+KEY_4		= 0x31
+KEY_5		= 0x32
+KEY_6		= 0x33
+KEY_MUL		= 0x34
+KEY_DIV		= 0x35
+
+KEY_1		= 0x21
+KEY_2		= 0x22
+KEY_3		= 0x23
+KEY_ADD		= 0x24
+KEY_SUB		= 0x25
+
+KEY_0		= 0x11
+KEY_DOT		= 0x12
+KEY_EXP		= 0x13
+KEY_NEG		= 0x14
+KEY_EXE		= 0x15
+
+# Why is AC/ON not 0x45? Because it must be on a row/column of its
+#   own. It's used to power up the calculator; if it were in the middle
+#   of the matrix one could use a ghosting effect to boot the calc.
+KEY_ACON	= 0x07
+
+# Virtual key codes
+KEY_HELP	= 0x20 # fx-9860G Slim: 0x75 */
+KEY_LIGHT	= 0x10 # fx-9860G Slim: 0x76 */
+
+# Key codes for the CP-400
+KEY_KBD		= 0xa1
+KEY_X		= 0xa2
+KEY_Y		= 0xa3
+KEY_Z		= 0xa4
+KEY_EQUALS	= 0xa5
+KEY_CLEAR   = KEY_EXIT
+
+# Key aliases (handle with care =D)
+KEY_X2		= KEY_SQUARE
+KEY_CARET	= KEY_POWER
+KEY_SWITCH	= KEY_FD
+KEY_LEFTPAR	= KEY_LEFTP
+KEY_RIGHTPAR	= KEY_RIGHTP
+KEY_STORE	= KEY_ARROW
+KEY_TIMES	= KEY_MUL
+KEY_PLUS	= KEY_ADD
+KEY_MINUS	= KEY_SUB
+
+# Key event types
+KEYEV_NONE: int = 0
+KEYEV_DOWN: int = 1
+KEYEV_UP: int = 2
+KEYEV_HOLD: int = 3
+
+KEYEV_TOUCH_DOWN = 10
+KEYEV_TOUCH_UP = 11
+KEYEV_TOUCH_DRAG = 12
+
+KEY_NONE = None
+
+# Key options flags
+GETKEY_DEFAULT = 0
+GETKEY_MOD_SHIFT = 1
+GETKEY_MOD_ALPHA = 2
+
+# Map Pygame keys to gint keys
+_key_mapping = {
+    K_UP: KEY_UP,
+    K_DOWN: KEY_DOWN,
+    K_LEFT: KEY_LEFT,
+    K_RIGHT: KEY_RIGHT,
+    K_ESCAPE: KEY_EXIT,
+    K_F4: KEY_EXIT,
+    K_a: KEY_ALPHA,
+    K_EQUALS: KEY_EQUALS,
+    K_x: KEY_X,
+    K_y: KEY_Y,
+    K_z: KEY_Z,
+    K_POWER: KEY_POWER,
+    K_KP_DIVIDE: KEY_DIV,
+    K_LEFTPAREN: KEY_LEFTPAR,
+    K_RIGHTPAREN: KEY_RIGHTPAR,
+    K_COMMA: KEY_COMMA,
+    K_PLUS: KEY_ADD,
+    K_KP_PLUS: KEY_ADD,
+    K_MINUS: KEY_MINUS,
+    K_KP_MINUS: KEY_MINUS,
+    # (-) ?
+    K_CARET: KEY_NEG,
+    K_SPACE: KEY_EXE,
+    K_9: KEY_9,
+    K_KP_9: KEY_9,
+    K_8: KEY_8,
+    K_KP_8: KEY_8,
+    K_7: KEY_7,
+    K_KP_7: KEY_7,
+    K_6: KEY_6,
+    K_KP_6: KEY_6,
+    K_5: KEY_5,
+    K_KP_5: KEY_5,
+    K_4: KEY_4,
+    K_KP_4: KEY_4,
+    K_3: KEY_3,
+    K_KP_3: KEY_3,
+    K_2: KEY_2,
+    K_KP_2: KEY_2,
+    K_1: KEY_1,
+    K_KP_1: KEY_1,
+    K_0: KEY_0,
+    K_KP_0: KEY_0,
+    # Key dot ?
+    K_KP_MULTIPLY: KEY_MUL,
+    K_KP_ENTER: KEY_EXE,
+    K_KP_PERIOD: KEY_DOT,
+    K_PERIOD: KEY_DOT,
+    K_e: KEY_EXP,
+    K_BACKSPACE: KEY_DEL,
+    K_LSHIFT: KEY_SHIFT,
+    K_RSHIFT: KEY_SHIFT,
+    K_RETURN: KEY_EXE,
+    K_RALT: KEY_KBD,
+    K_LALT: KEY_KBD
+}
+
+# --- Gint Keyboard State Simulation ---
+# Bit k of these masks is gint key code k, so any set of keys is checked with
+# one AND whatever its size
+_key_down = 0   # User-visible key state, updated by pollevent
+_key_flips = 0  # Keys that changed state since last cleareventflips
+
+# State tracking
+_key_states = {}
+_modifiers = {'shift': False, 'alpha': False}
+_last_key_time = 0
+_repeat_delay = 400  # ms
+_repeat_interval = 40  # ms
+_keys_pressed_since_flip = set()
+
+class _Event:
+    def __init__(self, type=None, key=None):
+        self.type = type
+        self.key = key
+
+class KeyEvent(_Event):
+    def __init__(self, event_type=KEYEV_NONE, key=None, pos=(0, 0)):
+        super().__init__(event_type, key)
+
+        mods = pygame.key.get_mods() if screen is not None else 0
+
+        self.time = int(time.monotonic() * 1000)
+        self.mod = False
+        self.shift = bool(mods & KMOD_SHIFT)
+        # self.shift = _modifiers['shift']
+        self.alpha = bool(mods & KMOD_CAPS)
+        # self.alpha = _modifiers['alpha']
+        self.type = event_type
+        self.key = key
+        self.x, self.y = pos
+
+    time: int
+    mod: bool
+    shift: bool
+    alpha: bool
+    type: int
+    key: Optional[int]
+    x: int
+    y: int
+
+    def __repr__(self):
+        return f"KeyEvent(type={self.type}, key={self.key}, shift={self.shift}, alpha={self.alpha})"
+
+class NoneEvent(KeyEvent):
+    def __init__(self):
+        super().__init__(KEYEV_NONE, None)
+
+
+def _update_modifiers():
+    """Update modifier states from keyboard"""
+    mods = pygame.key.get_mods()
+    _modifiers['shift'] = bool(mods & KMOD_SHIFT)
+    # Alpha state tracking (using Caps Lock as example)
+    _modifiers['alpha'] = bool(pygame.key.get_mods() & KMOD_CAPS)
+
+# Add special case for mouse position tracking
+MOUSE_X = 2000
+MOUSE_Y = 2001
+
+
+def pollevent_old():
+    global _key_states
+    global _keys_pressed_since_flip
+    _update_modifiers()
+    
+    for event in pygame.event.get():
+        if event.type == QUIT:
+            return KeyEvent(KEYEV_DOWN, KEY_EXIT)
+        
+        elif event.type == VIDEOEXPOSE:  # <-- Triggered when window needs redraw
+            dupdate()
+
+        elif event.type == ACTIVEEVENT:
+            # Redraw when window gains focus (optional)
+            if event.gain == 1:  # 1 = window activated
+                dupdate()
+        
+        # Handle mouse events as touch input
+        elif event.type == MOUSEBUTTONDOWN:
+            return KeyEvent(KEYEV_TOUCH_DOWN, None, event.pos)
+            
+        elif event.type == MOUSEBUTTONUP:
+            return KeyEvent(KEYEV_TOUCH_UP, None, event.pos)
+            
+        elif event.type == MOUSEMOTION:
+            if event.buttons[0]:  # Left mouse button dragged
+                return KeyEvent(KEYEV_TOUCH_DRAG, None, event.pos)
+            
+        elif event.type == KEYDOWN:
+            # Capture Print Screen key to save VRAM
+            if event.key == pygame.K_PRINTSCREEN:  # <-- Add this block
+                pygame.image.save(vram, "screenshot.png")
+                continue  # Skip further processing for this event
+                
+            if event.key in _key_mapping:
+                mapped = _key_mapping[event.key]
+                _keys_pressed_since_flip.add(mapped)
+                _key_states[mapped] = {
+                    'time': pygame.time.get_ticks(),
+                    'last_repeat': pygame.time.get_ticks()
+                }
+                return KeyEvent(KEYEV_DOWN, mapped)
+                
+        elif event.type == KEYUP:
+            if event.key in _key_mapping:
+                mapped = _key_mapping[event.key]
+                if mapped in _key_states:
+                    del _key_states[mapped]
+                return KeyEvent(KEYEV_UP, mapped)
+    
+    return KeyEvent(KEYEV_NONE, None)
+
+def pollevent() -> KeyEvent:
+    """
+    Processes one event from the queue, updating the internal gint state.
+    This is the ONLY function that should modify _key_down and _key_flips.
+    """
+    if _replay is not None:
+        return _replay.next_event()
+    event = _pollevent_live()
+    if _recorder is not None and event.type != KEYEV_NONE:
+        _recorder.write_event(event)
+    return event
+
+def _pollevent_live() -> KeyEvent:
+    """pollevent() on the pygame event queue"""
+    if screen is None:
+        _display_init()
+    try:
+        event = pygame.event.poll() # Use non-blocking poll
+    except pygame.error:
+        return KeyEvent(KEYEV_NONE)
+
+    if event.type == NOEVENT:
+        return KeyEvent(KEYEV_NONE)
+
+    if event.type == KEYDOWN and event.key == PROFILE_OVERLAY_KEY and _profile_enabled:
+        draw_profile_overlay(not _profile_overlay)
+        return KeyEvent(KEYEV_NONE)
+
+    if event.type == QUIT:
+        # Translate QUIT into a KEY_EXIT press to allow graceful shutdown
+        # This is a special case for the simulator
+        _key_change(KEY_EXIT, True)
+        return KeyEvent(KEYEV_DOWN, KEY_EXIT)
+
+    elif event.type == KEYDOWN:
+        gint_key = _key_mapping.get(event.key)
+        if gint_key is not None:
+            # Only report a DOWN event if it's a new press
+            if _key_change(gint_key, True):
+                return KeyEvent(KEYEV_DOWN, gint_key)
+
+    elif event.type == KEYUP:
+        gint_key = _key_mapping.get(event.key)
+        if gint_key is not None:
+            # Only report an UP event if it was previously down
+            if _key_change(gint_key, False):
+                return KeyEvent(KEYEV_UP, gint_key)
+    
+    # If we reach here, it's an event we don't care about or a repeat keydown
+    return KeyEvent(KEYEV_NONE)
+
+def _key_change(key: int, down: bool) -> bool:
+    """Set the state of a key, returns whether it changed"""
+    global _key_down, _key_flips
+    bit = 1 << key
+    if bool(_key_down & bit) == down:
+        return False
+    _key_down ^= bit
+    _key_flips |= bit
+    return True
+
+def clearevents():
+    """Reads and discards all pending events, updating state."""
+    while pollevent().type != KEYEV_NONE:
+        pass
+
+def cleareventflips():
+    """Resets the reference for keypressed() and keyreleased()."""
+    global _key_flips
+    _key_flips = 0
+
+# --- Input recording and replay ---
+# Events returned by pollevent() can be recorded with the frame number (count
+# of dupdate() calls) they were read on, then fed back on the same frames.
+# Set GINT_RECORD=file or GINT_REPLAY=file, or call input_record/input_replay.
+# A replay does not wait for FPS, and sleep_ms() returns at once during it.
+_INPUT_MAGIC = b'GIR1'
+_INPUT_RECORD = struct.Struct('<IBBhh')  # frame, type, key, x, y
+_INPUT_NO_KEY = 0xFF
+
+_frame_count = 0  # Number of dupdate() calls so far
+_recorder = None
+_replay = None
+
+class _InputRecorder:
+    """Writes the events read by pollevent() to a file"""
+    def __init__(self, path: str):
+        self.file = open(path, 'wb')
+        self.file.write(_INPUT_MAGIC)
+        # Frames are counted from the start of the recording
+        self.start_frame = _frame_count
+
+    def write_event(self, event: KeyEvent):
+        key = _INPUT_NO_KEY if event.key is None else event.key
+        self.file.write(_INPUT_RECORD.pack(_frame_count - self.start_frame,
+                                           event.type, key, event.x, event.y))
+
+    def close(self):
+        # The end marker holds the frame count of the recording
+        self.file.write(_INPUT_RECORD.pack(_frame_count - self.start_frame,
+                                           KEYEV_NONE, _INPUT_NO_KEY, 0, 0))
+        self.file.close()
+
+class _InputReplay:
+    """Returns recorded events from pollevent() on the frame they were read"""
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] != _INPUT_MAGIC:
+            raise ValueError("not a gint input recording: {}".format(path))
+        self.events = list(_INPUT_RECORD.iter_unpack(data[4:]))
+        self.index = 0
+        # Frames are counted from the start of the replay
+        self.start_frame = _frame_count
+        self.end_frame = self.events[-1][0] if self.events else 0
+
+    def done(self) -> bool:
+        return _frame_count - self.start_frame >= self.end_frame
+
+    def next_event(self) -> KeyEvent:
+        if self.index >= len(self.events):
+            return KeyEvent(KEYEV_NONE)
+        frame, type, key, x, y = self.events[self.index]
+        if type == KEYEV_NONE or frame > _frame_count - self.start_frame:
+            return KeyEvent(KEYEV_NONE)
+        self.index += 1
+        key = None if key == _INPUT_NO_KEY else key
+
+        # Same state changes as live events
+        if type == KEYEV_DOWN:
+            _key_change(key, True)
+        elif type == KEYEV_UP:
+            _key_change(key, False)
+        return KeyEvent(type, key, (x, y))
+
+def input_record(path: str):
+    """Start recording the events returned by pollevent() to a file."""
+    global _recorder
+    input_stop()
+    _recorder = _InputRecorder(path)
+
+def input_replay(path: str):
+    """Replay a recording: pollevent() returns its events instead of live ones."""
+    global _replay
+    input_stop()
+    _replay = _InputReplay(path)
+
+def input_replay_done() -> bool:
+    """True once a replay has reached the last recorded frame."""
+    return _replay is not None and _replay.done()
+
+def input_stop():
+    """Stop recording (finishing the file) or replaying."""
+    global _recorder, _replay
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+    _replay = None
+
+def _key_bit(key) -> int:
+    """The state bit of a key code, 0 for anything that is not one (None, negative...)"""
+    return 1 << key if isinstance(key, int) and key >= 0 else 0
+
+def keydown(key: int) -> bool:
+    """
+    Checks if a key is down according to the event-processed state.
+    This state is only updated by calling pollevent() or clearevents().
+    """
+    return bool(_key_down & _key_bit(key))
+
+def keymask(*keys: int) -> int:
+    """Simulator only: the bit mask of a set of keys, as used by keysnapshot()."""
+    mask = 0
+    for key in keys:
+        mask |= _key_bit(key)
+    return mask
+
+def keydown_all(*keys: int) -> bool:
+    """Check if all specified keys are pressed"""
+    mask = keymask(*keys)
+    return _key_down & mask == mask and all(map(_key_bit, keys))
+
+def keydown_any(*keys: int) -> bool:
+    """Check if any of specified keys are pressed"""
+    return bool(_key_down & keymask(*keys))
+
+def keypressed(key: int) -> bool:
+    """
+    Checks if a key is currently down AND its state has changed
+    since the last call to cleareventflips().
+    """
+    return bool(_key_down & _key_flips & _key_bit(key))
+
+def keyreleased(key: int) -> bool:
+    """
+    Checks if a key is currently up AND its state has changed
+    since the last call to cleareventflips().
+    """
+    return bool(_key_flips & ~_key_down & _key_bit(key))
+
+def keysnapshot() -> Tuple[int, int, int]:
+    """
+    Simulator only: the (down, pressed, released) key masks in one call, bit
+    k being gint key code k. Same state as keydown(), keypressed() and
+    keyreleased(); test keys with `mask >> key & 1` or `mask & keymask(...)`.
+    """
+    return _key_down, _key_down & _key_flips, _key_flips & ~_key_down
+
+def getkey() -> KeyEvent:
+    return getkey_opt(GETKEY_DEFAULT, None)
+
+def getkey_opt(options: int, timeout_ms: Optional[int] = 2000) -> KeyEvent:
+    if screen is None:
+        _display_init()
+    start_time = pygame.time.get_ticks()
+    
+    while True:
+        # First, process any existing events in the queue
+        ev = pollevent()
+        if ev.type == KEYEV_DOWN:
+            if ev.key == KEY_EXIT: # Handle exit gracefully
+                pygame.quit()
+                sys.exit()
+            return ev
+        
+        # If queue is empty, wait for a new event
+        pygame.time.wait(10) # a small delay to prevent busy-looping
+        
+        # Check timeout
+        if timeout_ms is not None and (pygame.time.get_ticks() - start_time) > timeout_ms:
+            return KeyEvent(KEYEV_NONE, None)
+        
+        # # Handle key repeats
+        # current_time = pygame.time.get_ticks()
+        # for key in list(_key_states.keys()):
+        #     state = _key_states[key]
+        #     if (current_time - state['time']) > _repeat_delay:
+        #         if (current_time - state['last_repeat']) > _repeat_interval:
+        #             _key_states[key]['last_repeat'] = current_time
+        #             return KeyEvent(KEYEV_HOLD, key)
+        
+        # # Prevent CPU hogging
+        # pygame.time.wait(10)
+
+
+# def clearevents():
+#     """Clear all pending events from the queue"""
+#     pygame.event.clear()
+
+# def cleareventflips():
+#     global _key_states
+#     global _modifiers
+#     global _keys_pressed_since_flip
+    
+#     _keys_pressed_since_flip.clear()
+#     _key_states = {}
+#     _modifiers = {'shift': False, 'alpha': False}
+
+# --------------------------------------------------------------
+# Image stuff
+# IMAGE_MONO = 0
+IMAGE_RGB565      = 0  # RGB565 without alpha
+IMAGE_RGB565A     = 1  # RGB565 with one transparent color
+IMAGE_P8_RGB565   = 4  # 8-bit palette, all opaque colors
+IMAGE_P8_RGB565A  = 5  # 8-bit with one transparent color
+IMAGE_P4_RGB565   = 6  # 4-bit palette, all opaque colors
+IMAGE_P4_RGB565A  = 3  # 4-bit with one transparent color
+IMAGE_DEPRECATED_P8 = 2
+
+def _image_alpha(format: int):
+    if format == IMAGE_RGB565A:
+        return 0x0001
+    elif format == IMAGE_P8_RGB565A:
+        return 128 # -128 ?
+    elif format == IMAGE_P4_RGB565A:
+        return 0
+    else:
+        return 0x10000 # A value that cannot be found in any pixel of any format
+
+# Set to False to decode images with the per-pixel reference decoder
+IMAGE_FAST_DECODE = True
+
+_image_frombytes = getattr(pygame.image, 'frombytes', None) or pygame.image.fromstring
+
+_IMAGE_ALPHA_FORMATS = (IMAGE_RGB565A, IMAGE_P8_RGB565A, IMAGE_P4_RGB565A)
+_IMAGE_P8_FORMATS = (IMAGE_P8_RGB565, IMAGE_P8_RGB565A)
+_IMAGE_P4_FORMATS = (IMAGE_P4_RGB565, IMAGE_P4_RGB565A)
+
+_RGBA_CLEAR = b'\x00\x00\x00\x00'
+_RGBA_BLACK = b'\x00\x00\x00\xff'
+
+class _ColorCache(dict):
+    """RGB565 -> RGBA bytes, filled on demand (images only use a few colors)"""
+    def __init__(self, alpha: int):
+        super().__init__()
+        self.alpha = alpha
+
+    def __missing__(self, color: int) -> bytes:
+        # The transparent color of RGB565A decodes to opaque black
+        rgba = _RGBA_BLACK if color == self.alpha else bytes(_to_rgb(color)) + b'\xff'
+        self[color] = rgba
+        return rgba
+
+def _rgb565_to_rgba_np(colors):
+    """Expand a NumPy array of RGB565 colors to opaque RGBA rows"""
+    r5 = (colors >> 11) & 0x1F
+    g6 = (colors >> 5) & 0x3F
+    b5 = colors & 0x1F
+    rgba = np.empty((len(colors), 4), dtype=np.uint8)
+    rgba[:, 0] = (r5 << 3) | (r5 >> 2)
+    rgba[:, 1] = (g6 << 2) | (g6 >> 4)
+    rgba[:, 2] = (b5 << 3) | (b5 >> 2)
+    rgba[:, 3] = 255
+    return rgba
+
+_rgb565_colors = _ColorCache(0x10000)  # For dblit_rgb565(), no transparent color
+
+# --- Decoded image cache ---
+# Decoded pixels are stored in a __gintcache__ folder next to the asset module
+# that created the image, keyed by a hash of the image contents. Changing an
+# asset changes its key; stale entries are evicted least-recently-used first.
+IMAGE_CACHE = os.environ.get('GINT_IMAGE_CACHE', '1') != '0'
+IMAGE_CACHE_DIRNAME = '__gintcache__'
+IMAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Per cache folder
+
+_IMAGE_CACHE_MAGIC = b'GIC1'
+_IMAGE_CACHE_HEADER = struct.Struct('<4sHH')  # magic, width, height
+
+def _image_cache_dir() -> Optional[str]:
+    """Find the cache folder of the module that is creating the image."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get('__name__') == __name__:
+        frame = frame.f_back
+    path = frame.f_globals.get('__file__') if frame is not None else None
+    if not path:
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(path)), IMAGE_CACHE_DIRNAME)
+
+def _image_cache_load(path: str, width: int, height: int) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            blob = f.read()
+        magic, w, h = _IMAGE_CACHE_HEADER.unpack_from(blob)
+        if magic != _IMAGE_CACHE_MAGIC or (w, h) != (width, height):
+            raise ValueError("bad cache header")
+        rgba = zlib.decompress(blob[_IMAGE_CACHE_HEADER.size:])
+        if len(rgba) != width * height * 4:
+            raise ValueError("bad cache size")
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error, zlib.error):
+        # Corrupted entry, drop it and decode again
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    try:
+        os.utime(path)  # Mark as recently used
+    except OSError:
+        pass
+    return rgba
+
+def _image_cache_store(path: str, width: int, height: int, rgba: bytes):
+    folder = os.path.dirname(path)
+    tmp = path + '.tmp'
+    try:
+        os.makedirs(folder, exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(_IMAGE_CACHE_HEADER.pack(_IMAGE_CACHE_MAGIC, width, height))
+            f.write(zlib.compress(rgba, 1))
+        os.replace(tmp, path)
+    except OSError:
+        return  # Read-only asset folder, just don't cache
+    _image_cache_evict(folder)
+
+def _image_cache_evict(folder: str, max_bytes: Optional[int] = None):
+    """Remove least recently used entries until the folder fits in max_bytes."""
+    if max_bytes is None:
+        max_bytes = IMAGE_CACHE_MAX_BYTES
+    entries = []
+    total = 0
+    try:
+        for name in os.listdir(folder):
+            if not name.endswith('.gic'):
+                continue
+            st = os.stat(os.path.join(folder, name))
+            entries.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+    except OSError:
+        return
+    entries.sort()
+    for _, size, name in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(folder, name))
+        except OSError:
+            pass
+        total -= size
+
+def image_cache_clear(folder: Optional[str] = None):
+    """Remove every cached image of a cache folder (default: the caller's)."""
+    folder = folder or _image_cache_dir()
+    if folder:
+        _image_cache_evict(folder, 0)
+
+class Image:
+    """Represents a graphical image in VRAM"""
+    def __init__(self, format: int, color_count: int, width: int, height: int, stride: int, data: bytes, palette: bytes):
+        self.format = format
+        self.color_count = color_count
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.data = data
+        self.palette = palette
+        self.surface = None
+        self._decode_image()
+
+    def _decode_image(self) -> None:
+        """Decode the whole image at once into an RGBA buffer, then into a surface."""
+        if not IMAGE_FAST_DECODE or self.format not in (
+                IMAGE_RGB565, IMAGE_RGB565A) + _IMAGE_P8_FORMATS + _IMAGE_P4_FORMATS:
+            self._decode_image_legacy()
+            return
+
+        cache_path = None
+        if IMAGE_CACHE:
+            folder = _image_cache_dir()
+            if folder:
+                cache_path = os.path.join(folder, self._cache_key() + '.gic')
+
+        rgba = None
+        if cache_path:
+            rgba = _image_cache_load(cache_path, self.width, self.height)
+        if rgba is None:
+            if self.format in (IMAGE_RGB565, IMAGE_RGB565A):
+                rgba = self._decode_direct()
+            else:
+                rgba = self._decode_indexed(self._palette_lut())
+            if cache_path:
+                _image_cache_store(cache_path, self.width, self.height, rgba)
+
+        decoded = _image_frombytes(rgba, (self.width, self.height), 'RGBA')
+        if self.format in _IMAGE_ALPHA_FORMATS:
+            self.surface = decoded
+        else:
+            # Keep opaque images on a plain (display format) surface
+            self.surface = pygame.Surface((self.width, self.height))
+            self.surface.blit(decoded, (0, 0))
+
+    def _cache_key(self) -> str:
+        """Content hash of everything the decoded pixels depend on."""
+        import hashlib  # Only images pay for it, not the gint import
+        h = hashlib.sha1(struct.pack('<4sHHHH', _IMAGE_CACHE_MAGIC, self.format,
+                                     self.width, self.height, self.stride))
+        h.update(struct.pack('<I', len(self.data)))
+        h.update(self.data)
+        h.update(self.palette or b'')
+        return h.hexdigest()
+
+    def _palette_lut(self) -> List[Optional[bytes]]:
+        """
+        Map every possible index to its RGBA bytes.
+        Indices that fall outside of the palette are None.
+        """
+        count = len(self.palette) // 2
+        palette = struct.unpack('>%dH' % count, self.palette[:count * 2])
+        alpha = _image_alpha(self.format)
+
+        if self.format in _IMAGE_P8_FORMATS:
+            indices, offset = range(256), -128
+        else:
+            indices, offset = range(16), 0
+
+        lut = []
+        for index in indices:
+            if index == alpha:
+                lut.append(_RGBA_CLEAR)
+                continue
+            try:
+                color = palette[index + offset]
+            except IndexError:
+                lut.append(None)
+                continue
+            lut.append(bytes(_to_rgb(color)) + b'\xff')
+        return lut
+
+    def _decode_indexed(self, lut: List[Optional[bytes]]) -> bytes:
+        """Decode P8/P4 pixel data through the palette lookup table."""
+        width, height, stride = self.width, self.height, self.stride
+        is_p4 = self.format in _IMAGE_P4_FORMATS
+        row_bytes = (width + 1) // 2 if is_p4 else width
+        missing = [i for i, rgba in enumerate(lut) if rgba is None]
+        lut = [rgba or _RGBA_CLEAR for rgba in lut]
+
+        if np is not None:
+            table = np.frombuffer(b''.join(lut), dtype=np.uint8).reshape(-1, 4)
+            rows = np.frombuffer(self.data, dtype=np.uint8, count=height * stride)
+            rows = rows.reshape(height, stride)[:, :row_bytes]
+            if is_p4:
+                rows = np.stack((rows >> 4, rows & 0x0F), axis=-1).reshape(height, -1)
+            index = rows[:, :width]
+            if missing and np.isin(index, missing).any():
+                raise IndexError("palette index out of range")
+            return table[index].tobytes()
+
+        if stride == row_bytes:
+            data = bytes(self.data[:height * stride])
+        else:
+            data = b''.join(self.data[y * stride:y * stride + row_bytes]
+                            for y in range(height))
+
+        if missing:
+            used = set(data)
+            if is_p4:
+                used = {b >> 4 for b in used} | {b & 0x0F for b in used}
+            if used.intersection(missing):
+                raise IndexError("palette index out of range")
+
+        if not is_p4:
+            return b''.join(map(lut.__getitem__, data))
+
+        # Two pixels per byte, high nibble first
+        pairs = [lut[b >> 4] + lut[b & 0x0F] for b in range(256)]
+        if not width & 1:
+            return b''.join(map(pairs.__getitem__, data))
+        # Drop the padding nibble at the end of each row
+        row_size = width * 4
+        return b''.join(
+            b''.join(map(pairs.__getitem__, data[o:o + row_bytes]))[:row_size]
+            for o in range(0, len(data), row_bytes))
+
+    def _decode_direct(self) -> bytes:
+        """Decode RGB565/RGB565A pixel data (big endian, packed rows)."""
+        count = self.width * self.height
+        alpha = _image_alpha(self.format)
+
+        if np is not None:
+            colors = np.frombuffer(self.data, dtype='>u2', count=count).astype(np.uint16)
+            rgba = _rgb565_to_rgba_np(colors)
+            if alpha <= 0xFFFF:
+                rgba[colors == alpha, :3] = 0
+            return rgba.tobytes()
+
+        colors = struct.unpack('>%dH' % count, self.data[:count * 2])
+        return b''.join(map(_ColorCache(alpha).__getitem__, colors))
+
+    def _decode_image_legacy(self) -> None:
+        if self.format in [IMAGE_RGB565A, IMAGE_P8_RGB565A, IMAGE_P4_RGB565A]:
+            self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        else:
+            self.surface = pygame.Surface((self.width, self.height))
+        pixels = pygame.PixelArray(self.surface)
+        
+        if self.palette is not None:
+            
+            palette = [
+                struct.unpack('>H', self.palette[i:i+2])[0]
+                for i in range(0, len(self.palette), 2)
+            ]
+        
+        format = '>B'
+        step = 1
+
+        if self.format == IMAGE_RGB565 or self.format == IMAGE_RGB565A:
+            format = '>H'
+            step = 2
+        
+        data = [
+            struct.unpack(format, self.data[i:i+step])[0]
+            for i in range(0, len(self.data), step)
+        ]
+        
+        # if self.format == IMAGE_MONO:
+        #     # 1‑bpp: bit 0 = black, bit 1 = white
+        #     for y in range(self.height):
+        #         row = y * self.stride
+        #         for x in range(self.width):
+        #             byte = self.data[row + (x >> 3)]
+        #             bit  = (byte >> (7 - (x & 7))) & 1
+        #             self.surface.set_at((x, y), (255,255,255) if bit else (0,0,0))
+        if  self.format == IMAGE_RGB565:
+            for y in range(self.height):
+                for x in range(self.width):
+                    color = data[y*self.width + x]
+                    r, g, b = _to_rgb(color)
+                    pixels[x, y] = (r, g, b)
+        elif self.format == IMAGE_RGB565A:
+            for y in range(self.height):
+                for x in range(self.width):
+                    color = data[y*self.width + x]
+                    if color == _image_alpha(self.format):
+                        pixels[x, y] = (0, 0, 0, 255)
+                    else:
+                        r, g, b = _to_rgb(color)
+                        pixels[x, y] = (r, g, b, 255)
+        elif self.format == IMAGE_P8_RGB565:
+            for y in range(self.height):
+                for x in range(self.width):
+                    index = data[y * self.stride + x]
+                    color = palette[index - 128]
+                    r, g, b = _to_rgb(color)
+                    pixels[x, y] = (r, g, b)
+        elif self.format == IMAGE_P8_RGB565A:
+            for y in range(self.height):
+                for x in range(self.width):
+                    index = data[y * self.stride + x]
+                    if index == _image_alpha(self.format):
+                        pixels[x, y] = (0, 0, 0, 0)
+                    else:
+                        color = palette[index - 128]
+                        r, g, b = _to_rgb(color)
+                        pixels[x, y] = (r, g, b, 255)
+        elif self.format == IMAGE_P4_RGB565:
+            for y in range(self.height):
+                for x in range(self.width):
+                    index = data[(y * self.stride + (x//2))]
+                    index = index & 0x0F if x & 1 else index >> 4
+                    color = palette[index]
+                    r, g, b = _to_rgb(color)
+                    pixels[x, y] = (r, g, b)
+        elif self.format == IMAGE_P4_RGB565A:
+            for y in range(self.height):
+                for x in range(self.width):
+                    index = data[(y * self.stride + (x//2))]
+                    index = index & 0x0F if x & 1 else index >> 4
+                    if index == _image_alpha(self.format):
+                        pixels[x, y] = (0, 0, 0, 0)
+                    else:
+                        color = palette[index]
+                        r, g, b = _to_rgb(color)
+                        pixels[x, y] = (r, g, b, 255)
+        pixels.close()
+        # return surface
+
+def image(profile: int, color_count: int, width: int, height: int, 
+                stride: int, data: bytearray, palette: bytearray) -> Image:
+    return Image(profile, color_count, width, height, stride, data, palette)
+
+def image_rgb565(width: int, height: int, data: bytes) -> Image:
+    """
+    16‑bpp RGB565, tightly packed (no alpha, no padding)
+    """
+    stride = width
+    return Image(
+        format=IMAGE_RGB565,
+        color_count=0,
+        width=width,
+        height=height,
+        stride=stride,
+        data=data,
+        palette=b''
+    )
+
+def image_rgb565a(width: int, height: int, data: bytes) -> Image:
+    """
+    16‑bpp RGB565 + 1‑bit alpha (alpha index == 0x0001)
+    """
+    stride = width
+    return Image(
+        format=IMAGE_RGB565A,
+        color_count=65536,
+        width=width,
+        height=height,
+        stride=stride,
+        data=data,
+        palette=b''
+    )
+
+def image_p8_rgb565(width: int, height: int, data: bytes, palette: bytes) -> Image:
+    """
+    8‑bpp palette (indices 0x80…0xFF) RGB565
+    """
+    stride      = width         # one byte per pixel
+    color_count = len(palette) // 2
+    return Image(
+        format=IMAGE_P8_RGB565,
+        color_count=256, # color_count,
+        width=width,
+        height=height,
+        stride=stride,
+        data=data,
+        palette=palette
+    )
+
+
+def image_p8_rgb565a(width: int, height: int, data: bytes, palette: bytes) -> Image:
+    """
+    8‑bpp palette (0x81…0xFF), RGB565 + transparent index (0x80)
+    """
+    stride      = width
+    color_count = len(palette) // 2
+    return Image(
+        format=IMAGE_P8_RGB565A,
+        color_count=256, # color_count,
+        width=width,
+        height=height,
+        stride=stride,
+        data=data,
+        palette=palette
+    )
+
+def image_p4_rgb565(width: int, height: int, data: bytes, palette: bytes) -> Image:
+    """
+    4‑bpp palette (16 entries) RGB565
+    """
+    stride      = (width + 1) // 2   # two pixels per byte
+    color_count = len(palette) // 2
+    return Image(
+        format=IMAGE_P4_RGB565,
+        color_count=color_count,
+        width=width,
+        height=height,
+        stride=stride,
+        data=data,
+        palette=palette
+    )
+
+def image_p4_rgb565a(width: int, height: int, data: bytes, palette: bytes) -> Image:
+    """
+    4‑bpp palette (16 entries) RGB565 + transparent entry at index 0
+    """
+    stride      = (width + 1) // 2
+    color_count = len(palette) // 2
+    return Image(
+        format=IMAGE_P4_RGB565A,
+        color_count=color_count,
+        width=width,
+        height=height,
+        stride=stride,
+        data=data,
+        palette=palette
+    )
+
+def dimage(x: int, y: int, img: Image):
+    """Draw entire image at specified coordinates"""
+    _dirty_rects.append(vram.blit(img.surface, (x, y)))
+
+def dsubimage(x: int, y: int, img: Image,
+             left: int, top: int, width: int, height: int):
+    """Draw subregion of image"""
+    # Blit straight from the source area, clipped by the dwindow_set() rect
+    _dirty_rects.append(vram.blit(img.surface, (x, y), (left, top, width, height)))
+
+class TileAtlas:
+    """
+    A tileset image pre-sliced into one subsurface per tile, so drawing a
+    tile is a list lookup and a single blit. Simulator only: on the
+    calculator, fall back to dsubimage().
+
+    Tile ids go left to right, then top to bottom, with `columns` tiles per
+    row (defaults to as many tiles as fit in the image width).
+    """
+    def __init__(self, img: Image, tile_w: int, tile_h: int = 0, columns: int = 0):
+        self.img = img
+        self.tile_w = tile_w
+        self.tile_h = tile_h or tile_w
+        self.columns = columns or img.width // tile_w
+        rows = img.height // self.tile_h
+        cols = min(self.columns, img.width // tile_w)
+
+        surface = img.surface
+        # Subsurfaces share pixels with the image, nothing is copied
+        self.tiles = [None] * (rows * self.columns)
+        for ty in range(rows):
+            for tx in range(cols):
+                self.tiles[ty * self.columns + tx] = surface.subsurface(
+                    (tx * tile_w, ty * self.tile_h, tile_w, self.tile_h))
+        # dtiles() with the same layout reuses this atlas
+        img.__dict__.setdefault('_tile_atlases', {})[(tile_w, self.tile_h, self.columns)] = self
+
+def dtile(x: int, y: int, atlas: TileAtlas, tile_id: int):
+    """Draw tile `tile_id` of a TileAtlas"""
+    if 0 <= tile_id < len(atlas.tiles):
+        tile = atlas.tiles[tile_id]
+        if tile is not None:
+            _dirty_rects.append(vram.blit(tile, (x, y)))
+            return
+    # Outside of the sliced area, draw whatever dsubimage() would
+    dsubimage(x, y, atlas.img,
+              (tile_id % atlas.columns) * atlas.tile_w,
+              (tile_id // atlas.columns) * atlas.tile_h,
+              atlas.tile_w, atlas.tile_h)
+
+def _tile_atlas(img: Image, tile_w: int, tile_h: int, columns: int) -> TileAtlas:
+    """The TileAtlas of an image for this tile layout, sliced on first use"""
+    atlas = img.__dict__.get('_tile_atlases', {}).get((tile_w, tile_h, columns))
+    return atlas or TileAtlas(img, tile_w, tile_h, columns)
+
+def dtiles(img: Image, tile_w: int, tile_h: int, columns: int, tiles, count: int = -1):
+    """
+    Draw many tiles of a tileset image in one call, in order. `tiles` holds
+    (x, y, tile_id) triples, flat: an int16 buffer like array('h') (any other
+    buffer format is a TypeError, as for dpoly()) or a list; only the first
+    `count` triples are drawn (-1: all of them). Tile ids go left to right,
+    then top to bottom, `columns` per row. Same pixels as one dsubimage() per
+    tile, drawn with a single Surface.blits().
+    """
+    data = _int16_buffer(tiles)
+    if 0 <= count * 3 < len(data):
+        data = data[:count * 3]
+    if not data:
+        return
+    sliced = _tile_atlas(img, tile_w, tile_h, columns).tiles
+    ids = data[2::3]
+    blits = None
+    if min(ids) >= 0 and max(ids) < len(sliced):
+        sources = list(map(sliced.__getitem__, ids))
+        if None not in sources:
+            # Common case, every tile is in the atlas: no per-tile Python code
+            blits = zip(sources, zip(data[0::3], data[1::3]))
+    if blits is None:
+        surface = img.surface
+        blits = []
+        for x, y, tile_id in zip(data[0::3], data[1::3], ids):
+            tile = sliced[tile_id] if 0 <= tile_id < len(sliced) else None
+            if tile is not None:
+                blits.append((tile, (x, y)))
+            else:
+                blits.append((surface, (x, y), ((tile_id % columns) * tile_w,
+                                                (tile_id // columns) * tile_h, tile_w, tile_h)))
+    vram.blits(blits, doreturn=0)
+    # One region for the batch, tiles are usually packed side by side
+    xs, ys = data[0::3], data[1::3]
+    left, top = min(xs), min(ys)
+    _dirty_rects.append(pygame.Rect(left, top, max(xs) - left + tile_w,
+                                    max(ys) - top + tile_h).clip(vram.get_clip()))
+
+def dblit_rgb565(x: int, y: int, width: int, height: int, data,
+                 stride: int = 0, scale: int = 1):
+    """
+    Simulator only: draw a raw RGB565 buffer (uint16 pixels in host byte
+    order, as in array('H')) of width x height, with rows of `stride` pixels.
+    """
+    stride = stride or width
+    data = memoryview(data).cast('B')
+    rows = [data[row * stride * 2:row * stride * 2 + width * 2] for row in range(height)]
+    if VRAM_RGB565:
+        surface = pygame.Surface((width, height), 0, 16, _RGB565_MASKS)
+        pitch = surface.get_pitch()
+        buffer = surface.get_buffer()
+        for row, pixels in enumerate(rows):
+            buffer.write(bytes(pixels), row * pitch)
+        del buffer  # Unlocks the surface before blitting
+    else:
+        # Same RGB565 -> RGB888 expansion as the other draw calls
+        if np is not None:
+            rgba = _rgb565_to_rgba_np(np.frombuffer(b''.join(rows), dtype=np.uint16)).tobytes()
+        else:
+            colors = memoryview(b''.join(rows)).cast('H')
+            rgba = b''.join(map(_rgb565_colors.__getitem__, colors))
+        surface = _image_frombytes(rgba, (width, height), 'RGBA')
+    if scale != 1:
+        surface = pygame.transform.scale(surface, (width * scale, height * scale))
+    _dirty_rects.append(vram.blit(surface, (x, y)))
+
+# --- Draw call profiler ---
+# With GINT_PROFILE=1 (or draw_profile_enable() before the game modules import
+# gint), every draw call counts its calls, touched pixels (the dirty area it
+# returned) and wall time per frame, keyed by calling module and function.
+# GINT_PROFILE=overlay also shows the top costs on screen; F11 toggles it.
+# GINT_PROFILE_OUT=file.csv|file.json exports the results at exit.
+PROFILE_FUNCTIONS = ('dclear', 'dpixel', 'drect', 'drect_border', 'dline', 'dhline',
+                     'dvline', 'dcircle', 'dellipse', 'dpoly', 'dpolys', 'dshape',
+                     'dtext', 'dtext_opt', 'dimage', 'dsubimage', 'dtile', 'dtiles', 'dblit_rgb565', 'dupdate')
+PROFILE_OVERLAY_KEY = K_F11
+PROFILE_OVERLAY_ROWS = 6
+PROFILE_MAX_FRAMES = 10000  # Per-frame totals kept for export
+
+_profile_enabled = False
+_profile_overlay = False
+_profile_depth = 0  # Nested draw calls (drect_border -> drect) count once
+_profile_frame = {}  # {(caller, function): [calls, pixels, seconds]} of this frame
+_profile_last = {}   # Same, for the last complete frame
+_profile_totals = {}
+_profile_frames = []  # (calls, pixels, seconds) per frame
+
+def _profiled(name: str, func):
+    def profiled(*args, **kwargs):
+        global _profile_depth
+        if _profile_depth:
+            return func(*args, **kwargs)
+        caller = sys._getframe(1).f_globals.get('__name__', '?')
+        mark = len(_dirty_rects)
+        _profile_depth = 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _profile_depth = 0
+            pixels = 0
+            for rect in _dirty_rects[mark:]:
+                pixels += rect.width * rect.height
+            stats = _profile_frame.get((caller, name))
+            if stats is None:
+                stats = _profile_frame[(caller, name)] = [0, 0, 0.0]
+            stats[0] += 1
+            stats[1] += pixels
+            stats[2] += elapsed
+            if name == 'dupdate':
+                _profile_end_frame()
+    profiled.__name__ = name
+    profiled.__doc__ = func.__doc__
+    return profiled
+
+def _profile_end_frame():
+    global _profile_frame, _profile_last
+    calls = pixels = 0
+    seconds = 0.0
+    for key, stats in _profile_frame.items():
+        total = _profile_totals.get(key)
+        if total is None:
+            total = _profile_totals[key] = [0, 0, 0.0]
+        total[0] += stats[0]
+        total[1] += stats[1]
+        total[2] += stats[2]
+        calls += stats[0]
+        pixels += stats[1]
+        seconds += stats[2]
+    if len(_profile_frames) < PROFILE_MAX_FRAMES:
+        _profile_frames.append((calls, pixels, seconds))
+    _profile_last = _profile_frame
+    _profile_frame = {}
+    if _device_model is not None:
+        _device_model.end_frame(_profile_last, seconds)
+
+def _draw_profile_overlay(surface: pygame.Surface) -> pygame.Rect:
+    """Draw the top costs of the last frame on the screen, return its area"""
+    rows = sorted(_profile_last.items(), key=lambda item: -item[1][2])
+    lines = ["{:<26} {:>4} {:>6} {:>6}".format("caller.function", "n", "px", "ms")]
+    for (caller, name), (calls, pixels, seconds) in rows[:PROFILE_OVERLAY_ROWS]:
+        label = "{}.{}".format(caller.rsplit('.', 1)[-1], name)
+        lines.append("{:<26} {:>4} {:>6} {:>6.2f}".format(label[:26], calls, pixels, seconds * 1000))
+    if _device_model is not None:
+        lines.append("device est. {:.1f} ms ({:.1f} fps)".format(
+            _device_model.frame_ms, 1000 / _device_model.frame_ms if _device_model.frame_ms else 0))
+    height = len(lines) * (GLYPH_HEIGHT + 1) + 2
+    area = pygame.Rect(0, 0, DWIDTH, height)
+    surface.fill((0, 0, 0), area)
+    for i, line in enumerate(lines):
+        text, _, _ = _render_text(line, C_WHITE, _default_font)
+        surface.blit(text, (2 - GAP, 1 + i * (GLYPH_HEIGHT + 1) - GAP))
+    return area
+
+def draw_profile_enable():
+    """Wrap the draw functions with the profiler (before they are imported elsewhere)."""
+    global _profile_enabled
+    if _profile_enabled:
+        return
+    _profile_enabled = True
+    module = globals()
+    for name in PROFILE_FUNCTIONS:
+        module[name] = _profiled(name, module[name])
+
+def draw_profile_overlay(show: bool = True):
+    """Show or hide the on-screen profiler overlay."""
+    global _profile_overlay
+    _profile_overlay = bool(show) and _profile_enabled
+
+def draw_profile_reset():
+    """Forget all collected profiling data."""
+    global _profile_frame, _profile_last
+    _profile_frame = {}
+    _profile_last = {}
+    _profile_totals.clear()
+    _profile_frames.clear()
+
+def draw_profile_stats() -> list:
+    """
+    Totals per (caller, function) since the last reset, most expensive first:
+    a list of dicts with caller, function, calls, pixels, ms, and per-frame
+    averages calls_per_frame, pixels_per_frame and ms_per_frame.
+    """
+    frames = max(1, len(_profile_frames))
+    rows = []
+    for (caller, name), (calls, pixels, seconds) in _profile_totals.items():
+        rows.append({
+            'caller': caller, 'function': name,
+            'calls': calls, 'pixels': pixels, 'ms': seconds * 1000,
+            'calls_per_frame': calls / frames,
+            'pixels_per_frame': pixels / frames,
+            'ms_per_frame': seconds * 1000 / frames,
+        })
+    rows.sort(key=lambda row: -row['ms'])
+    return rows
+
+def draw_profile_frame() -> Optional[Tuple[int, int, float]]:
+    """(calls, pixels, ms) of draw calls in the last complete frame, None if not profiling."""
+    if not _profile_enabled:
+        return None
+    if not _profile_frames:
+        return 0, 0, 0.0
+    calls, pixels, seconds = _profile_frames[-1]
+    return calls, pixels, seconds * 1000
+
+def draw_profile_export(path: str):
+    """Write the profiler totals to a .csv file, or a .json file that also has per-frame totals."""
+    rows = draw_profile_stats()
+    if path.endswith('.json'):
+        import json
+        with open(path, 'w') as f:
+            json.dump({
+                'frames': len(_profile_frames),
+                'stats': rows,
+                'per_frame': [{'calls': c, 'pixels': p, 'ms': s * 1000}
+                              for c, p, s in _profile_frames],
+            }, f, indent=1)
+    else:
+        import csv
+        columns = ['caller', 'function', 'calls', 'pixels', 'ms',
+                   'calls_per_frame', 'pixels_per_frame', 'ms_per_frame']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+# --- Device speed model ---
+# GINT_DEVICE_SPEED=1 turns the profiler counts into an estimated frame time on
+# the calculator: per-call and per-pixel costs of each draw function, plus the
+# host Python time spent outside draw calls (and sleeps) scaled by how much
+# slower the device interpreter is. GINT_DEVICE_SPEED=throttle also slows each
+# frame down to its estimate. Costs are measured on the device by
+# cpgame/tests/device_bench.py and loaded with GINT_DEVICE_COSTS=file.json;
+# the defaults below are uncalibrated guesses.
+DEVICE_COSTS = {
+    'call_us': {  # Fixed cost of one call, from MicroPython
+        'default': 20.0, 'dclear': 30.0, 'dpixel': 12.0, 'drect': 20.0,
+        'dline': 25.0, 'dtext': 60.0, 'dtext_opt': 60.0, 'dimage': 40.0,
+        'dsubimage': 35.0, 'dtile': 35.0, 'dtiles': 35.0, 'dpolys': 40.0,
+        'dshape': 35.0, 'dupdate': 11000.0,
+    },
+    'pixel_us': {  # Cost of each touched pixel
+        'default': 0.02, 'dclear': 0.004, 'drect': 0.006, 'dtext': 0.08,
+        'dtext_opt': 0.08, 'dimage': 0.03, 'dsubimage': 0.03, 'dtile': 0.03,
+        'dtiles': 0.03, 'dshape': 0.006,
+    },
+    'python_us': 0.0,  # Device time of _interpreter_probe(), 0 uses python_factor
+    'python_factor': 30.0,
+}
+
+_device_model = None
+
+def _interpreter_probe(n: int = 2000) -> int:
+    """Fixed Python workload, timed on both host and device (device_bench.py has a copy)"""
+    total = 0
+    values = [1, 2, 3, 4]
+    for i in range(n):
+        total += values[i & 3] * i
+        if total > 1000000:
+            total -= 1000000
+    return total
+
+class _DeviceModel:
+    """Estimates the device frame time from the draw profile of each frame"""
+    def __init__(self, costs: dict, throttle: bool):
+        self.call_us = costs['call_us']
+        self.pixel_us = costs['pixel_us']
+        self.throttle = throttle
+        self.python_factor = costs.get('python_factor', 30.0)
+        if costs.get('python_us'):
+            start = time.perf_counter()
+            for _ in range(5):
+                _interpreter_probe()
+            host_us = (time.perf_counter() - start) * 1e6 / 5
+            self.python_factor = costs['python_us'] / host_us
+        self.frame_ms = 0.0
+        self.draw_ms = 0.0
+        self.python_ms = 0.0
+        self.total_ms = 0.0
+        self.frames = 0
+        self._frame_start = time.perf_counter()
+        self._slept = _slept['seconds']
+
+    def end_frame(self, frame: dict, draw_seconds: float):
+        now = time.perf_counter()
+        slept = _slept['seconds'] - self._slept
+        python_s = max(0.0, now - self._frame_start - draw_seconds - slept)
+
+        draw_us = 0.0
+        default_call = self.call_us.get('default', 0.0)
+        default_pixel = self.pixel_us.get('default', 0.0)
+        for (caller, name), (calls, pixels, seconds) in frame.items():
+            draw_us += (calls * self.call_us.get(name, default_call)
+                        + pixels * self.pixel_us.get(name, default_pixel))
+        self.draw_ms = draw_us / 1000
+        self.python_ms = python_s * 1000 * self.python_factor
+        self.frame_ms = self.draw_ms + self.python_ms
+        self.total_ms += self.frame_ms
+        self.frames += 1
+
+        if self.throttle and not HEADLESS and _replay is None:
+            wait = self.frame_ms / 1000 - (now - self._frame_start)
+            if wait > 0:
+                _host_sleep(wait)
+        self._frame_start = time.perf_counter()
+        self._slept = _slept['seconds']
+
+def device_speed_enable(costs: Optional[dict] = None, throttle: bool = False):
+    """Estimate device frame times (enables the draw profiler). costs defaults to DEVICE_COSTS."""
+    global _device_model
+    draw_profile_enable()
+    _device_model = _DeviceModel(costs or DEVICE_COSTS, throttle)
+
+def device_load_costs(path: str) -> dict:
+    """Read a cost file written by device_bench.py, over the DEVICE_COSTS defaults."""
+    import json
+    with open(path) as f:
+        measured = json.load(f)
+    costs = {
+        'call_us': dict(DEVICE_COSTS['call_us']),
+        'pixel_us': dict(DEVICE_COSTS['pixel_us']),
+        'python_us': DEVICE_COSTS['python_us'],
+        'python_factor': DEVICE_COSTS['python_factor'],
+    }
+    costs['call_us'].update(measured.get('call_us', {}))
+    costs['pixel_us'].update(measured.get('pixel_us', {}))
+    for key in ('python_us', 'python_factor'):
+        if key in measured:
+            costs[key] = measured[key]
+    return costs
+
+def device_frame_ms() -> Optional[float]:
+    """Estimated device time of the last frame in ms, None if the model is off."""
+    return None if _device_model is None else _device_model.frame_ms
+
+def device_stats() -> Optional[dict]:
+    """Estimated device frame time of the last frame (draw and Python parts) and on average."""
+    if _device_model is None:
+        return None
+    model = _device_model
+    return {
+        'frame_ms': model.frame_ms, 'draw_ms': model.draw_ms, 'python_ms': model.python_ms,
+        'frames': model.frames,
+        'average_ms': model.total_ms / model.frames if model.frames else 0.0,
+        'python_factor': model.python_factor,
+    }
+
+#  --- Polyfill
+    
+import time
+import gc
+import sys
+import traceback
+from typing import Any, Optional
+
+# Polyfill for time.sleep_ms() and time.sleep_us()
+if not hasattr(time, 'sleep_ms'):
+    def time_sleep_ms(ms: int):
+        """Polyfill for time.sleep_ms. Pauses execution for a number of milliseconds."""
+        if _replay is None:
+            _host_sleep(ms / 1000.0)
+    time.sleep_ms = time_sleep_ms
+
+if not hasattr(time, 'sleep_us'):
+    def time_sleep_us(us: int):
+        """Polyfill for time.sleep_us. Pauses execution for a number of microseconds."""
+        if _replay is None:
+            _host_sleep(us / 1_000_000.0)
+    time.sleep_us = time_sleep_us
+
+if not hasattr(time, 'ticks_ms'):
+    TICKS_PERIOD = 2**30
+    TICKS_MAX = TICKS_PERIOD - 1
+    TICKS_HALF_PERIOD = TICKS_PERIOD // 2
+
+    def ticks_ms() -> int:
+        """Polyfill for time.ticks_ms. Returns a wrapping millisecond counter."""
+        return int(time.monotonic() * 1000) & TICKS_MAX
+
+    def ticks_us() -> int:
+        """Polyfill for time.ticks_us. Returns a wrapping microsecond counter."""
+        return int(time.monotonic() * 1_000_000) & TICKS_MAX
+
+    def ticks_cpu() -> int:
+        """Polyfill for time.ticks_cpu. Alias to ticks_us for simulation."""
+        return ticks_us()
+
+    def ticks_add(ticks: int, delta: int) -> int:
+        """Polyfill for time.ticks_add. Correctly adds a value to a wrapping ticks counter."""
+        return (ticks + delta) & TICKS_MAX
+
+    def ticks_diff(ticks1: int, ticks2: int) -> int:
+        """Polyfill for time.ticks_diff. Correctly finds the difference between two wrapping ticks values."""
+        return ((ticks1 - ticks2 + TICKS_HALF_PERIOD) & TICKS_MAX) - TICKS_HALF_PERIOD
+
+    time.ticks_ms = ticks_ms
+    time.ticks_us = ticks_us
+    time.ticks_cpu = ticks_cpu
+    time.ticks_add = ticks_add
+    time.ticks_diff = ticks_diff
+
+if HEADLESS:
+    _VIRTUAL_TICKS_MAX = 2**30 - 1
+
+    def ticks_ms() -> int:
+        """Headless time.ticks_ms. Reads the virtual clock."""
+        return (_virtual_time_us // 1000) & _VIRTUAL_TICKS_MAX
+
+    def ticks_us() -> int:
+        """Headless time.ticks_us. Reads the virtual clock."""
+        return _virtual_time_us & _VIRTUAL_TICKS_MAX
+
+    def sleep_ms(ms: int):
+        """Headless time.sleep_ms. Advances the virtual clock without waiting."""
+        _virtual_sleep_us(ms * 1000)
+
+    def sleep_us(us: int):
+        """Headless time.sleep_us. Advances the virtual clock without waiting."""
+        _virtual_sleep_us(us)
+
+    time.ticks_ms = ticks_ms
+    time.ticks_us = ticks_us
+    time.ticks_cpu = ticks_us
+    time.sleep_ms = sleep_ms
+    time.sleep_us = sleep_us
+
+# Polyfills for MicroPython-specific gc functions
+import gc
+import tracemalloc
+import sys
+import os
+
+# --- Heap budget emulator ---
+# The game runs in the small MicroPython heap of the calculator. Once
+# heap_enable() is called (GINT_HEAP_BUDGET=300k does it at import),
+# gc.mem_alloc() and gc.mem_free() emulate it: Python allocations traced by
+# tracemalloc since the tracker started, times HEAP_SCALE, against HEAP_BUDGET.
+# heap_scope(name) accounts a block to a subsystem (assets, windows, data...)
+# and heap_scene(name) the following frames to a scene; heap_stats() returns
+# their peaks. GINT_HEAP_BUDGET also raises MemoryError like the device when a
+# scope or a frame goes over the budget and prints heap_report() at exit.
+# HEAP_SCALE is the size of MicroPython objects over CPython ones. No ratio has
+# been measured against the device yet, so it is 1.0 and the figures are
+# CPython bytes: set GINT_HEAP_SCALE to a measured ratio for device estimates.
+# Without heap_enable(), gc.mem_alloc() and gc.mem_free() are the plain host
+# figures they always were, and no scope or scene is accounted.
+HEAP_BUDGET = 300 * 1024  # bytes
+HEAP_SCALE = 1.0
+HEAP_ENFORCE = False
+
+_memory_tracker = {
+    'baseline': 0,
+    'initialized': False,
+    'enabled': False,  # heap_enable() was called: emulate the device heap
+    'peak': 0,  # traced bytes, since the tracker started
+}
+# Open accounting entries, as [name, start, peak] in traced bytes
+_heap_stack = []
+_heap_scene_entry = None
+_heap_stats = {}  # name -> {'count', 'peak', 'grow', 'net'} in device bytes
+
+def _init_memory_tracker():
+    """Initialize tracemalloc if not already done"""
+    if not _memory_tracker['initialized']:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        
+        # Set baseline after a garbage collection
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        _memory_tracker['baseline'] = current
+        _memory_tracker['peak'] = current
+        _memory_tracker['initialized'] = True
+
+def _heap_bytes(traced: int) -> int:
+    """Converts an absolute tracemalloc figure to emulated device heap bytes."""
+    return max(0, int((traced - _memory_tracker['baseline']) * HEAP_SCALE))
+
+def _heap_where() -> str:
+    if _heap_stack:
+        return _heap_stack[-1][0]
+    if _heap_scene_entry is not None:
+        return _heap_scene_entry[0]
+    return 'game'
+
+def _heap_sample(check: bool = True) -> int:
+    """Folds the tracemalloc peak into every open entry and restarts it.
+    Returns the traced bytes in use."""
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for entry in _heap_stack:
+        if peak > entry[2]:
+            entry[2] = peak
+    if _heap_scene_entry is not None and peak > _heap_scene_entry[2]:
+        _heap_scene_entry[2] = peak
+    if peak > _memory_tracker['peak']:
+        _memory_tracker['peak'] = peak
+    if check and HEAP_ENFORCE and _heap_bytes(peak) > HEAP_BUDGET:
+        raise MemoryError("memory allocation failed: heap at {} B of {} B in {}".format(
+            _heap_bytes(peak), HEAP_BUDGET, _heap_where()))
+    return current
+
+def _heap_fold(stats: dict, entry: list, current: int):
+    _, start, peak = entry
+    stats['peak'] = max(stats['peak'], _heap_bytes(peak))
+    stats['grow'] = max(stats['grow'], int((peak - start) * HEAP_SCALE))
+    stats['net'] = int((current - start) * HEAP_SCALE)
+
+def _heap_record(entry: list, current: int) -> dict:
+    stats = _heap_stats.get(entry[0])
+    if stats is None:
+        stats = _heap_stats[entry[0]] = {'count': 0, 'peak': 0, 'grow': 0, 'net': 0}
+    stats['count'] += 1
+    _heap_fold(stats, entry, current)
+    return stats
+
+class _HeapScope:
+    """Context manager accounting the heap used inside a block to `name`.
+    Does nothing until heap_enable() is called."""
+    __slots__ = ('name', '_entry')
+
+    def __init__(self, name: str):
+        self.name = name
+        self._entry = None
+
+    def __enter__(self):
+        if _memory_tracker['enabled']:
+            current = _heap_sample()
+            self._entry = [self.name, current, current]
+            _heap_stack.append(self._entry)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        entry = self._entry
+        if entry is None:
+            return False
+        self._entry = None
+        current = tracemalloc.get_traced_memory()[0]
+        try:
+            # No second MemoryError while an exception is already unwinding
+            _heap_sample(check=exc_type is None)
+        finally:
+            _heap_stack.remove(entry)
+            _heap_record(entry, current)
+        return False
+
+def heap_scope(name: str) -> _HeapScope:
+    """Accounts the heap used by a `with` block to a subsystem or scene step."""
+    return _HeapScope(name)
+
+def heap_scene(name: Optional[str]) -> Optional[dict]:
+    """Accounts the following frames to scene `name` (None stops). Returns the
+    stats of the scene left, or None."""
+    global _heap_scene_entry
+    if not _memory_tracker['enabled']:
+        return None
+    current = _heap_sample(check=False)
+    left = _heap_scene_entry
+    _heap_scene_entry = [name, current, current] if name else None
+    return _heap_record(left, current) if left is not None else None
+
+def heap_enable(budget: Optional[int] = None, scale: Optional[float] = None, enforce: bool = True):
+    """Starts the heap tracker; with `enforce`, going over the budget raises MemoryError."""
+    global HEAP_BUDGET, HEAP_SCALE, HEAP_ENFORCE
+    if budget is not None:
+        HEAP_BUDGET = budget
+    if scale is not None:
+        HEAP_SCALE = scale
+    HEAP_ENFORCE = enforce
+    _init_memory_tracker()
+    _memory_tracker['enabled'] = True
+
+def heap_stats() -> dict:
+    """Emulated heap figures in device bytes: budget, in use, peak, and per scope
+    or scene the times entered, the peak heap, the largest growth over its
+    start and the net change of its last run."""
+    if not _memory_tracker['enabled']:
+        return {'budget': HEAP_BUDGET, 'alloc': 0, 'peak': 0, 'scopes': {}}
+    current = _heap_sample(check=False)
+    scopes = {name: dict(stats) for name, stats in _heap_stats.items()}
+    if _heap_scene_entry is not None:
+        # The running scene, so far
+        scene = scopes.setdefault(_heap_scene_entry[0], {'count': 0, 'peak': 0, 'grow': 0, 'net': 0})
+        _heap_fold(scene, _heap_scene_entry, current)
+    return {
+        'budget': HEAP_BUDGET,
+        'alloc': _heap_bytes(current),
+        'peak': _heap_bytes(_memory_tracker['peak']),
+        'scopes': scopes,
+    }
+
+def heap_report() -> str:
+    """heap_stats() as a text table, largest peaks first."""
+    stats = heap_stats()
+    lines = ["heap: {} B in use, peak {} B of {} B".format(stats['alloc'], stats['peak'], stats['budget']),
+             "{:<32} {:>6} {:>9} {:>9} {:>9}".format("scope", "count", "peak", "grow", "net")]
+    for name, scope in sorted(stats['scopes'].items(), key=lambda item: -item[1]['peak']):
+        lines.append("{:<32} {:>6} {:>8}B {:>8}B {:>8}B".format(
+            name[:32], scope['count'], scope['peak'], scope['grow'], scope['net']))
+    return "\n".join(lines)
+
+if not hasattr(gc, 'mem_alloc'):
+    def gc_mem_alloc() -> int:
+        """
+        Polyfill for gc.mem_alloc using tracemalloc. Returns the emulated
+        heap in use after heap_enable(), else the host bytes traced since the
+        first call.
+        """
+        _init_memory_tracker()
+        
+        # Force garbage collection for more accurate reading
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        if _memory_tracker['enabled']:
+            return _heap_bytes(current)
+        return max(0, current - _memory_tracker['baseline'])
+    
+    gc.mem_alloc = gc_mem_alloc
+
+if not hasattr(gc, 'mem_free'):
+    def gc_mem_free() -> int:
+        """
+        Polyfill for gc.mem_free. Returns what is left of HEAP_BUDGET in
+        bytes after heap_enable(), else a rough estimate that always leaves
+        at least 1KB "free".
+        """
+        if _memory_tracker['enabled']:
+            return max(0, HEAP_BUDGET - gc.mem_alloc())
+        return max(1024, HEAP_BUDGET - gc.mem_alloc())
+    
+    gc.mem_free = gc_mem_free
+
+if not hasattr(gc, 'threshold'):
+    def gc_threshold(amount=None):
+        """
+        Polyfill for gc.threshold. In CPython, we can't directly control
+        the allocation threshold, so we just call gc.collect() if amount is small.
+        """
+        if amount is not None:
+            if amount < 1000:  # If threshold is small, collect more aggressively
+                gc.collect()
+            return amount
+        else:
+            # MicroPython default is typically around 1000 bytes
+            return 1000
+    
+    gc.threshold = gc_threshold
+
+# Create a dummy micropython module since it doesn't exist in standard Python
+class MicroPythonModule:
+    def const(self, expr: Any) -> Any:
+        """Polyfill for micropython.const. Returns the expression as-is."""
+        return expr
+
+    def opt_level(self, level: Optional[int] = None) -> int:
+        """Polyfill for micropython.opt_level. Does nothing and returns 0."""
+        if level is not None:
+            print(f"Warning: micropython.opt_level({level}) called. No effect in CPython.")
+        return 0
+
+    def heap_lock(self) -> int:
+        """Polyfill for micropython.heap_lock. Does nothing and returns 0."""
+        return 0
+
+    def heap_unlock(self) -> int:
+        """Polyfill for micropython.heap_unlock. Does nothing and returns 0."""
+        return 0
+    
+    def kbd_intr(self, chr_val: int):
+        """Polyfill for micropython.kbd_intr. Does nothing."""
+        pass
+
+# Add the dummy module to sys.modules
+if 'micropython' not in sys.modules:
+    sys.modules['micropython'] = MicroPythonModule()
+
+
+if not hasattr(sys, 'print_exception'):
+    def sys_print_exception(exc: Exception, file=sys.stdout):
+        """
+        Polyfill for sys.print_exception. Uses the standard `traceback` module.
+        """
+        traceback.print_exception(type(exc), exc, exc.__traceback__, file=file)
+    sys.print_exception = sys_print_exception
+
+#  --- INIT STUFF
+    
+vram.fill(C_WHITE)
+
+if os.environ.get('GINT_REPLAY'):
+    input_replay(os.environ['GINT_REPLAY'])
+elif os.environ.get('GINT_RECORD'):
+    input_record(os.environ['GINT_RECORD'])
+atexit.register(input_stop)
+
+if os.environ.get('GINT_PROFILE', '0') not in ('', '0'):
+    draw_profile_enable()
+    draw_profile_overlay(os.environ['GINT_PROFILE'] == 'overlay')
+    if os.environ.get('GINT_PROFILE_OUT'):
+        atexit.register(draw_profile_export, os.environ['GINT_PROFILE_OUT'])
+
+if os.environ.get('GINT_DEVICE_SPEED', '0') not in ('', '0'):
+    device_speed_enable(
+        device_load_costs(os.environ['GINT_DEVICE_COSTS']) if os.environ.get('GINT_DEVICE_COSTS') else None,
+        throttle=os.environ['GINT_DEVICE_SPEED'] == 'throttle')
+
+if os.environ.get('GINT_HEAP_BUDGET'):
+    _budget = os.environ['GINT_HEAP_BUDGET'].strip().lower()
+    _unit = {'k': 1024, 'm': 1024 * 1024}.get(_budget[-1:], 1)
+    heap_enable(int(_budget.rstrip('km')) * _unit,
+                float(os.environ.get('GINT_HEAP_SCALE', HEAP_SCALE)))
+    atexit.register(lambda: print(heap_report()))
+elif os.environ.get('GINT_HEAP_SCALE'):
+    HEAP_SCALE = float(os.environ['GINT_HEAP_SCALE'])
\ No newline at end of file
@@ -0,0 +1,58 @@
+# gint_import_bench.py
+# Startup benchmark of the gint simulator: import time, then the cost of the
+# first dupdate() (window) and first dtext() (font atlas), each in a fresh
+# interpreter. Run from the repository root: python gint_import_bench.py
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Timed in the child; one line of milliseconds per step
+CHILD = """
+import time
+t0 = time.perf_counter()
+import pygame
+t1 = time.perf_counter()
+import gint
+t2 = time.perf_counter()
+gint.dupdate()
+t3 = time.perf_counter()
+gint.dtext(0, 0, gint.C_BLACK, "Loading...")
+t4 = time.perf_counter()
+print("GINT_BENCH", (t1 - t0) * 1000, (t2 - t1) * 1000, (t3 - t2) * 1000, (t4 - t3) * 1000)
+"""
+
+STEPS = ("import pygame", "import gint", "first dupdate", "first dtext")
+
+def run_once(env):
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    for line in out.splitlines():
+        if line.startswith("GINT_BENCH"):
+            return [float(value) for value in line.split()[1:]]
+    raise RuntimeError("no timings in benchmark output:\n" + out)
+
+def main():
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # Startup as users see it, from .pyc
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+
+    run_once(env)  # Warm up the bytecode and disk caches
+    samples = [run_once(env) for _ in range(runs)]
+
+    print("video driver: {}, screen: {}, {} runs".format(
+        env["SDL_VIDEODRIVER"], env.get("GINT_SCREEN", "default"), runs))
+    print("{:<16} {:>9} {:>9}".format("step", "best", "median"))
+    for i, step in enumerate(STEPS):
+        values = [sample[i] for sample in samples]
+        print("{:<16} {:>7.1f}ms {:>7.1f}ms".format(step, min(values), statistics.median(values)))
+    totals = [sum(sample) for sample in samples]
+    print("{:<16} {:>7.1f}ms {:>7.1f}ms".format("TOTAL", min(totals), statistics.median(totals)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+from gint import dpoly
+from array import array
+
+try:
+    from gint import PolyShape, dshape  # Simulator only
+except ImportError:
+    PolyShape = dshape = None
+
+class PolyBatch:
+    """
+    Polygons queued with add() and drawn together by draw(). The same batch
+    coming back is drawn from a cached PolyShape. On the calculator there is
+    no PolyShape: add() draws the polygon right away with dpoly() and
+    nothing is queued.
+    """
+    def __init__(self, max_shapes=32):
+        self.shapes = {}
+        self.max_shapes = max_shapes
+        self.clear()
+
+    def clear(self):
+        if PolyShape is None:
+            return
+        self.vertices = array('h')
+        self.sizes = array('B')
+        self.fills = array('i')
+        self.borders = array('i')
+
+    def add(self, vertices, fill, border):
+        if PolyShape is None:
+            dpoly(vertices, fill, border)
+            return
+        self.vertices.extend(vertices)
+        self.sizes.append(len(vertices) // 2)
+        self.fills.append(fill)
+        self.borders.append(border)
+
+    def draw(self):
+        if PolyShape is None:
+            return
+        key = (bytes(self.vertices), bytes(self.sizes), bytes(self.fills), bytes(self.borders))
+        shape = self.shapes.get(key)
+        if shape is None:
+            if len(self.shapes) >= self.max_shapes:
+                self.shapes.clear()
+            shape = self.shapes[key] = PolyShape(self.vertices, self.sizes, self.fills, self.borders)
+        dshape(0, 0, shape)
@@ -1,5 +1,6 @@
 from svg_vector_format import VectorCompiler, BIN_C_NONE
 from gint import C_RGB, C_BLACK, C_WHITE, C_NONE
+from array import array
 import math
 
 #  INPUT ASSETS
@@ -195,8 +196,9 @@ def generate_file():
     # 1. Text-based Python List Format
     print("- Generating svg_generated_icons.py...")
     output_py = []
-    output_py.append("# Auto-generated icons. Format: Fixed-point integers (Scale x100)")
-    output_py.append("# Usage: real_x = (pt * scale) // 100 + x")
+    output_py.append("# Auto-generated icons. Format: array('h') of fixed-point integers (Scale x100)")
+    output_py.append("# Usage: real_x = (pt * scale) // 100 + x, the scaled buffer goes to dpoly() as is")
+    output_py.append("from array import array")
     output_py.append("")
     
     # 2. Binary Format (using vector_format logic)
@@ -213,7 +215,8 @@ def generate_file():
         
         # Scale by 100 and convert to Int for Python list
         fixed_poly = [int(val * 100) for val in merged]
-        output_py.append(f"{name} = {fixed_poly}")
+        # Packed int16 buffer, dpoly() and dpolys() read it without a copy
+        output_py.append(f"{name} = {array('h', fixed_poly)!r}")
         
         # Binary Compilation
         # Create a new compiler for each icon so they are separate blobs
@@ -1,5 +1,6 @@
 from gint import *
 from maze import MazeBuilder
+from polybatch import PolyBatch
 import time
 import struct
 import random
@@ -238,6 +239,7 @@ class TunnelScene(Scene):
         if not seed:
             seed = random.randint(0, 65535) # 17138
         self.max_items = 10
+        self.tunnel_polys = PolyBatch()
         self.generate_dungeon(seed)
         self.item_counter = 0
         self.total_score = 0
@@ -498,6 +500,8 @@ class TunnelScene(Scene):
         UI_TOP, UI_BOTTOM = SCENE_BOTTOM, dh
         VANISH_X, VANISH_Y = dw//2, (SCENE_TOP+SCENE_BOTTOM)//2
         LEVELS = 5
+        polys = self.tunnel_polys
+        polys.clear()
 
         # direction deltas
         fdy,fdx = self.dir_vectors[self.cam_dir][0]
@@ -545,8 +549,8 @@ class TunnelScene(Scene):
                     self.right_open = True
             
             # draw faces
-            dpoly(flatten(bl0, br0, br1, bl1), floor_col, 0)
-            dpoly(flatten(tl0,tr0,tr1,tl1), ceil_col,   0)
+            polys.add(flatten(bl0, br0, br1, bl1), floor_col, 0)
+            polys.add(flatten(tl0,tr0,tr1,tl1), ceil_col,   0)
 
             # -------------------------
             # if there's a corridor on the left, draw the next-inner wall
@@ -567,35 +571,35 @@ class TunnelScene(Scene):
                 # draw roof triangle (red): tl0, tl1, projected (tl0.x, tl1.y)
                 x0,y0 = tl0
                 x1,y1 = tl1
-                dpoly([x0, y0, x1, y1, x0, y1], self.COLORS_MAP[i][2], 0)
+                polys.add([x0, y0, x1, y1, x0, y1], self.COLORS_MAP[i][2], 0)
 
                 if left_behind_wall:
                     y2 = tl2[1]  # deeper level top Y
-                    dpoly([x0, y1, x1, y1, x1, y2], self.COLORS_MAP[i+1][2], 0)
+                    polys.add([x0, y1, x1, y1, x1, y2], self.COLORS_MAP[i+1][2], 0)
 
 
                 # draw floor triangle (red): bl0, bl1, projected (bl0.x, bl1.y)
                 x0,y0 = bl0
                 x1,y1 = bl1
-                dpoly([x0, y0, x1, y1, x0, y1], self.COLORS_MAP[i][1], 0)
+                polys.add([x0, y0, x1, y1, x0, y1], self.COLORS_MAP[i][1], 0)
 
                 if left_behind_wall:
                     y2 = bl2[1]  # deeper level top Y
-                    dpoly([x0, y1, x1, y1, x1, bl2[1]], self.COLORS_MAP[i+1][1], 0)
+                    polys.add([x0, y1, x1, y1, x1, bl2[1]], self.COLORS_MAP[i+1][1], 0)
 
                     # background wall
-                    dpoly([bl0[0], bl1[1], bl1[0], bl2[1], tl1[0], tl2[1], tl0[0], tl1[1]], self.COLORS_MAP[i+1][0], 0)
+                    polys.add([bl0[0], bl1[1], bl1[0], bl2[1], tl1[0], tl2[1], tl0[0], tl1[1]], self.COLORS_MAP[i+1][0], 0)
                 else:
                     # draw inner wall quad (orange): bl1, bl2, tl2, tl1
-                    dpoly([bl1[0], bl1[1], bl0[0], bl1[1], tl0[0], tl1[1], tl1[0], tl1[1]], wall_color, 1)
+                    polys.add([bl1[0], bl1[1], bl0[0], bl1[1], tl0[0], tl1[1], tl1[0], tl1[1]], wall_color, 1)
                     # dpoly([bl1[0], bl1[1], bl2[0], bl2[1], tl2[0], tl2[1], tl1[0], tl1[1]], C_RGB(shade,shade,shade), 1)
 
                 
             elif self.left_open:
                 # if too deep, just draw flat left face
-                dpoly(flatten(bl0,tl0,tl1,bl1), self.COLORS_MAP[i][0], 0)
+                polys.add(flatten(bl0,tl0,tl1,bl1), self.COLORS_MAP[i][0], 0)
             else:
-                dpoly(flatten(bl0,tl0,tl1,bl1), self.COLORS_MAP[i][0],  0)
+                polys.add(flatten(bl0,tl0,tl1,bl1), self.COLORS_MAP[i][0],  0)
 
             # if there's a corridor on the right, draw the next-inner wall
             if self.right_open and i+1 < LEVELS:
@@ -616,31 +620,31 @@ class TunnelScene(Scene):
                 # draw roof triangle (red) on right face: tr0, tr1, projected(tr1.x, tr0.y)
                 x0, y0 = tr0
                 x1, y1 = tr1
-                dpoly([x0, y0, x1, y1, x0, y1], self.COLORS_MAP[i][2], 0)
+                polys.add([x0, y0, x1, y1, x0, y1], self.COLORS_MAP[i][2], 0)
 
                 if behind_wall:
                     y2 = tl2[1]  # deeper level top Y
-                    dpoly([x0, y1, x1, y1, x1, y2], self.COLORS_MAP[i+1][2], 0)
+                    polys.add([x0, y1, x1, y1, x1, y2], self.COLORS_MAP[i+1][2], 0)
 
                 # draw floor triangle (red): br0, br1, project  ed(br1.x, br0.y)
                 x0, y0 = br0
                 x1, y1 = br1
-                dpoly([x0, y0, x1, y1, x0, y1], self.COLORS_MAP[i][1], 0)
+                polys.add([x0, y0, x1, y1, x0, y1], self.COLORS_MAP[i][1], 0)
 
                 # draw inner wall quad (orange or black)
                 if behind_wall:
                     y2 = bl2[1]  # deeper level top Y
-                    dpoly([x0, y1, x1, y1, x1, bl2[1]], self.COLORS_MAP[i+1][1], 0)
+                    polys.add([x0, y1, x1, y1, x1, bl2[1]], self.COLORS_MAP[i+1][1], 0)
 
                     # background wall
-                    dpoly([br0[0], br1[1], br1[0], br2[1], tr1[0], tr2[1], tr0[0], tr1[1]], self.COLORS_MAP[i+1][0], 0)
+                    polys.add([br0[0], br1[1], br1[0], br2[1], tr1[0], tr2[1], tr0[0], tr1[1]], self.COLORS_MAP[i+1][0], 0)
                 else:
-                    dpoly([br1[0], br1[1], br0[0], br1[1], tr0[0], tr1[1], tr1[0], tr1[1]], self.COLORS_MAP[i][0], 0)
+                    polys.add([br1[0], br1[1], br0[0], br1[1], tr0[0], tr1[1], tr1[0], tr1[1]], self.COLORS_MAP[i][0], 0)
                     # dpoly([br1[0], br1[1], br2[0], br2[1], tr2[0], tr2[1], tr1[0], tr1[1]], C_RGB(shade,shade,shade), 1)
             elif self.right_open:
-                dpoly(flatten(br0,tr0,tr1,br1), self.COLORS_MAP[i][0], 0)
+                polys.add(flatten(br0,tr0,tr1,br1), self.COLORS_MAP[i][0], 0)
             else:
-                dpoly(flatten(br0,tr0,tr1,br1), self.COLORS_MAP[i][0], 0)
+                polys.add(flatten(br0,tr0,tr1,br1), self.COLORS_MAP[i][0], 0)
 
             # -------------------------
             
@@ -648,7 +652,7 @@ class TunnelScene(Scene):
                 # draw front-facing wall slice at the next depth and stop
                 front_col = self.COLORS_MAP[i][0] # C_RGB(shade, shade, shade)
                 # use the "far" corners (t1) for the wall position
-                dpoly(flatten(tl1, tr1, br1, bl1), front_col, 0)
+                polys.add(flatten(tl1, tr1, br1, bl1), front_col, 0)
                 break
             
             # draw items behind in perspective (one level)
@@ -665,6 +669,7 @@ class TunnelScene(Scene):
                 my = bl1[1] - size
                 item_markers.append((mx, my, size//2, depth))
 
+        polys.draw()
 
         # back sliver
         tb = tvals[-1]
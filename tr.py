@@ -1,5 +1,6 @@
 from gint import *
 from maze import MazeBuilder
+from polybatch import PolyBatch
 import time
 import random
 
@@ -74,6 +75,8 @@ def flatten(*lists):
         out.extend(lst)
     return out
 
+tunnel_polys = PolyBatch()
+
 # Draw both 3D tunnel and 2D minimap
 def draw_tunnel():
     global PLAYER_X, PLAYER_Y
@@ -87,6 +90,7 @@ def draw_tunnel():
     rdy, rdx = dir_vectors[cam_dir][2]
 
     item_markers = []
+    tunnel_polys.clear()
 
     # compute t's
     tvals = [1.0 - 0.5**i for i in range(LEVELS+1)]
@@ -127,8 +131,8 @@ def draw_tunnel():
                 right_open = False
             
         # draw faces
-        dpoly(flatten(bl0, br0, br1, bl1), floor_col, 1)
-        dpoly(flatten(tl0,tr0,tr1,tl1), ceil_col,   1)
+        tunnel_polys.add(flatten(bl0, br0, br1, bl1), floor_col, 1)
+        tunnel_polys.add(flatten(tl0,tr0,tr1,tl1), ceil_col,   1)
    
 
         # -------------------------
@@ -141,18 +145,18 @@ def draw_tunnel():
             # draw roof triangle (red): tl0, tl1, projected (tl0.x, tl1.y)
             x0,y0 = tl0
             x1,y1 = tl1
-            dpoly([x0, y0, x1, y1, x0, y1], C_RGB(shade,shade,shade), 1)
+            tunnel_polys.add([x0, y0, x1, y1, x0, y1], C_RGB(shade,shade,shade), 1)
             # draw floor triangle (red): bl0, bl1, projected (bl0.x, bl1.y)
             x0,y0 = bl0
             x1,y1 = bl1
-            dpoly([x0, y0, x1, y1, x0, y1], C_RGB(shade,shade,shade), 1)
+            tunnel_polys.add([x0, y0, x1, y1, x0, y1], C_RGB(shade,shade,shade), 1)
             # draw inner wall quad (orange): bl1, bl2, tl2, tl1
-            dpoly([bl1[0], bl1[1], bl2[0], bl2[1], tl2[0], tl2[1], tl1[0], tl1[1]], C_RGB(31,15,0), 1)
+            tunnel_polys.add([bl1[0], bl1[1], bl2[0], bl2[1], tl2[0], tl2[1], tl1[0], tl1[1]], C_RGB(31,15,0), 1)
         elif left_open:
             # if too deep, just draw flat left face
-            dpoly(flatten(bl0,tl0,tl1,bl1), C_RGB(shade,shade,shade), 1)
+            tunnel_polys.add(flatten(bl0,tl0,tl1,bl1), C_RGB(shade,shade,shade), 1)
         else:
-            dpoly(flatten(bl0,tl0,tl1,bl1), C_RGB(shade,shade,shade),  1)
+            tunnel_polys.add(flatten(bl0,tl0,tl1,bl1), C_RGB(shade,shade,shade),  1)
 
         # if there's a corridor on the right, draw the next-inner wall
         if right_open and i+1 < LEVELS:
@@ -167,18 +171,18 @@ def draw_tunnel():
             # draw roof triangle (red) on right face: tr0, tr1, projected(tr1.x, tr0.y)
             x0, y0 = tr0
             x1, y1 = tr1
-            dpoly([x0, y0, x1, y1, x0, y1], C_RGB(shade,shade,shade), 1)
+            tunnel_polys.add([x0, y0, x1, y1, x0, y1], C_RGB(shade,shade,shade), 1)
             # draw floor triangle (red): br0, br1, project  ed(br1.x, br0.y)
             x0, y0 = br0
             x1, y1 = br1
-            dpoly([x0, y0, x1, y1, x0, y1], C_RGB(shade,shade,shade), 1)
+            tunnel_polys.add([x0, y0, x1, y1, x0, y1], C_RGB(shade,shade,shade), 1)
             # draw inner wall quad (orange or black)
             inner_col = C_RGB(31,15,0) if behind_wall else C_BLACK
-            dpoly([br1[0], br1[1], br2[0], br2[1], tr2[0], tr2[1], tr1[0], tr1[1]], inner_col, 1)
+            tunnel_polys.add([br1[0], br1[1], br2[0], br2[1], tr2[0], tr2[1], tr1[0], tr1[1]], inner_col, 1)
         elif right_open:
-            dpoly(flatten(br0,tr0,tr1,br1), C_RGB(shade,shade,shade), 1)
+            tunnel_polys.add(flatten(br0,tr0,tr1,br1), C_RGB(shade,shade,shade), 1)
         else:
-            dpoly(flatten(br0,tr0,tr1,br1), C_RGB(shade,shade,shade), 1)
+            tunnel_polys.add(flatten(br0,tr0,tr1,br1), C_RGB(shade,shade,shade), 1)
 
         # -------------------------
         
@@ -186,7 +190,7 @@ def draw_tunnel():
             # draw front-facing wall slice at the next depth and stop
             front_col = C_RGB(shade, shade, shade)
             # use the "far" corners (t1) for the wall position
-            dpoly(flatten(tl1, tr1, br1, bl1), front_col, 1)
+            tunnel_polys.add(flatten(tl1, tr1, br1, bl1), front_col, 1)
             break
         
         # draw items behind in perspective (one level)
@@ -205,6 +209,8 @@ def draw_tunnel():
 
             
 
+    tunnel_polys.draw()
+
     # back sliver
     tb = tvals[-1]
     b0 = lerp_point(0,SCENE_TOP,   VANISH_X,VANISH_Y,tb)